@@ -8,6 +8,88 @@ DB_KEY = "Driver={SQL Server}; Server=10.189.24.40; uid=rendering_dep; pwd=251_e
 
 RENDER_STYLE_TABLE = "[ReportDB].[dbo].[vw_render_style_sku]"
 
+#PLM connection pool ---------------------------------------------
+
+PLM_POOL_SIZE = 4               #max open connections to the PLM DB
+PLM_POOL_TIMEOUT = 30           #seconds to wait for a free connection
+PLM_POOL_VALIDATE_IDLE = 30     #idle seconds after which a connection is pinged on checkout
+PLM_EXECUTOR_WORKERS = 4        #threads running PLM queries off the Kit main thread
+PLM_IN_CHUNK_SIZE = 500         #styles per batched IN query (SQL Server max 2100 parameters)
+PLM_FETCH_BATCH_SIZE = 200      #rows per fetchmany batch, painted in the UI one batch per Kit update
+
+#PLM query metrics ------------------------------------------------
+PLM_METRICS_WINDOW = 200        #latest samples kept per query shape for p50/p95
+PLM_SLOW_QUERY_MS = 500         #queries slower than this are written to the slow-query log
+PLM_SLOW_QUERY_LOG = Path.home().joinpath(".thelios", "plm_slow_queries.log")
+
+#PLM prefetch -----------------------------------------------------
+PLM_PREFETCH_CACHE_SIZE = 32    #(season, brand, type) results kept in the LRU cache
+PLM_PREFETCH_TTL = 300          #seconds a cached result stays valid
+PLM_PREFETCH_DELAY = 0.5        #seconds the prefetch worker waits before each fetch (foreground first)
+PLM_RELEASES_PER_YEAR = 2       #release codes are YY + release of the year (261, 262, 271, ...)
+
+#Model field autocomplete ---------------------------------------------
+MODEL_SUGGESTIONS_LIMIT = 6     #style codes suggested under the model field
+MODEL_SUGGESTIONS_RETRY_MIN = 15    #seconds before a failed style list load is retried
+MODEL_SUGGESTIONS_RETRY_MAX = 600   #retry delay cap (doubles after each failure)
+
+#PLM local mirror ------------------------------------------------
+
+PLM_MIRROR_ENABLED = True
+PLM_MIRROR_PATH = Path.home().joinpath(".thelios", "plm_mirror.sqlite")
+PLM_MIRROR_MODIFIED_COLUMN = None              #change-tracking column of the view (e.g. "Last_Modified"), None = full syncs only
+                                                #(SKU lookups of styles missing from the snapshot then fall back to the PLM)
+PLM_MIRROR_SYNC_INTERVAL = 300                  #seconds between background syncs
+PLM_MIRROR_FULL_SYNC_INTERVAL = 24 * 3600       #seconds between full syncs (drops rows deleted in PLM)
+
+#Scene scope index ------------------------------------------------
+
+SKU_ROOT_PATH = "/World/Models"
+SKU_SCOPE_DEPTH = 6     #path elements of /World/Models/glass_Xform/{model}_Xform/Release_{r}/{model}_{sku}
+SCOPE_ISOLATION_LAYER_TAG = "scope_isolation"     #anonymous session sublayer holding the SKU isolation overrides
+
+#SKU hierarchy ----------------------------------------------------
+
+SKU_GLASS_XFORM = "glass_Xform"     #turntable Xform holding every model under SKU_ROOT_PATH
+SKU_TURNTABLE_FRAMES = 8            #rotateY time samples authored on glass_Xform (frames 1..8)
+SKU_TURNTABLE_STEP = -45.0          #degrees of rotateY per frame
+IMPORT_CHUNK_SIZE = 25              #SKUs imported between two Kit updates (one undo entry per chunk)
+
+#Asset existence checks -------------------------------------------
+
+ASSET_STAT_POSITIVE_TTL = 300   #seconds an "exists" result stays cached
+ASSET_STAT_NEGATIVE_TTL = 30    #seconds a "missing" result stays cached (usd files get published meanwhile)
+ASSET_STAT_WORKERS = 16         #concurrent probes of exists_many (one server round-trip each)
+PREFLIGHT_MIN_BYTES = 1         #SKU usd files smaller than this are reported missing (empty placeholders, a thin .usda is still valid)
+PREFLIGHT_STALE_DAYS = None     #opt-in: SKU usd files not modified for longer are reported stale (an old file is usually just a valid, unchanged SKU)
+
+#Local asset cache ------------------------------------------------
+
+ASSET_CACHE_ENABLED = True      #SKU, template and material usd files are read from a local mirror of the share
+ASSET_CACHE_DIR = Path.home().joinpath(".thelios", "asset_cache")
+ASSET_CACHE_ROOTS = (r"U:\01_USD", r"U:\02_TOOLS", r"U:\03_MAT_LIBRARY")     #share folders mirrored locally
+ASSET_CACHE_MAX_GB = 50         #size of the mirror, least recently used files are evicted first
+ASSET_CACHE_VALIDATE = "stat"   #"stat": size + mtime, "hash": same, plus a content hash when only the mtime changed
+ASSET_CACHE_WORKERS = 8         #concurrent file copies from the share
+
+#Material registry ------------------------------------------------
+
+MATERIAL_REGISTRY_MAX_PENDING = 64      #queued /World/Looks changes above which the registry re-walks the scope once
+
+#Stage statistics -------------------------------------------------
+
+STAGE_STATS_PRIM_OVERHEAD_BYTES = 2048      #approximate composed memory of a prim besides its mesh arrays
+STAGE_STATS_EXPORT_DIR = Path.home().joinpath(".thelios", "stage_stats")
+STAGE_STATS_TOP_SKUS = 20                   #heaviest SKUs listed in the Diagnostics panel
+STAGE_STATS_CONFIRM_SECONDS = 10            #seconds to confirm the Composition probe with a second click
+
+#Payload residency ------------------------------------------------
+
+PAYLOAD_RESIDENCY_ENABLED = True    #View panel browsing unloads the SKUs outside the budget
+PAYLOAD_RESIDENCY_MAX_SKUS = 8      #SKUs kept loaded, least recently viewed are unloaded first
+PAYLOAD_RESIDENCY_MAX_GB = 16       #approximate composed memory of the loaded SKUs (stage_stats estimate)
+PAYLOAD_RESIDENCY_PREFETCH = 1      #SKUs loaded ahead on each side of the viewed one
+
 #Brand Dictionary -----------------------------------------------
 
 BRANDS_DICT = { "CD": "Dior Femme",
@@ -33,6 +115,18 @@ GENRES = [
             "All Woman"
         ]
 
+#PLM (Category, Gender) filters behind each type of the GENRES combo
+GENRE_CATEGORIES = {
+            "Optical - Man": [("Optical", "M")],
+            "Optical - Woman": [("Optical", "F")],
+            "Sun - Man": [("Sun", "M")],
+            "Sun - Woman": [("Sun", "F")],
+            "All Man": [("Optical", "M"), ("Sun", "M")],
+            "All Woman": [("Optical", "F"), ("Sun", "F")]
+        }
+
+PLM_COLORWAY_SEPARATOR = "|"    #separator of the colorways grouped per style by the DB
+
 #Materials Dictionary -------------------------------------------
 
 MAT_DICT = {
@@ -135,6 +229,7 @@ CUSTOM_MODEL_IMPORT_UI_VISIBILITY = False
 RENDER_UI_VISIBILITY = True
 VIEW_UI_VISIBILITY = True
 MATERIALS_UI_VISIBILITY = True
+DIAGNOSTICS_UI_VISIBILITY = True
 
 #Styles ------------------------------------------------------
 
@@ -6,6 +6,7 @@ from .window import TheliosToolsWindow
 from .models import TheliosWindowModel
 from .tools.style import style_widgets
 from .logic import TheliosLogic
+from .tools.utils import queries, plm_metrics, scope_index, scope_isolation, prim_index, asset_stat, asset_cache, usd_commands, material_registry, stage_stats, payload_residency
 
 DARK_WINDOW_STYLE = style_widgets.window_style()
 CollapsableFrame_style = style_widgets.collapbsable_style()
@@ -17,8 +18,10 @@ class TheliosExtension(omni.ext.IExt):
         
     def on_startup(self, ext_id):
         
+        usd_commands.register()
         thelios_models = TheliosWindowModel()
         logic = TheliosLogic(thelios_models)
+        self._logic = logic
         
         viewport_window = get_active_viewport_window()
         if viewport_window is not None:
@@ -26,4 +29,20 @@ class TheliosExtension(omni.ext.IExt):
             
     def on_shutdown(self):
         # Clean-up degli handlers e UI
+        if getattr(self, "_logic", None):
+            self._logic.plm_async.shutdown()
+            self._logic.plm_prefetch.stop()
+            self._logic.plm_prefetch.report()
+            self._logic = None
+        queries.shutdown()
+        scope_isolation.shutdown()
+        scope_index.shutdown()
+        prim_index.shutdown()
+        asset_cache.shutdown()
+        asset_stat.shutdown()
+        material_registry.shutdown()
+        payload_residency.shutdown()
+        stage_stats.shutdown()
+        usd_commands.unregister()
+        plm_metrics.METRICS.report()
         self.window = None
\ No newline at end of file
@@ -1,16 +1,19 @@
 import omni.ui as ui
 from omni.ui import color as cl
 import omni.usd
+import omni.kit.commands
 from omni.kit.notification_manager import post_notification, NotificationStatus
 from omni.kit.window.filepicker import FilePickerDialog
 from omni.kit.widget.filebrowser import FileBrowserItem
 
 from thefuzz import process
-from pxr import Sdf, Gf, UsdShade
+from pxr import Sdf, Gf, Usd, UsdShade
 
 import asyncio
 import os
+import re
 import shutil
+import time
 
 from dataclasses import dataclass
 
@@ -18,7 +21,13 @@ from . import constants
 from .models import TheliosWindowModel
 
 from .tools.utils import queries as qu #plm_query, brand_query
-from .tools.utils import usd_tools, template_tools, alerts
+from .tools.utils import plm_async, plm_prefetch
+from .tools.utils.sku_catalog import SKUCatalog
+from .tools.utils.style_trie import StyleTrie
+from .tools.utils import usd_tools, template_tools, alerts, import_preflight, release_sync
+from .tools.utils.stage_stats import get_stage_stats
+from .tools.utils.payload_residency import get_payload_residency
+from .tools.utils.import_job import SKUImportJob
 from .tools.render.custom_render_sequence import OmniCustomSequenceRenderer
 from .tools.render import render_settings
 
@@ -42,9 +51,36 @@ class TheliosLogic:
         
         self.brand_combo = None
         self.type_combo = None
+        # PLM brands, loaded off the main thread; the brand combo shows a loading label until then
+        self.combo_elements = []
+        self.brand_combo_frame = None
+        self.brands_error = None
         self.release_field = None
         self.export_path_field = None
         
+        self.collection_status_label = None
+        
+        # PLM SKUs shared by every panel, plus the models shown in the custom model table
+        self.sku_catalog = SKUCatalog()
+        self.model_styles = []
+        self.sku_loading = False
+        self.sku_loading_label = None
+        self.sku_rows_stack = None
+        self.shown_sku_keys = set()
+        
+        # Model field autocomplete, loaded on the first keystroke
+        self.style_trie = None
+        # Failed trie loads are retried with a growing delay, not on every keystroke
+        self.style_trie_retry_at = 0.0
+        self.style_trie_backoff = constants.MODEL_SUGGESTIONS_RETRY_MIN
+        self.model_suggestions = []
+        self.model_suggestions_frame = None
+        
+        # Chunked SKU import, progress shown in the custom model panel
+        self.import_job = None
+        self.import_status_label = None
+        self.import_status_fn = None
+        
         self.start_slider = None
         self.current_payloads = []
         #self.resolution_combo = None
@@ -55,9 +91,21 @@ class TheliosLogic:
         
         self.alert_instance = alerts.AlertWindow()
         self.usd_tools = usd_tools.USDTools()
+        self.plm_async = plm_async.AsyncPLM(constants.DB_KEY)
+        self.plm_prefetch = plm_prefetch.PLMPrefetcher(self._prefetch_plm_data)
         
         self._tree = constants.MAT_DICT
         
+        # Diagnostics panel: per-SKU statistics, recomputed only for changed SKUs
+        self.stage_stats = get_stage_stats()
+        self.stage_stats_running = False
+        self.composition_confirm_at = 0.0
+        self.diagnostics_status_label = None
+        self.scroll_frame_diagnostics = None
+        
+        # View panel browsing keeps only a budget of SKUs loaded
+        self.residency = get_payload_residency()
+        
     #MARK: FILE DIALOGS
     # File Dialogs ------------------------------------------------------------------------------------
         
@@ -136,9 +184,37 @@ class TheliosLogic:
             else:
                 slider.style = constants.SLIDER_DISABLED_STYLE
         
-    def get_combo_elements(self):
-        combo_elements = qu.pop_combo_brands(constants.DB_KEY)
-        return combo_elements
+    def _load_brands(self):
+        """Fetch the PLM brands on the PLM executor and rebuild the brand combo when they arrive."""
+        if self.combo_elements or self.plm_async.is_pending("brands"):
+            return
+            
+        def _on_result(brands):
+            self.combo_elements = brands
+            self.brands_error = None
+            if self.brand_combo_frame:
+                self.brand_combo_frame.rebuild()
+                
+        def _on_error(error):
+            # Retried on the next Import click
+            self.brands_error = str(error)
+            print(f"PLM brands not loaded: {error}")
+            if self.brand_combo_frame:
+                self.brand_combo_frame.rebuild()
+                
+        self.brands_error = None
+        self.plm_async.submit("brands",
+                                self.plm_async.get_combo_brands(caller="panels.brand_combo"),
+                                on_result=_on_result,
+                                on_error=_on_error)
+        
+    def _build_brand_combo(self):
+        if not self.combo_elements:
+            self.brand_combo = None
+            text = "Brands unavailable (PLM offline)" if self.brands_error else "Loading brands..."
+            ui.Label(text, name="label", height=10)
+            return
+        self.brand_combo = ui.ComboBox(1, *self.combo_elements, height=10, name="brand_choices").model
     
     def get_brand_from_code(self, code):
         key = code[:2]
@@ -150,83 +226,283 @@ class TheliosLogic:
     #MARK: PLM
     # PLM query functions -------------------------------------------------------------------------------
         
+    def _get_model_codes(self) -> list:
+        """
+        Parse the model field into a list of model codes.
+        
+        Accepts a single code or a pasted list separated by spaces, commas,
+        semicolons or new lines. Duplicates are dropped, order is kept.
+        """
+        model_value = self.model.model_model.get_value_as_string()
+        codes = re.split(r"[\s,;]+", model_value.strip().upper())
+        return list(dict.fromkeys(code for code in codes if code))
+        
     def _get_sku_model_plm(self):
             """
-            Retrieve SKU and model data from PLM for the specified model.
-            
-            Queries the PLM system for all SKUs associated with the currently
-            entered model name. Used to populate the SKU selection table.
+            Query PLM for the SKUs of the entered model(s) without blocking the UI.
             
-            Returns:
-                list: List of tuples containing (SKU, Release, Style) data
-                        for the specified model
+            All the models pasted in the field are resolved with one bulk lookup
+            whose rows are streamed into the SKU table batch by batch, so the
+            first SKUs show up while the rest is still loading. SKUs already in
+            the catalog are shown immediately. A newer request (or a new model
+            code typed in the field) cancels this one, so its rows are never painted.
             """
-            model_value = self.model.model_model.get_value_as_string()
-            if model_value == "":
+            model_codes = self._get_model_codes()
+            if not model_codes:
                 self.alert_instance.post_notification_info("Please enter a model name")
                 return
-            else:
-                self.model_sku_res = qu.get_sku_model_plm(constants.DB_KEY, str(model_value))
-                return self.model_sku_res
+            
+            self.sku_loading = True
+            self.model_styles = model_codes
+            self.scroll_frame_custom_model.rebuild()
+            
+            self.plm_async.submit("custom_model",
+                                    self.plm_async.stream_sku_models_plm(model_codes, 
+                                                                        on_batch=self._on_sku_model_plm_batch,
+                                                                        caller="custom_model.sku_lookup"),
+                                    on_result=self._on_sku_model_plm_result,
+                                    on_error=self._on_sku_model_plm_error)
+            
+    def _on_sku_model_plm_batch(self, rows: list):
+        """
+        Store a batch of streamed SKU rows in the catalog and append the new ones to the SKU table.
         
-    def _get_plm_data(self) -> list:
+        Args:
+            rows (list): (Style, Colorway, Season, Style_Name) tuples
+        """
+        filter_value = self._get_release_filter()
+        for style, colorway, season, style_name in rows:
+            # Key by the PLM brand name (as the All Collection rows), not the folder name
+            record = self.sku_catalog.add(constants.BRANDS_DICT.get(style[:2], ""), style, colorway, season, style_name)
+            if self.sku_rows_stack is None or record.key in self.shown_sku_keys:
+                continue
+            if filter_value in record.release:
+                with self.sku_rows_stack:
+                    self._build_sku_row(record)
+                    
+    def _on_sku_model_plm_result(self, count: int):
         """
-        Retrieve product data from PLM system based on current selections.
+        Close the loading state once every SKU row has been streamed.
         
-        Extracts values from the UI dropdowns (brand, type, release) and
-        queries the PLM database for matching products. Handles special
-        cases for "All Woman" and "All Man" types by combining multiple
-        queries for optical and sun categories.
+        Args:
+            count (int): Number of rows received from PLM
+        """
+        self.sku_loading = False
+        if self.sku_loading_label:
+            self.sku_loading_label.visible = False
+            
+        missing = [style for style in self.model_styles if not self.sku_catalog.by_style(style)]
+        if missing:
+            self.alert_instance.post_notification_warning(f"No SKUs found for: {', '.join(missing)}")
+            
+    def _on_sku_model_plm_error(self, error):
+        self.sku_loading = False
+        self.scroll_frame_custom_model.rebuild()
+        self.alert_instance.post_notification_warning(f"ERROR: PLM query failed: {error}")
+        
+    def _on_model_code_changed(self, model):
+        # A new model code makes any pending SKU query stale
+        if self.plm_async.is_pending("custom_model"):
+            self.plm_async.cancel("custom_model")
+            self.sku_loading = False
+            self.scroll_frame_custom_model.rebuild()
+            
+        self._update_model_suggestions()
         
-        Returns:
-            list: Sorted list of tuples containing product data (SKU, Release, etc.)
-                    Returns combined results for "All" categories, single query results otherwise
-        Example:
-            >>> data = self._get_plm_data()
-            >>> # Returns: [('SKU001', 'v1.0', 'Style1'), ('SKU002', 'v1.1', 'Style2')]
+    #MARK: AUTOCOMPLETE
+    # Model code autocomplete ---------------------------------------------------------------------------
+    
+    def _load_style_trie(self):
+        """
+        Build the style-code trie once, off the main thread, from the PLM mirror (or the PLM).
+        
+        A failed (or empty) load is retried after MODEL_SUGGESTIONS_RETRY_MIN
+        seconds, doubling up to MODEL_SUGGESTIONS_RETRY_MAX.
+        """
+        if self.style_trie is not None or self.plm_async.is_pending("style_trie"):
+            return
+        if time.monotonic() < self.style_trie_retry_at:
+            return
+            
+        def _on_result(trie):
+            if not len(trie):
+                _on_error("no styles returned")
+                return
+            self.style_trie = trie
+            self.style_trie_backoff = constants.MODEL_SUGGESTIONS_RETRY_MIN
+            print(f"Model autocomplete ready: {len(trie)} styles")
+            self._update_model_suggestions()
+            
+        def _on_error(error):
+            self.style_trie_retry_at = time.monotonic() + self.style_trie_backoff
+            print(f"Model autocomplete unavailable, retry in {self.style_trie_backoff:.0f} s: {error}")
+            self.style_trie_backoff = min(self.style_trie_backoff * 2, constants.MODEL_SUGGESTIONS_RETRY_MAX)
+            
+        self.plm_async.submit("style_trie",
+                                self.plm_async.run(self._build_style_trie),
+                                on_result=_on_result,
+                                on_error=_on_error)
+        
+    def _build_style_trie(self) -> StyleTrie:
+        return StyleTrie(qu.get_all_styles(constants.DB_KEY, caller="custom_model.autocomplete"))
+        
+    def _update_model_suggestions(self):
         """
-        combo_elements = self.get_combo_elements()
+        Suggest style codes for the code being typed (the last one of a pasted list).
         
-        # Extract current selections from UI
-        brand_model = self.brand_combo.get_item_value_model()
-        brand_index = brand_model.as_int
-        brand_value = combo_elements[brand_index]
+        Suggestions need at least the two-letter brand prefix. A code that is
+        already complete and unique gets no suggestion row.
+        """
+        if self.style_trie is None:
+            self._load_style_trie()
+            return
+            
+        model_value = self.model.model_model.get_value_as_string()
+        current_code = re.split(r"[\s,;]+", model_value.upper())[-1]
+        
+        suggestions = self.style_trie.suggest(current_code, constants.MODEL_SUGGESTIONS_LIMIT)
+        if suggestions == [current_code]:
+            suggestions = []
+            
+        if suggestions != self.model_suggestions:
+            self.model_suggestions = suggestions
+            if self.model_suggestions_frame:
+                self.model_suggestions_frame.rebuild()
+                
+    def _build_model_suggestions(self):
+        if not self.model_suggestions:
+            return
+            
+        with ui.HStack(height=0, spacing=4):
+            for code in self.model_suggestions:
+                ui.Button(code, 
+                            height=16, 
+                            clicked_fn=lambda c=code: self._apply_model_suggestion(c))
+                            
+    def _apply_model_suggestion(self, code: str):
+        # Replace only the code being typed, keep the rest of a pasted list
+        model_value = self.model.model_model.get_value_as_string()
+        self.model.model_model.set_value(re.sub(r"[^\s,;]*$", code, model_value, count=1))
+            
+    def _get_plm_selection(self):
+        """Read season, brand and type from the All Collection panel widgets."""
+        # Extract current selections from UI (combo texts, no PLM round trip on the main thread)
+        brand_value = self._get_selected_text(self.brand_combo)
         
         type_model = self.type_combo.get_item_value_model()
         type_index = type_model.as_int
         type_value = constants.GENRES[type_index]
         
-        season_value = self.model.int_model.get_value_as_int()
+        season_value = self.model.release_model.get_value_as_int()
+        
+        return str(season_value), str(brand_value), str(type_value)
+        
+    def _prefetch_plm_data(self, key: tuple) -> list:
+        season_value, brand_value, type_value = key
+        return qu.get_plm_data_multi(constants.DB_KEY, season_value, brand_value, 
+                                        constants.GENRE_CATEGORIES[type_value],
+                                        caller="collection.prefetch")
+                                        
+    def _get_plm_neighbour_keys(self, key: tuple) -> list:
+        """Likely next (season, brand, type) selections: next brand in the combo, next season, other gender."""
+        brands = []
+        if self.brand_combo:
+            brands = [self.brand_combo.get_item_value_model(child).as_string 
+                        for child in self.brand_combo.get_item_children()]
+        return plm_prefetch.neighbour_keys(*key, brands)
+            
+    def _get_plm_data_async(self, on_batch=None, on_done=None):
+        """
+        Run the All Collection PLM query on the PLM executor.
         
-        print(f"+++ Season: {season_value}")
-        print(f"--- Brand: {brand_value}")
-        print(f"*** Type: {type_value}")
+        The panel status label shows the loading state and then the result
+        count. Pressing Import again supersedes the pending query. Selections
+        already in the prefetch cache are answered without a query, and the
+        likely next selections are prefetched in the background.
         
-        # Handle combined queries for "All Woman" category
-        if type_value == "All Woman":
-            res_query_optical_woman = qu.get_plm_data(constants.DB_KEY,str(season_value),str(brand_value),"Optical - Woman")
-            res_query_sun_woman = qu.get_plm_data(constants.DB_KEY,str(season_value),str(brand_value),"Sun - Woman")
-            
-            res_query_sun = list(set(res_query_optical_woman).union(set(res_query_sun_woman)))
-            sorted_list = sorted(res_query_sun, key=lambda x: x[0])
-            print(sorted_list)
-            return sorted_list
+        Args:
+            on_batch (callable): Optional callback receiving each batch of result rows
+            on_done (callable): Optional callback receiving every result row once the query is done
+        """
+        key = self._get_plm_selection()
+        season_value, brand_value, type_value = key
+        
+        # Prefetched (or recently loaded) selection: answer at once
+        cached = self.plm_prefetch.get(key)
+        if cached is not None:
+            self.plm_async.cancel("collection")
+            self.sku_catalog.add_collection(brand_value, season_value, cached)
+            self._set_collection_status(f"{len(cached)} models found")
+            if on_batch:
+                on_batch(cached)
+            self.plm_prefetch.schedule(self._get_plm_neighbour_keys(key))
+            if on_done:
+                on_done(cached)
+            return
             
-        # Handle combined queries for "All Man" category
-        elif type_value == "All Man":
-            res_query_optical_man = qu.get_plm_data(constants.DB_KEY,str(season_value),str(brand_value),"Optical - Man")
-            res_query_sun_man = qu.get_plm_data(constants.DB_KEY,str(season_value),str(brand_value),"Sun - Man")
+        self._set_collection_status("Loading PLM data...")
+        fetched = []
+        
+        def _on_batch(rows):
+            fetched.extend(rows)
+            self.sku_catalog.add_collection(brand_value, season_value, rows)
+            self._set_collection_status(f"Loading PLM data... {len(fetched)} models")
+            if on_batch:
+                on_batch(rows)
+                
+        def _on_result(count):
+            self._set_collection_status(f"{count} models found")
+            self.plm_prefetch.put(key, fetched)
+            self.plm_prefetch.schedule(self._get_plm_neighbour_keys(key))
+            if on_done:
+                on_done(fetched)
+                
+        def _on_error(error):
+            self._set_collection_status("PLM query failed")
+            self.alert_instance.post_notification_warning(f"ERROR: PLM query failed: {error}")
             
-            result_query_man = list(set(res_query_optical_man).union(set(res_query_sun_man)))
-            sorted_list = sorted(result_query_man, key=lambda x: x[0])
-            print(sorted_list)
-            return sorted_list
+        category_genders = constants.GENRE_CATEGORIES[type_value]
+        self.plm_async.submit("collection",
+                                self.plm_async.stream_plm_data_multi(season_value, brand_value, category_genders, 
+                                                                        on_batch=_on_batch,
+                                                                        caller="collection.import"),
+                                on_result=_on_result,
+                                on_error=_on_error)
+        
+    def _import_collection(self):
+        """
+        Import the whole season/brand/type selection as unloaded payloads.
+        
+        Every (style, colorway) of the PLM answer goes into the standard SKU
+        hierarchy through the preflight and the chunked import, as a payload
+        left unloaded: no SKU file is opened, so building hundreds of SKUs
+        takes seconds and almost no memory. A SKU loads when it is viewed
+        (View panel) or rendered.
+        """
+        if self._import_busy():
+            self.alert_instance.post_notification_warning("An import is already running")
+            return
+        if self.brand_combo is None:
+            self._set_collection_status("Brands not loaded yet")
+            self._load_brands()
+            return
+        season_value = self._get_plm_selection()[0]
+        
+        def _on_done(rows):
+            items = [((style, colorway, season_value), self._sku_payload_path(style, colorway))
+                        for style, *colorways in rows
+                        for colorway in colorways]
+            if not items:
+                self._set_collection_status("No SKU found")
+                return
+            self._set_collection_status(f"Importing {len(items)} SKUs...")
+            self._start_import_job(items, as_payload=True, status_fn=self._set_collection_status)
             
-        # Handle single category queries
-        else:
-            res_query = qu.get_plm_data(constants.DB_KEY,str(season_value),str(brand_value),str(type_value))
-            print(res_query)
-            return res_query
+        self._get_plm_data_async(on_done=_on_done)
+        
+    def _set_collection_status(self, text: str):
+        if self.collection_status_label:
+            self.collection_status_label.text = text
             
     #MARK: PAYLOADS/REF
     # Payloads selection functions ---------------------------------------------------------------------
@@ -249,7 +525,7 @@ class TheliosLogic:
             """
             #self.scroll_frame = self.create_scrolling_frame()
             self.show_labels = True
-            self.scroll_frame_custom_model.rebuild()  # Update ScrollingFrame content
+            self._get_sku_model_plm()  # Fills the ScrollingFrame when PLM answers
         
     def _get_selected_items_payloads(self):
         """
@@ -259,15 +535,15 @@ class TheliosLogic:
         the SKU and release data for items that are currently checked.
         
         Returns:
-            list: List of tuples containing (SKU, Release) for selected items
+            list: List of tuples containing (Model, SKU, Release) for selected items
                 
         Example:
             >>> selected = self._get_selected_items()
             >>> print(selected)
-            [('001', '261'), ('003', '262')]
+            [('CD40153U', '001', '261'), ('CD40153U', '003', '262')]
         """
         selected_items = [
-            (data['sku'], data['release']) 
+            (data['record'].style, data['record'].colorway, data['record'].release) 
             for data in self.checkbox_data 
             if data['checkbox'].model.get_value_as_bool()
         ]
@@ -287,70 +563,90 @@ class TheliosLogic:
         - Release version
         - Selection checkbox
         
-        The table is populated based on PLM query results and includes
-        checkbox state management for batch operations.
+        The table is populated from the SKU catalog (filled by the PLM
+        query results) and includes checkbox state management for batch
+        operations.
         """
         self.checkbox_data = []  # Reset data storage
-        sku_rel_list = self._get_sku_model_plm()
+        self.shown_sku_keys = set()
+        self.sku_rows_stack = None
+        self.sku_loading_label = None
         
-        if sku_rel_list == []:
-            self.alert_instance.post_notification_warning("No SKUs found for the specified model")
+        if not self.show_labels:
             return
-        else:
-        
-            # Apply filter if filter value is set
-            if hasattr(self, 'apply_filter') and self.apply_filter:
-                filter_value = self.model.int_filter_model.get_value_as_string().strip()
-                if filter_value:
-                    # Filter tuples where the second element (release) contains the filter value
-                    sku_rel_list = [item for item in sku_rel_list if filter_value in str(item[1])]
-                    print(f"Filtered results for release containing '{filter_value}': {len(sku_rel_list)} items")
-            
-            if self.show_labels:
-                with ui.VStack(spacing=0):
-                    for item in sku_rel_list:
-                        with ui.HStack():
-                            # Style name in green
-                            style_label = ui.Label(item[2],
-                                                    height=16, 
-                                                    style={"font_size":14, "color":cl("#77b901")}, 
-                                                    alignment=ui.Alignment.CENTER)
-                            # SKU identifier
-                            sku_label = ui.Label(item[0], 
-                                                height=16, 
-                                                style={"font_size":16}, 
-                                                alignment=ui.Alignment.CENTER)
-                            # Release version
-                            release_label = ui.Label(item[1], 
-                                                    height=16, 
-                                                    style={"font_size":16}, 
-                                                    alignment=ui.Alignment.CENTER)
-                            
-                            ui.Spacer()
-                            # Selection checkbox
-                            checkbox = ui.CheckBox(width=30, 
-                                                height=16, 
-                                                style={"color":cl("#77b901"), "background_color": cl(0.35)})
-                            
-                            # Store checkbox reference and associated data
-                            self.checkbox_data.append({
-                                'checkbox': checkbox,
-                                'sku': item[0],
-                                'release': item[1]
-                            })
+            
+        # Apply filter if filter value is set (only the matching releases are visited)
+        filter_value = self._get_release_filter()
+        sku_rel_list = self.sku_catalog.query(styles=self.model_styles, release=filter_value)
+        if filter_value:
+            print(f"Filtered results for release containing '{filter_value}': {len(sku_rel_list)} items")
+            
+        with ui.VStack(spacing=0, height=0):
+            self.sku_loading_label = ui.Label("Loading SKUs from PLM...", 
+                                            height=16, 
+                                            alignment=ui.Alignment.CENTER,
+                                            visible=self.sku_loading)
+            # Streamed batches are appended to this stack (see _on_sku_model_plm_batch)
+            self.sku_rows_stack = ui.VStack(spacing=0, height=0)
+            with self.sku_rows_stack:
+                for record in sku_rel_list:
+                    self._build_sku_row(record)
+                    
+    def _build_sku_row(self, record):
+        """Add one SKU row (style name, SKU, release, checkbox) to the current container."""
+        with ui.HStack():
+            # Style name in green
+            style_label = ui.Label(record.style_name,
+                                    height=16, 
+                                    style={"font_size":14, "color":cl("#77b901")}, 
+                                    alignment=ui.Alignment.CENTER)
+            # SKU identifier
+            sku_label = ui.Label(record.colorway, 
+                                height=16, 
+                                style={"font_size":16}, 
+                                alignment=ui.Alignment.CENTER)
+            # Release version
+            release_label = ui.Label(record.release, 
+                                    height=16, 
+                                    style={"font_size":16}, 
+                                    alignment=ui.Alignment.CENTER)
+            
+            ui.Spacer()
+            # Selection checkbox
+            checkbox = ui.CheckBox(width=30, 
+                                height=16, 
+                                style={"color":cl("#77b901"), "background_color": cl(0.35)})
+            
+        # Store checkbox reference and associated catalog record
+        self.checkbox_data.append({
+            'checkbox': checkbox,
+            'record': record
+        })
+        self.shown_sku_keys.add(record.key)
+        
+    def _get_release_filter(self) -> str:
+        """Release filter of the SKU table, "" when no filter is applied."""
+        if not self.apply_filter:
+            return ""
+        return self.model.int_filter_model.get_value_as_string().strip()
         
     def _create_hierarchy_and_import_payload(self):
         """
         Create USD hierarchy and import payloads for selected SKUs.
         
         This is the main batch import function that:
-        1. Gets the current USD stage context
-        2. Retrieves the model name from UI
-        3. Gets all selected SKUs from checkboxes
-        4. For each selected SKU:
-            - Creates the standardized USD hierarchy
-            - Constructs the payload file path
-            - Imports the USD payload
+        1. Gets all selected SKUs from checkboxes (with their model code,
+           so a pasted list of models is imported in one go)
+        2. Constructs the payload file path of each selected SKU
+        3. Preflight: stats every payload file concurrently on the PLM
+           executor (the UI stays responsive) and reports the
+           present / stale / missing ones before anything is authored
+           (nothing is imported if every file is missing)
+        4. Starts an SKUImportJob for the SKUs whose file exists: chunk by
+           chunk, it creates the standardized USD hierarchy and references
+           the payloads, yielding to Kit between chunks with progress in
+           the panel; Cancel stops it at the next chunk boundary
+        5. Posts one summary notification when the job ends
         
         The function integrates with the usd_tools module to perform
         the actual USD operations and uses the configuration paths
@@ -363,38 +659,208 @@ class TheliosLogic:
             -> Imports payloads from Model_001.usd and Model_002.usd
         """
         
-        model_value = self.model.model_model.get_value_as_string()
-        print(model_value)
+        if self._import_busy():
+            self.alert_instance.post_notification_warning("An import is already running")
+            return
         
-        # Get selected SKUs from checkboxes
+        # Get selected SKUs from checkboxes (each row carries its own model code)
         get_selected = self._get_selected_items_payloads()
+        self._start_import_job([(data, self._sku_payload_path(data[0], data[1])) for data in get_selected])
+        
+    def _start_import_job(self, items: list, as_payload: bool = False, status_fn=None):
+        """
+        Preflight the (sku data, payload file) items and import the present ones chunk by chunk.
+        
+        Returns right away: the preflight runs on the PLM executor and the
+        import job starts when it completes. Cancel drops a pending preflight.
         
-        # Process each selected SKU
-        for data in get_selected:
-            sku = data[0]
-            release = data[1]
+        Args:
+            items (list): (sku data, payload file path) tuples
+            as_payload (bool): Author unloaded payloads instead of references
+            status_fn (callable): Extra status label to report progress on
+        """
+        self.import_status_fn = status_fn
+        items = list(items)
+        self._set_import_status(f"Checking {len(items)} SKU files...")
+        # Every payload file is stat'ed on the PLM executor, before authoring anything
+        self.plm_async.submit("import_preflight",
+                                self.plm_async.run(import_preflight.preflight, items),
+                                on_result=lambda report: self._on_import_preflight(report, items, as_payload),
+                                on_error=self._on_import_preflight_error)
+        
+    def _on_import_preflight(self, report: import_preflight.PreflightReport, items: list, as_payload: bool):
+        report.report()
+        importable = report.importable
+        if not importable:
+            if items:
+                self._set_import_status(f"Nothing imported: {report.summary()}")
+                self.alert_instance.post_notification_warning(f"No SKU file found, nothing imported ({report.summary()})")
+            return
+        if report.missing or report.stale:
+            self.alert_instance.post_notification_warning(f"Import preflight: {report.summary()} (see console)")
+        
+        # Hierarchy and references are authored chunk by chunk (the files were just checked by the preflight)
+        self.import_job = SKUImportJob(self.usd_tools, importable, on_progress=self._on_import_progress,
+                                        as_payload=as_payload)
+        self._set_import_status(f"Importing SKUs 0/{self.import_job.total}")
+        asyncio.ensure_future(self._run_import_job(self.import_job))
+        
+    def _on_import_preflight_error(self, error: Exception):
+        self._set_import_status("Import preflight failed")
+        self.alert_instance.post_notification_warning(f"ERROR: import preflight failed: {error}")
+        
+    def _import_busy(self) -> bool:
+        """True while an import is being preflighted or authored."""
+        return bool(self.import_job and self.import_job.running) or self.plm_async.is_pending("import_preflight")
+        
+    async def _run_import_job(self, job: SKUImportJob):
+        created, failed = await job.run()
+        
+        summary = f"{len(created)} of {job.total} SKUs imported in {job.elapsed:.1f} s ({job.rate:.1f} SKU/s)"
+        if job.as_payload:
+            summary += ", unloaded"
+        print(f"SKU import: {summary}")
+        if job.error:
+            self._set_import_status(f"Import failed: {summary}")
+            self.alert_instance.post_notification_warning(f"ERROR: import failed, {summary} (see console)")
+        elif job.cancelled:
+            self._set_import_status(f"Import cancelled: {summary}")
+            self.alert_instance.post_notification_warning(f"Import cancelled: {summary}")
+        else:
+            self._set_import_status(summary)
+            self.usd_tools.notify_references_summary(len(created), len(failed))
             
-            # Create USD hierarchy structure
-            self.usd_tools.create_hierarchy_structure(self._stage, model_value, sku, release)
+    def _sync_release(self):
+        """
+        Bring the imported SKUs of the models in the table in line with PLM.
+        
+        The plan is built from a fresh PLM answer for the table models, not
+        from the session catalog: their catalog records (and their rows in
+        the PLM mirror) are replaced first, so a SKU dropped in PLM since it
+        was looked up is removed from the scene too. The PLM SKUs (restricted
+        to the release filter, if applied) are compared with the SKU scopes in
+        the scene and only the difference is applied: dropped SKUs are removed
+        and moved usd files retargeted (one undo entry), new SKUs go through
+        the regular preflight and chunked import. Models whose PLM answer is
+        empty are left untouched.
+        """
+        if self._import_busy() or self.plm_async.is_pending("release_sync"):
+            self.alert_instance.post_notification_warning("An import is already running")
+            return
+        if self.sku_loading:
+            self.alert_instance.post_notification_warning("PLM SKUs are still loading, sync when the table is complete")
+            return
+        
+        stage = omni.usd.get_context().get_stage()
+        models = list(self.model_styles)
+        if not stage or not models:
+            self.alert_instance.post_notification_info("Select a model first")
+            return
+        
+        self._set_import_status(f"Release sync: checking {len(models)} models in PLM...")
+        self.plm_async.submit("release_sync",
+                                self.plm_async.get_sku_models_plm_fresh(models, caller="custom_model.release_sync"),
+                                on_result=lambda rows: self._on_release_sync_rows(stage, models, rows),
+                                on_error=self._on_release_sync_error)
+        
+    def _on_release_sync_rows(self, stage: Usd.Stage, models: list, rows: list):
+        """
+        Replace the catalog records of ``models`` with the fresh PLM rows and plan the sync.
+        
+        Args:
+            stage (Usd.Stage): Stage the sync was requested on
+            models (list): Model codes of the table
+            rows (list): (Style, Colorway, Season, Style_Name) tuples
+        """
+        shown = {record.key for record in self.sku_catalog.query(styles=models)}
+        self.sku_catalog.drop_styles(models)
+        for style, colorway, season, style_name in rows:
+            self.sku_catalog.add(constants.BRANDS_DICT.get(style[:2], ""), style, colorway, season, style_name)
+        if shown != {record.key for record in self.sku_catalog.query(styles=models)}:
+            self.scroll_frame_custom_model.rebuild()
+        
+        if stage != omni.usd.get_context().get_stage():
+            self._set_import_status("Release sync cancelled: the stage changed")
+            return
+        found = {row[0] for row in rows}
+        models = [style for style in models if style in found]
+        if not models:
+            self._set_import_status("Release sync: no SKUs found in PLM")
+            self.alert_instance.post_notification_warning("Release sync: no SKUs found in PLM, nothing changed")
+            return
+        
+        filter_value = self._get_release_filter()
+        records = self.sku_catalog.query(styles=models, release=filter_value)
+        desired = [((rec.style, rec.colorway, rec.release), self._sku_payload_path(rec.style, rec.colorway)) for rec in records]
+        release_match = (lambda release: filter_value in release) if filter_value else None
+        plan = release_sync.plan_release_sync(stage, desired, models, release_match)
+        plan.report()
+        
+        if plan.empty:
+            self._set_import_status(f"Release already in sync ({plan.unchanged} SKUs)")
+            self.alert_instance.post_notification_info(f"Release already in sync ({plan.unchanged} SKUs)")
+            return
+        
+        if not plan.retarget:
+            self._apply_release_sync(stage, plan)
+            return
+        # Never retarget a reference to a file that is not there (stat'ed on the PLM executor)
+        self._set_import_status(f"Release sync: checking {len(plan.retarget)} moved SKU files...")
+        self.plm_async.submit("import_preflight",
+                                self.plm_async.run(import_preflight.preflight, list(plan.retarget)),
+                                on_result=lambda report: self._apply_release_sync(stage, plan, report),
+                                on_error=self._on_import_preflight_error)
+        
+    def _apply_release_sync(self, stage: Usd.Stage, plan: release_sync.ReleaseSyncPlan,
+                                retarget_report: import_preflight.PreflightReport = None):
+        if retarget_report is not None:
+            retarget_report.report()
+            plan.retarget = retarget_report.importable
+        if stage != omni.usd.get_context().get_stage():
+            self._set_import_status("Release sync cancelled: the stage changed")
+            return
+        
+        if plan.remove or plan.retarget:
+            omni.kit.commands.execute("SyncReleaseReferences",
+                                        remove=[scene_sku.scope_path for scene_sku in plan.remove],
+                                        retarget=[(scene_sku.reference_path, scene_sku.asset_path, asset_path)
+                                                    for scene_sku, asset_path in plan.retarget])
+            self.usd_tools.asset_cache.prefetch(asset_path for _, asset_path in plan.retarget)
+        
+        self._set_import_status(f"Release sync: {plan.summary()}")
+        self.alert_instance.post_notification_info(f"Release sync: {plan.summary()}")
+        if plan.add:
+            self._start_import_job(plan.add)
             
-            # Construct paths for payload import
-            sku_prim_path = f"/World/Models/glass_Xform/{model_value}_Xform/Release_{release}/{model_value}_{sku}"
-            main_usd_dir = constants.BLOB_USD_PATH
-            brand_name = self.get_brand_from_code(model_value)
-            payload_file_path = f"{main_usd_dir}\\{brand_name}\\01_Models\\{model_value}\\sku\\{model_value}_{sku}.usd"
+    def _on_release_sync_error(self, error):
+        # A stale answer must not drive removals: nothing is changed
+        self._set_import_status("Release sync failed: PLM unreachable")
+        self.alert_instance.post_notification_warning(f"ERROR: release sync needs the PLM, nothing changed: {error}")
             
-            print(f" --> {payload_file_path}")
-            print(f" --> {sku_prim_path}")
+    def _on_import_progress(self, job: SKUImportJob):
+        self._set_import_status(job.progress_text())
+        
+    def _cancel_import(self):
+        if self.plm_async.is_pending("release_sync"):
+            self.plm_async.cancel("release_sync")
+            self._set_import_status("Release sync cancelled")
+        elif self.plm_async.is_pending("import_preflight"):
+            self.plm_async.cancel("import_preflight")
+            self._set_import_status("Import cancelled before authoring")
+        elif self.import_job and self.import_job.running:
+            self.import_job.cancel()
+            self._set_import_status("Cancelling import...")
             
-            # Import the payload
-            #self.usd_tools.import_payload(payload_file_path, sku_prim_path)
-            self.usd_tools.create_reference_under_parent(
-                asset_usd_path=payload_file_path, 
-                prim_in_file="",
-                parent_path=sku_prim_path,
-                local_name=f"{model_value}_{sku}")
+    def _set_import_status(self, text: str):
+        if self.import_status_label:
+            self.import_status_label.text = text
+        if self.import_status_fn:
+            self.import_status_fn(text)
             
-        self.alert_instance.post_notification_info("Payloads imported successfully")
+    def _sku_payload_path(self, model_value: str, sku: str) -> str:
+        main_usd_dir = constants.BLOB_USD_PATH
+        brand_name = self.get_brand_from_code(model_value)
+        return f"{main_usd_dir}\\{brand_name}\\01_Models\\{model_value}\\sku\\{model_value}_{sku}.usd"
     
     #MARK: RENDER
     # Rendering section --------------------------------------------------------------------------------
@@ -554,9 +1020,7 @@ class TheliosLogic:
             raise
             
     def _render_selected_skus_async(self, res_combo):
-        payload_list = self.usd_tools.get_filtered_scopes()
-        
-        if payload_list == []:
+        if len(self.usd_tools.scope_index) == 0:
             self.alert_instance.post_notification_warning("No SKUs selected for rendering")
             return
         else:
@@ -603,8 +1067,7 @@ class TheliosLogic:
         
         with ui.VStack(spacing=0):
                 for item in payload_list:
-                    model = item.split("_")[0]
-                    sku = item.split("_")[1]
+                    model, sku = self.sku_catalog.split_scope(item)
                     
                     with ui.HStack():
                         # Style name in green
@@ -710,6 +1173,11 @@ class TheliosLogic:
         self.show_labels = False
         self.checkbox_data = []
         self.checkbox_render_data = []
+        self.plm_async.cancel("custom_model")
+        self.sku_loading = False
+        self.model_styles = []
+        self.sku_rows_stack = None
+        self.sku_catalog.clear()    # SKUs of the cleared selection must not feed the next lookup or import
         self.scroll_frame_custom_model.clear()
         
         print("Cleared all data and filters")
@@ -719,7 +1187,6 @@ class TheliosLogic:
         
     def import_camera(self):
         print("--- Import: Camera ---")
-        self.combo_elements = self.get_combo_elements()
         #self.brand_camera_model = brand_camera_combo.get_item_value_model()
         template_tools._import_camera(  self._stage, 
                                         #self.brand_camera_model, 
@@ -810,16 +1277,15 @@ class TheliosLogic:
         self._get_payloads_lenght()
                     
     def _get_selected_scope(self, combobox_model):
-        payload_list = self.usd_tools.get_filtered_scopes()
-        
         combo_string = combobox_model.get_item_value_model()
         combo_string_index = combo_string.as_int
-        combo_string_value = payload_list[combo_string_index]
+        combo_string_value = self.usd_tools.scope_index[combo_string_index]
         
         print(f" ----------- Selected scope: {combo_string_value}")
         
         scopes_to_keep = constants.SCOPES_TO_KEEP
         print(f"Selected scope: {combo_string}")
+        self._load_viewed_sku(combo_string_value)
         self.usd_tools.hide_all_scopes_except(combo_string_value, scopes_to_keep)
         
     def _get_selected_scope_string(self, model_string):
@@ -827,26 +1293,34 @@ class TheliosLogic:
         print(f" ----------- Selected scope: {model_string}")
         
         scopes_to_keep = constants.SCOPES_TO_KEEP
+        self._load_viewed_sku(model_string)
         self.usd_tools.hide_all_scopes_except(model_string, scopes_to_keep)
         
+    def _load_viewed_sku(self, model_string):
+        # Keep the viewed SKU and its slider neighbours loaded, unload the least recently viewed ones
+        if constants.PAYLOAD_RESIDENCY_ENABLED:
+            self.residency.visit(model_string)
+        else:
+            # SKUs of a collection import are unloaded until viewed, and unloaded again when the view moves on
+            self.residency.view_only(model_string)
+            
+    def _show_all_scopes(self):
+        self.usd_tools.show_all_scopes()
+        
     def _build_view_slider(self):
-        payload_list = self.usd_tools.get_filtered_scopes()
-        len_payloads = len(payload_list)
+        len_payloads = len(self.usd_tools.scope_index)
         self.start_slider = ui.IntSlider(value=1,min=1, max=len_payloads, step=1, style={"margin":3}).model
         return self.start_slider
     
     def _on_slider_changed(self, value):
         print(f"Slider value: {value}")
-        payload_list = self.usd_tools.get_filtered_scopes()
-        
-        current_model_selected = payload_list[value.as_int - 1]
+        current_model_selected = self.usd_tools.scope_index[value.as_int - 1]
         self._get_selected_scope_string(current_model_selected)
         
         self.model.slider_view_model.set_value(str(current_model_selected))
             
     def _get_payloads_lenght(self):
-        payload_list = self.usd_tools.get_filtered_scopes()
-        return len(payload_list)
+        return len(self.usd_tools.scope_index)
         
         #need some fixes here
         
@@ -967,10 +1441,85 @@ class TheliosLogic:
             )
     
     def _get_in_scene_materials(self):
-        stage = omni.usd.get_context().get_stage()
-        materials = self.usd_tools.get_materials_in_looks_scope(stage)
-        
-        mat_names = [mat.GetName() for mat in materials]
+        # Material registry lookup, /World/Looks is not traversed
+        mat_names = self.usd_tools.material_registry.names()
         #print(f"Materials in scene: {mat_names}")
         return mat_names
-        
\ No newline at end of file
+        
+    
+    #MARK: DIAGNOSTICS
+    # Stage statistics section ------------------------------------------------------------------------
+    
+    def _set_diagnostics_status(self, text: str):
+        if self.diagnostics_status_label:
+            self.diagnostics_status_label.text = text
+            
+    def _collect_stage_stats(self):
+        if self.stage_stats_running:
+            return
+        asyncio.ensure_future(self._collect_stage_stats_async())
+        
+    async def _collect_stage_stats_async(self):
+        self.stage_stats_running = True
+        try:
+            def on_progress(done, total):
+                self._set_diagnostics_status(f"Profiling SKUs... {done}/{total}")
+                
+            await self.stage_stats.collect_async(on_progress=on_progress)
+            totals = self.stage_stats.totals()
+            self._set_diagnostics_status(f"{totals['skus']} SKUs - {totals['prims']} prims - "
+                                            f"{totals['meshes']} meshes - ~{totals['approx_mb']} MB - "
+                                            f"{totals['payloads_loaded']}/{totals['payloads']} payloads loaded")
+            self.stage_stats.report()
+        except Exception as e:
+            print(f"Stage statistics failed: {e}")
+            self._set_diagnostics_status("Profiling failed, see console")
+        finally:
+            self.stage_stats_running = False
+            
+        if self.scroll_frame_diagnostics:
+            self.scroll_frame_diagnostics.rebuild()
+            
+    def _measure_composition(self):
+        # Opt-in: the probe re-composes the whole scene, a second click confirms
+        now = time.monotonic()
+        if now - self.composition_confirm_at > constants.STAGE_STATS_CONFIRM_SECONDS:
+            self.composition_confirm_at = now
+            self._set_diagnostics_status("Composition re-opens the scene and can double its memory: "
+                                            "click again to run")
+            return
+        self.composition_confirm_at = 0.0
+        composition = self.stage_stats.measure_composition()
+        if not composition:
+            self.alert_instance.post_notification_warning("No stage open")
+            return
+        self._set_diagnostics_status(f"Composition {composition['composition_ms']} ms - "
+                                        f"traverse {composition['traverse_ms']} ms - "
+                                        f"{composition['prims']} prims - {composition['layers']} layers")
+        
+    def _export_stage_stats(self):
+        if not self.stage_stats.last:
+            self.alert_instance.post_notification_warning("Collect the stage statistics first")
+            return
+        path = self.stage_stats.export_json()
+        print(f"Stage statistics exported to {path}")
+        self.alert_instance.post_notification_info(f"Stage statistics exported to {path}")
+        
+    def _report_asset_cache(self):
+        asset_cache = self.usd_tools.asset_cache
+        asset_cache.report()
+        self._set_diagnostics_status(f"Asset cache: {asset_cache.summary()}")
+        
+    def _build_scrolling_content_diagnostics(self):
+        rows = sorted(self.stage_stats.last, key=lambda r: r.approx_bytes, reverse=True)
+        
+        with ui.VStack(spacing=0):
+            for row in rows[:constants.STAGE_STATS_TOP_SKUS]:
+                with ui.HStack(height=16):
+                    ui.Label(row.name, style={"font_size":14, "color":cl("#28bfe9")})
+                    ui.Label(f"{row.meshes} meshes", width=80, alignment=ui.Alignment.RIGHT)
+                    ui.Label(f"{row.points} pts", width=90, alignment=ui.Alignment.RIGHT)
+                    ui.Label(f"{len(row.layers)} layers", width=70, alignment=ui.Alignment.RIGHT)
+                    ui.Label(f"~{row.approx_mb} MB", width=80, alignment=ui.Alignment.RIGHT)
+                    ui.Label("loaded" if row.loaded else "unloaded", width=70, alignment=ui.Alignment.RIGHT,
+                                style={"color":cl(0.9) if row.loaded else cl("#e9a228")})
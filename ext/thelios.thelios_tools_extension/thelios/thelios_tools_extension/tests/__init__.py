@@ -9,3 +9,5 @@
 # its affiliates is strictly prohibited.
 
 from .test_hello_world import *
+from .test_plm_mirror import *
+from .test_plm_client import *
@@ -0,0 +1,36 @@
+import omni.kit.test
+
+from thelios.thelios_tools_extension.tools.utils.plm_client import PLMConnectionPool
+
+
+class _Connection:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class TestPLMConnectionPool(omni.kit.test.AsyncTestCase):
+
+    async def test_close_discards_checked_out_connections(self):
+        pool = PLMConnectionPool(_Connection, max_size=2, timeout=1)
+
+        with pool.connection() as busy:
+            with pool.connection() as idle:
+                pass
+            # Extension shutdown while a streamed query still holds a connection
+            pool.close()
+            self.assertTrue(idle.closed)
+            self.assertFalse(busy.closed)
+
+        self.assertTrue(busy.closed)
+        self.assertTrue(pool._idle.empty())
+
+    async def test_no_checkout_after_close(self):
+        pool = PLMConnectionPool(_Connection, max_size=1, timeout=1)
+        pool.close()
+
+        with self.assertRaises(RuntimeError):
+            with pool.connection():
+                pass
@@ -0,0 +1,94 @@
+import sqlite3
+import tempfile
+from pathlib import Path
+
+import omni.kit.test
+
+from thelios.thelios_tools_extension.tools.utils import queries
+from thelios.thelios_tools_extension.tools.utils.plm_client import PLMClient
+from thelios.thelios_tools_extension.tools.utils.plm_mirror import PLMMirror
+
+TABLE = "vw_render_style_sku"
+
+# PLM stand-in rows: (Style, Colorway, Season, Brand, Category, Gender, Style_Name)
+ROWS = [
+    ("CD40153U", "32P", "262", "Dior", "Optical", "F", "DIORSIGNATURE"),
+    ("CD40153U", "01A", "262", "Dior", "Optical", "F", "DIORSIGNATURE"),
+    ("CD40153U", None, "262", "Dior", "Optical", "F", "DIORSIGNATURE"),
+    ("CD40154U", None, "262", "Dior", "Optical", "F", "DIORCLUB"),
+]
+
+
+class TestPLMMirror(omni.kit.test.AsyncTestCase):
+
+    async def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        plm_path = Path(self._tmp.name, "plm_standin.db")
+        self._plm_path = plm_path
+
+        conn = sqlite3.connect(plm_path)
+        conn.execute(f"""CREATE TABLE {TABLE} (
+                            [Style] TEXT, [Colorway] TEXT, [Season] TEXT, [Brand] TEXT,
+                            [Category] TEXT, [Gender] TEXT, [Style_Name] TEXT)""")
+        conn.executemany(f"INSERT INTO {TABLE} VALUES (?,?,?,?,?,?,?)", ROWS)
+        conn.commit()
+        conn.close()
+
+        self.client = PLMClient(table=TABLE, connect_fn=lambda: sqlite3.connect(plm_path, check_same_thread=False))
+        self.mirror = PLMMirror(self.client, db_path=Path(self._tmp.name, "mirror.sqlite"), modified_column=None)
+
+        # Serve queries.py lookups from the stand-in
+        self.db_key = f"standin:{plm_path}"
+        queries._clients[self.db_key] = self.client
+        queries._mirrors[self.db_key] = self.mirror
+
+    async def tearDown(self):
+        queries._clients.pop(self.db_key, None)
+        queries._mirrors.pop(self.db_key, None)
+        self.client.close()
+        self._tmp.cleanup()
+
+    async def test_full_sync_skips_null_colorways(self):
+        self.assertEqual(self.mirror.sync(), len(ROWS))
+        self.assertTrue(self.mirror.is_ready())
+
+        skus = sorted(self.mirror.get_styles_skus(["CD40153U", "CD40154U"]))
+        self.assertEqual(skus, [("CD40153U", "01A", "262", "DIORSIGNATURE"),
+                                ("CD40153U", "32P", "262", "DIORSIGNATURE")])
+
+    async def test_refresh_styles_with_null_colorways(self):
+        self.mirror.sync()
+        self.mirror.refresh_styles(["CD40153U", "CD40154U"])
+
+        self.assertEqual(len(self.mirror.get_styles_skus(["CD40153U"])), 2)
+        self.assertEqual(self.mirror.get_styles_skus(["CD40154U"]), [])
+
+    async def test_lookup_falls_back_to_plm_for_new_styles(self):
+        self.mirror.sync()
+
+        # Style created in PLM after the last full sync
+        conn = sqlite3.connect(self._plm_path)
+        conn.execute(f"INSERT INTO {TABLE} VALUES (?,?,?,?,?,?,?)",
+                        ("CD40155U", "10B", "271", "Dior", "Sun", "F", "DIORNEW"))
+        conn.commit()
+        conn.close()
+
+        result = queries.get_sku_models_plm(self.db_key, ["CD40153U", "CD40155U"])
+        self.assertEqual(len(result["CD40153U"]), 2)
+        self.assertEqual(result["CD40155U"], [("10B", "271", "DIORNEW")])
+
+        streamed = [row for rows in queries.iter_sku_models_plm(self.db_key, ["CD40155U"]) for row in rows]
+        self.assertEqual(streamed, [("CD40155U", "10B", "271", "DIORNEW")])
+        self.assertEqual(queries.get_sku_model_plm(self.db_key, "CD40155U"), [("10B", "271", "DIORNEW")])
+
+    async def test_grouped_colorways_same_from_plm_and_mirror(self):
+        pairs = [("Optical", "F")]
+        expected = [("CD40153U", "01A", "32P")]
+
+        # Not synced yet: answered by the PLM (client-side grouping on the stand-in)
+        self.assertEqual(queries.get_plm_data_multi(self.db_key, "262", "Dior", pairs), expected)
+
+        self.mirror.sync()
+        self.assertEqual(queries.get_plm_data_multi(self.db_key, "262", "Dior", pairs), expected)
+        streamed = [row for rows in queries.iter_plm_data_multi(self.db_key, "262", "Dior", pairs) for row in rows]
+        self.assertEqual(streamed, expected)
@@ -0,0 +1,626 @@
+"""
+Local mirror of the asset share (U:\\01_USD, U:\\02_TOOLS, U:\\03_MAT_LIBRARY).
+
+Every SKU payload, template and material was read straight from the share,
+so opening a scene read every usd file, sublayer and texture over SMB.
+AssetCache mirrors the referenced files to a local directory and redirects
+the reads of this workstation to the mirror. The scene layers keep the
+share paths, so saved scenes open the same on every workstation and on the
+render farm:
+
+    - prefetch() of a file copies it, then every file it points to with a
+      relative path (sublayers, references, payloads, textures),
+      recursively, on the asset_cache thread (copies run concurrently on a
+      small pool, never on the Kit main thread); the copies keep the share
+      layout under ASSET_CACHE_DIR (U:\\01_USD\\... -> <cache>\\U\\01_USD\\...),
+      so the relative paths inside the copies land on the mirrored files
+    - once a file and its dependencies are mirrored, an omni.client alias
+      maps its share path to the mirror: the USD resolver reads the local
+      copy, and the relative paths inside it resolve next to it, on the
+      mirrored dependencies. Files not mirrored yet, or whose mirror is
+      stale, are read from the share
+    - later prefetches only stat the share (asset_stat, concurrent and
+      cached): a file whose size and mtime did not change keeps its mirror.
+      With ASSET_CACHE_VALIDATE = "hash" a file whose mtime changed but
+      whose content hash did not (a republish of the same file) is not
+      copied again
+    - activate() validates the whole index on startup and redirects the
+      files that are still fresh, so reopening a scene reads the mirror
+    - the mirror is kept under ASSET_CACHE_MAX_GB, least recently used
+      files first. The redirect of a file goes before its copy is deleted,
+      and files backing a loaded layer are never evicted; an evicted file
+      is simply read from the share again
+    - absolute paths and URLs inside the copies are left alone, they still
+      resolve on the share
+
+Without omni.client (plain python, e.g. the benchmarks) there is no
+resolver hook: nothing is mirrored and every file is read from the share.
+
+The index (size, mtime, hash, dependencies, LRU order) is a JSON file in
+the cache directory, so the mirror survives Kit restarts. It is only
+written on the asset_cache thread. share_path() maps a mirrored path back
+to the share (a layer read through a redirect reports its mirror as real
+path), for everything that writes asset files (material overrides).
+
+Example:
+    >>> cache = get_asset_cache()
+    >>> cache.prefetch(["U:\\01_USD\\Dior Femme\\01_Models\\CD40153U\\sku\\CD40153U_32P.usd"])
+    <Future at 0x... state=pending>
+    >>> cache.summary()
+    '12 prefetch hits, 3 misses (80% prefetch hit rate), 1.42 GB already mirrored, 0.31 GB copied, 0 evictions'
+
+Author: [Luca Scattolin - Thelios]
+Version: 1.0
+"""
+
+import glob
+import hashlib
+import json
+import os
+from collections import OrderedDict
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from pxr import Sdf, UsdUtils
+
+from ... import constants
+from .asset_stat import get_asset_stat, is_url
+
+try:
+    import omni.client as omni_client
+except ImportError:
+    # No resolver hook outside Kit: assets are read from the share
+    omni_client = None
+
+LAYER_EXTENSIONS = (".usd", ".usda", ".usdc")
+INDEX_FILE = "index.json"
+UDIM_TOKEN = "<UDIM>"
+COPY_CHUNK = 1 << 20
+
+@dataclass
+class CacheEntry:
+    """A mirrored file: size and mtime of the share file it was copied from."""
+    size: int
+    mtime: float
+    digest: str | None = None
+    deps: list = field(default_factory=list)   # share paths of every file it points to, recursively
+    path: str = ""                              # share path as authored, set on prefetched (redirected) files
+
+def _norm(path: str) -> str:
+    return os.path.normpath(path)
+
+def _key(path: str) -> str:
+    return os.path.normcase(_norm(path))
+
+def _digest(path: str) -> str:
+    sha = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(COPY_CHUNK), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+def _report_error(future: Future):
+    if not future.cancelled() and future.exception() is not None:
+        print(f"Asset cache: background job failed: {future.exception()}")
+
+class AssetCache:
+    """
+    LRU mirror of share files in a local directory, read through resolver redirects.
+
+    Every mirror operation runs on the asset_cache thread, one job at a time:
+    the index is never touched by the Kit main thread.
+
+    Args:
+        root (Path): Local cache directory
+        share_roots (tuple): Share folders whose files are mirrored
+        max_gb (float): Size of the mirror
+        validate (str): "stat" (size + mtime) or "hash" (also compare content when only the mtime changed)
+        asset_stat (AssetStat): Stat service used to validate the mirrored files
+        enabled (bool): False never mirrors nor redirects anything
+        redirect_fn (callable): ``redirect_fn(share_path, local_path)`` sends the reads of
+                                ``share_path`` to ``local_path`` (None removes the redirect).
+                                Defaults to omni.client.set_alias; without it the cache is off
+    """
+
+    def __init__(self, root: Path = constants.ASSET_CACHE_DIR,
+                        share_roots: tuple = constants.ASSET_CACHE_ROOTS,
+                        max_gb: float = constants.ASSET_CACHE_MAX_GB,
+                        validate: str = constants.ASSET_CACHE_VALIDATE,
+                        asset_stat=None,
+                        enabled: bool = constants.ASSET_CACHE_ENABLED,
+                        redirect_fn=None):
+
+        self.root = Path(root)
+        self.share_roots = tuple(_key(share_root) for share_root in share_roots)
+        self.max_bytes = max_gb * 2**30
+        self.validate = validate
+        self._asset_stat = asset_stat if asset_stat is not None else get_asset_stat()
+        self._redirect_fn = redirect_fn or (omni_client.set_alias if omni_client else None)
+        self.enabled = enabled and self._redirect_fn is not None
+
+        # share key -> CacheEntry, least recently used first
+        self._entries = None
+        self._dirty = False
+        # share key -> share path of the files whose reads go to their mirror
+        self._redirected = {}
+        self._redirect_lock = threading.Lock()
+        # One job at a time owns the index; the copies of a job run on a pool
+        self._jobs = None
+        self._executor = None
+
+        # Counted per prefetched asset (whether USD opens it or not): unloaded payloads count too
+        self.prefetch_hits = 0
+        self.misses = 0
+        self.fallbacks = 0
+        self.prefetch_bytes = 0
+        self.bytes_copied = 0
+        self.evictions = 0
+
+    #MARK: PATHS
+    # Share <-> mirror paths ------------------------------------------------------------------------
+
+    def is_cacheable(self, path: str) -> bool:
+        """True for local paths under one of the mirrored share folders."""
+        if not path or is_url(path):
+            return False
+        key = _key(path)
+        return any(key.startswith(share_root + os.sep) for share_root in self.share_roots)
+
+    def local_path(self, path: str) -> str:
+        """Mirror path of the share file ``path`` (whether it is mirrored or not)."""
+        drive, rest = os.path.splitdrive(_norm(path))
+        return str(self.root.joinpath(drive.rstrip(":") or "_root", rest.lstrip("\\/")))
+
+    def share_path(self, path: str | None) -> str | None:
+        """Share path of a mirrored file; any other path is returned unchanged."""
+        if not path or is_url(path):
+            return path
+        try:
+            rel = Path(_norm(path)).relative_to(self.root)
+        except ValueError:
+            return path
+        drive, *parts = rel.parts
+        if drive == "_root":
+            return os.sep + os.path.join(*parts)
+        return os.path.join(f"{drive}:{os.sep}", *parts)
+
+    #MARK: REDIRECT
+    # Resolver redirects --------------------------------------------------------------------------
+    # Only prefetched files are redirected: the relative paths inside their mirror
+    # resolve next to it, on the mirrored dependencies
+
+    def _redirect(self, share_file: str):
+        key = _key(share_file)
+        with self._redirect_lock:
+            if key not in self._redirected:
+                self._redirect_fn(share_file, self.local_path(share_file))
+                self._redirected[key] = share_file
+
+    def _unredirect(self, key: str):
+        with self._redirect_lock:
+            share_file = self._redirected.pop(key, None)
+            if share_file is not None:
+                self._redirect_fn(share_file, None)
+
+    def is_redirected(self, path: str) -> bool:
+        """True if the reads of the share file ``path`` (or of a mirror path) go to the mirror."""
+        return _key(self.share_path(path)) in self._redirected
+
+    #MARK: INDEX
+    # Persistent index ------------------------------------------------------------------------------
+
+    def _index(self) -> OrderedDict:
+        if self._entries is None:
+            self._entries = OrderedDict()
+            try:
+                with open(self.root.joinpath(INDEX_FILE), encoding="utf-8") as f:
+                    for key, entry in json.load(f).items():
+                        self._entries[key] = CacheEntry(**entry)
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError, TypeError) as e:
+                print(f"Asset cache index unreadable, starting empty: {e}")
+        return self._entries
+
+    def flush(self):
+        """Write the index, if it changed."""
+        if not self._dirty or self._entries is None:
+            return
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            part = self.root.joinpath(INDEX_FILE + ".part")
+            with open(part, "w", encoding="utf-8") as f:
+                json.dump({key: asdict(entry) for key, entry in self._entries.items()}, f)
+            os.replace(part, self.root.joinpath(INDEX_FILE))
+            self._dirty = False
+        except OSError as e:
+            print(f"Asset cache index not saved: {e}")
+
+    #MARK: PREFETCH
+    # Background mirroring ----------------------------------------------------------------------------
+
+    def _submit(self, fn, *args) -> Future:
+        if self._jobs is None:
+            self._jobs = ThreadPoolExecutor(max_workers=1, thread_name_prefix="asset_cache")
+        future = self._jobs.submit(fn, *args)
+        future.add_done_callback(_report_error)
+        return future
+
+    def prefetch(self, paths, fetch: bool = True) -> Future | None:
+        """
+        Mirror the share files ``paths`` in the background and redirect their reads to the mirror.
+
+        Returns right away, the scene keeps the share paths: the files are
+        read from the share until their group (the file and its relative
+        dependencies) is mirrored. Share paths outside the mirrored folders
+        and URLs are ignored.
+
+        Args:
+            paths: Asset paths, as authored in the scene
+            fetch (bool): Copy the files on a miss. False only revalidates the files
+                            already mirrored (nothing is read from the share besides a stat)
+
+        Returns:
+            Future: The job, None if there is nothing to do
+        """
+        todo = [path for path in dict.fromkeys(paths) if self.enabled and self.is_cacheable(path)]
+        if not todo:
+            return None
+        return self._submit(self._prefetch_job, todo, fetch)
+
+    def activate(self) -> Future | None:
+        """Validate the mirror in the background and redirect the files still fresh (startup)."""
+        if not self.enabled:
+            return None
+        return self._submit(self._activate_job)
+
+    def _stat_groups(self, paths) -> dict:
+        """One concurrent stat of every file of the groups of ``paths``, by file key."""
+        entries = self._index()
+        files = {}
+        for path in paths:
+            entry = entries.get(_key(path))
+            for share_file in [path, *(entry.deps if entry else [])]:
+                files.setdefault(_key(share_file), share_file)
+        infos = self._asset_stat.stat_many(files.values())
+        return {key: infos[share_file] for key, share_file in files.items()}
+
+    def _fresh_group(self, path: str, infos: dict) -> list | None:
+        """The group of ``path`` (the file and its dependencies) if every file of it is mirrored and fresh."""
+        entry = self._entries.get(_key(path))
+        if entry is None:
+            return None
+        group = [path, *entry.deps]
+        if all(self._fresh(share_file, infos.get(_key(share_file))) for share_file in group):
+            return group
+        return None
+
+    def _prefetch_job(self, paths: list, fetch: bool):
+        entries = self._index()
+        infos = self._stat_groups(paths)
+
+        used = set()
+        for path in paths:
+            if infos.get(_key(path)) is None:
+                # Not on the share: let USD report the missing asset
+                continue
+            group = self._fresh_group(path, infos)
+            if group is not None:
+                for share_file in group:
+                    entries.move_to_end(_key(share_file))
+                    used.add(_key(share_file))
+                self.prefetch_hits += 1
+                self.prefetch_bytes += sum(entries[_key(share_file)].size for share_file in group)
+                self._redirect(path)
+                continue
+            # Stale or partial mirror: the share is read until the group is copied again
+            self._unredirect(_key(path))
+            if not fetch:
+                continue
+            mirrored = self._mirror(path, {path: infos[_key(path)]})
+            self.misses += 1
+            if mirrored is None:
+                self.fallbacks += 1
+                continue
+            used.update(mirrored)
+            entries[_key(path)].path = path
+            self._redirect(path)
+
+        self._evict(used)
+        self.flush()
+
+    def _activate_job(self):
+        entries = self._index()
+        roots = [entry.path for entry in entries.values() if entry.path]
+        infos = self._stat_groups(roots)
+        redirected = 0
+        for path in roots:
+            if self._fresh_group(path, infos) is not None:
+                self._redirect(path)
+                redirected += 1
+        self.flush()
+        print(f"Asset cache: {redirected} of {len(roots)} mirrored assets read locally")
+
+    def _fresh(self, share_file: str, info) -> bool:
+        """True if the mirror of ``share_file`` is there and matches the share file ``info``."""
+        entry = self._entries.get(_key(share_file))
+        if entry is None or info is None or not os.path.isfile(self.local_path(share_file)):
+            return False
+        if info.size == entry.size and info.mtime == entry.mtime:
+            return True
+        if self.validate == "hash" and entry.digest and info.size == entry.size:
+            # Same size, new mtime: a republish of the same content keeps its mirror
+            try:
+                same = _digest(share_file) == entry.digest
+            except OSError:
+                return False
+            if same:
+                entry.mtime = info.mtime
+                self._dirty = True
+            return same
+        return False
+
+    #MARK: MIRROR
+    # Copy functions ----------------------------------------------------------------------------------
+
+    def _mirror(self, path: str, infos: dict) -> set | None:
+        """
+        Copy ``path`` and its relative dependencies, level by level (copies of a level run concurrently).
+
+        Returns:
+            set: Keys of every file of the group, None if ``path`` itself could not be copied
+        """
+        entries = self._entries
+        group = {_key(path): path}
+        level = [path]
+        while level:
+            level_infos = infos if level == [path] else self._asset_stat.stat_many(level)
+            stale = [share_file for share_file in level if not self._fresh(share_file, level_infos.get(share_file))]
+            for share_file, copied in zip(stale, self._copy_many(stale)):
+                if copied is None:
+                    if share_file == path:
+                        return None
+                    continue
+                previous = entries.get(_key(share_file))
+                if previous is not None:
+                    # A file re-copied as someone's dependency keeps its own group
+                    copied.deps, copied.path = previous.deps, previous.path
+                entries[_key(share_file)] = copied
+                self.bytes_copied += copied.size
+            next_level = []
+            for share_file in level:
+                if not share_file.lower().endswith(LAYER_EXTENSIONS) or _key(share_file) not in entries:
+                    continue
+                for dep in self._dependencies(share_file):
+                    if _key(dep) not in group:
+                        group[_key(dep)] = dep
+                        next_level.append(dep)
+            level = next_level
+
+        root_entry = entries[_key(path)]
+        root_entry.deps = [dep for key, dep in group.items() if key != _key(path) and key in entries]
+        for key in group:
+            if key in entries:
+                entries.move_to_end(key)
+        self._dirty = True
+        return set(group)
+
+    def _dependencies(self, share_file: str) -> list:
+        """Share paths of the files ``share_file`` points to with a relative path (read from its mirror)."""
+        try:
+            sublayers, references, payloads = UsdUtils.ExtractExternalReferences(self.local_path(share_file))
+        except Exception as e:
+            print(f"Asset cache: dependencies of {share_file} not read: {e}")
+            return []
+        share_dir = os.path.dirname(share_file)
+        deps = []
+        for asset_path in (*sublayers, *references, *payloads):
+            if not asset_path or is_url(asset_path) or os.path.isabs(asset_path) or os.path.splitdrive(asset_path)[0]:
+                continue
+            dep = _norm(os.path.join(share_dir, asset_path))
+            if UDIM_TOKEN in dep:
+                deps.extend(glob.glob(glob.escape(dep).replace(glob.escape(UDIM_TOKEN), "[0-9]" * 4)))
+            else:
+                deps.append(dep)
+        return deps
+
+    def _copy_many(self, share_files: list) -> list:
+        if len(share_files) <= 1:
+            return [self._copy(share_file) for share_file in share_files]
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=constants.ASSET_CACHE_WORKERS,
+                                                thread_name_prefix="asset_cache_copy")
+        return list(self._executor.map(self._copy, share_files))
+
+    def _copy(self, share_file: str) -> CacheEntry | None:
+        """Copy one file to its mirror (through a .part file). Runs on the copy threads, the caller indexes it."""
+        local = self.local_path(share_file)
+        part = f"{local}.part"
+        try:
+            st = os.stat(share_file)
+            os.makedirs(os.path.dirname(local), exist_ok=True)
+            sha = hashlib.sha1() if self.validate == "hash" else None
+            with open(share_file, "rb") as src, open(part, "wb") as dst:
+                for chunk in iter(lambda: src.read(COPY_CHUNK), b""):
+                    dst.write(chunk)
+                    if sha:
+                        sha.update(chunk)
+            os.replace(part, local)
+        except OSError as e:
+            # Missing dependency, or a mirror held open by the scene
+            print(f"Asset cache: {share_file} not mirrored: {e}")
+            try:
+                os.remove(part)
+            except OSError:
+                pass
+            return None
+        return CacheEntry(st.st_size, st.st_mtime, sha.hexdigest() if sha else None)
+
+    #MARK: EVICT
+    # Eviction ---------------------------------------------------------------------------------------
+
+    def size(self) -> int:
+        """Bytes of the mirrored files."""
+        return sum(entry.size for entry in self._index().values())
+
+    def _in_use(self) -> set:
+        """Keys of the mirrored files read by a loaded layer, with their dependencies."""
+        keys = set()
+        for layer in Sdf.Layer.GetLoadedLayers():
+            share_file = self.share_path(layer.realPath)
+            if not share_file or share_file == layer.realPath:
+                continue
+            entry = self._entries.get(_key(share_file))
+            keys.add(_key(share_file))
+            keys.update(_key(dep) for dep in (entry.deps if entry else []))
+        return keys
+
+    def _evict(self, protect: set = frozenset()):
+        """
+        Delete least recently used mirrored files until the mirror fits in max_bytes.
+
+        Files of ``protect`` and files read by a loaded layer are kept. The
+        redirect of every file whose group holds an evicted file goes first,
+        so those assets are read from the share again, never from a partial mirror.
+        """
+        total = self.size()
+        if total <= self.max_bytes:
+            return
+        protect = set(protect) | self._in_use()
+        # File key -> keys of the redirected files whose group holds it
+        owners = {}
+        for key in list(self._redirected):
+            entry = self._entries.get(key)
+            for share_file in [key, *(entry.deps if entry else [])]:
+                owners.setdefault(_key(share_file), set()).add(key)
+
+        broken = set()
+        for key in list(self._entries):
+            if total <= self.max_bytes:
+                break
+            dependents = owners.get(key, set())
+            if key in protect or dependents & protect:
+                continue
+            for owner in dependents:
+                self._unredirect(owner)
+            if self._remove(key):
+                total -= self._entries.pop(key).size
+                self.evictions += 1
+                self._dirty = True
+                broken.update(dependents)
+                continue
+            # Held open: it stays, and so do the redirects that were still whole
+            for owner in dependents - broken:
+                if owner in self._entries and self._entries[owner].path:
+                    self._redirect(self._entries[owner].path)
+
+    def _remove(self, key: str) -> bool:
+        """Delete the mirror of the share file ``key``; False if it is in use (kept)."""
+        try:
+            os.remove(self.local_path(key))
+        except FileNotFoundError:
+            pass
+        except OSError:
+            return False
+        return True
+
+    def invalidate(self, path: str = None) -> Future | None:
+        """
+        Forget the mirror of ``path`` (or every mirror): it is copied again on the next prefetch.
+
+        The redirect goes right away, so from now on the file is read (and
+        written) on the share; the index is updated in the background.
+        """
+        key = _key(self.share_path(path)) if path else None
+        for redirected in list(self._redirected):
+            if key is None or redirected == key:
+                self._unredirect(redirected)
+        if not self.enabled:
+            return None
+        return self._submit(self._invalidate_job, key)
+
+    def _invalidate_job(self, key: str | None):
+        entries = self._index()
+        if key is None:
+            entries.clear()
+        else:
+            entries.pop(key, None)
+            # Prefetched files whose group held it are partial now
+            for owner in [owner for owner, entry in entries.items() if key in {_key(dep) for dep in entry.deps}]:
+                self._unredirect(owner)
+        self._dirty = True
+        self.flush()
+
+    def clear(self) -> Future:
+        """Delete every mirrored file that is not in use, in the background."""
+        return self._submit(self._clear_job)
+
+    def _clear_job(self):
+        entries = self._index()
+        in_use = self._in_use()
+        for key in list(entries):
+            if key in in_use:
+                continue
+            self._unredirect(key)
+            if self._remove(key):
+                del entries[key]
+        self._dirty = True
+        self.flush()
+
+    #MARK: READ
+    # Read functions ----------------------------------------------------------------------------------
+
+    @property
+    def prefetch_hit_rate(self) -> float:
+        """Share of the prefetched assets that were already mirrored and fresh."""
+        resolved = self.prefetch_hits + self.misses
+        return self.prefetch_hits / resolved if resolved else 0.0
+
+    def summary(self) -> str:
+        return (f"{self.prefetch_hits} prefetch hits, {self.misses} misses ({self.prefetch_hit_rate:.0%} prefetch hit rate), "
+                f"{self.prefetch_bytes / 2**30:.2f} GB already mirrored, {self.bytes_copied / 2**30:.2f} GB copied, "
+                f"{self.evictions} evictions")
+
+    def report(self):
+        """Print the summary and the size of the mirror (from the asset_cache thread, after the pending jobs)."""
+        if not self.enabled:
+            print("Asset cache: off (no resolver hook), assets are read from the share")
+            return
+        self._submit(self._report_job)
+
+    def _report_job(self):
+        entries = self._index()
+        print(f"Asset cache: {self.summary()}")
+        print(f"  {len(entries)} files, {self.size() / 2**30:.2f}/{self.max_bytes / 2**30:.0f} GB in {self.root}, "
+                f"{len(self._redirected)} assets read locally"
+                f"{f', {self.fallbacks} served from the share' if self.fallbacks else ''}")
+
+    def shutdown(self):
+        if self._jobs is not None:
+            self._jobs.shutdown(wait=True, cancel_futures=True)
+            self._jobs = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        # Redirects must not outlive the extension
+        for key in list(self._redirected):
+            self._unredirect(key)
+        self.flush()
+
+_CACHE = None
+
+def get_asset_cache() -> AssetCache:
+    """Local asset mirror shared by every tool."""
+    global _CACHE
+    if _CACHE is None:
+        _CACHE = AssetCache()
+        _CACHE.activate()
+    return _CACHE
+
+def shutdown():
+    global _CACHE
+    if _CACHE is not None:
+        _CACHE.shutdown()
+        _CACHE = None
@@ -0,0 +1,211 @@
+"""
+Cached existence checks for USD assets (local paths and omniverse:// URLs).
+
+check_usd_file_exists used to open a full Usd.Stage for every omniverse://
+URL, composing the whole asset (and its payloads) just to learn that it is
+there. AssetStat asks the Ar resolver instead: resolving a URL is a single
+stat on the server, nothing is read or composed. Local paths are a plain
+os.path.isfile.
+
+Results are cached with a TTL, positive and negative results separately
+(a missing SKU usd may be published any minute, so misses expire sooner),
+and exists_many() checks hundreds of paths concurrently on a small thread
+pool, so an import preflight costs one round-trip time, not one per SKU.
+stat() and stat_many() return the size and modification time from the same
+probe (the size of omniverse:// assets is not known without opening them).
+
+Example:
+    >>> stat = get_asset_stat()
+    >>> stat.exists("omniverse://server/Models/CD40153U/sku/CD40153U_32P.usd")
+    True
+    >>> stat.exists_many(paths)      # {path: bool}, concurrent
+    {...}
+    >>> stat.stat("U:\\01_USD\\Dior Femme\\01_Models\\CD40153U\\sku\\CD40153U_32P.usd")
+    AssetInfo(size=48213, mtime=1767225600.0)
+
+Author: [Luca Scattolin - Thelios]
+Version: 1.0
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+from pxr import Ar
+
+from ... import constants
+
+URL_SCHEMES = ("omniverse://", "http://", "https://")
+
+def is_url(path: str) -> bool:
+    return path.startswith(URL_SCHEMES)
+
+class AssetInfo(NamedTuple):
+    """Size in bytes (None when unknown) and modification time (epoch seconds, None when unknown)."""
+    size: int | None
+    mtime: float | None
+
+# Cached "does not exist" result
+MISSING = AssetInfo(None, None)
+
+class AssetStat:
+    """
+    TTL-cached asset existence service.
+
+    Args:
+        positive_ttl (float): Seconds an "exists" result stays cached
+        negative_ttl (float): Seconds a "missing" result stays cached
+        max_workers (int): Threads used by exists_many
+    """
+
+    def __init__(self, positive_ttl: float = constants.ASSET_STAT_POSITIVE_TTL,
+                        negative_ttl: float = constants.ASSET_STAT_NEGATIVE_TTL,
+                        max_workers: int = constants.ASSET_STAT_WORKERS):
+
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        self.max_workers = max_workers
+
+        # Guards the cache, the counters and the lazy executor: stat_many runs on several
+        # threads at once (import preflight on the PLM executor, asset cache jobs)
+        self._cache = {}
+        self._lock = threading.Lock()
+        self._executor = None
+
+        self.hits = 0
+        self.probes = 0
+
+    #MARK: PROBE
+    # Existence probes -----------------------------------------------------------------------------
+
+    def _probe(self, path: str) -> AssetInfo | None:
+        """Size and modification time of the asset, None if it does not exist."""
+        with self._lock:
+            self.probes += 1
+        if not is_url(path):
+            try:
+                st = os.stat(path)
+            except OSError:
+                return None
+            return AssetInfo(st.st_size, st.st_mtime) if os.path.isfile(path) else None
+        try:
+            # One stat through the resolver (OmniUsdResolver in Kit), no layer is opened
+            resolver = Ar.GetResolver()
+            resolved = resolver.Resolve(path)
+            if not resolved:
+                return None
+            timestamp = resolver.GetModificationTimestamp(path, resolved)
+            return AssetInfo(None, timestamp.GetTime() if timestamp.IsValid() else None)
+        except Exception as e:
+            print(f"Asset stat of {path} failed: {e}")
+            return None
+
+    def _cached(self, path: str):
+        """Cached AssetInfo, MISSING for a cached miss, None if nothing valid is cached."""
+        with self._lock:
+            entry = self._cache.get(path)
+        if entry is None:
+            return None
+        info, stamp = entry
+        ttl = self.positive_ttl if info is not MISSING else self.negative_ttl
+        if time.monotonic() - stamp > ttl:
+            return None
+        with self._lock:
+            self.hits += 1
+        return info
+
+    def _store(self, path: str, info: AssetInfo | None) -> AssetInfo:
+        info = MISSING if info is None else info
+        with self._lock:
+            self._cache[path] = (info, time.monotonic())
+        return info
+
+    #MARK: API
+    # Public API -------------------------------------------------------------------------------------
+
+    def stat(self, path: str) -> AssetInfo | None:
+        """Size and modification time of the asset at ``path``, None if it does not exist (cached)."""
+        info = self._cached(path)
+        if info is None:
+            info = self._store(path, self._probe(path))
+        return None if info is MISSING else info
+
+    def stat_many(self, paths) -> dict:
+        """
+        stat() of many assets, probing the uncached ones concurrently.
+
+        Args:
+            paths (iterable): Local paths and/or URLs (duplicates are probed once)
+
+        Returns:
+            dict: path -> AssetInfo or None, in the order of ``paths``
+        """
+        result = {}
+        missing = []
+        for path in paths:
+            if path in result:
+                continue
+            cached = self._cached(path)
+            result[path] = cached
+            if cached is None:
+                missing.append(path)
+
+        if len(missing) == 1:
+            result[missing[0]] = self._store(missing[0], self._probe(missing[0]))
+        elif missing:
+            for path, info in zip(missing, self._get_executor().map(self._probe, missing)):
+                result[path] = self._store(path, info)
+        return {path: None if info is MISSING else info for path, info in result.items()}
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="asset_stat")
+            return self._executor
+
+    def exists(self, path: str) -> bool:
+        """True if the asset at ``path`` exists (cached for the positive/negative TTL)."""
+        return self.stat(path) is not None
+
+    def exists_many(self, paths) -> dict:
+        """
+        Existence of many assets, probing the uncached ones concurrently.
+
+        Args:
+            paths (iterable): Local paths and/or URLs (duplicates are probed once)
+
+        Returns:
+            dict: path -> bool, in the order of ``paths``
+        """
+        return {path: info is not None for path, info in self.stat_many(paths).items()}
+
+    def invalidate(self, path: str = None):
+        """Forget ``path`` (or every cached result), e.g. after publishing a usd."""
+        with self._lock:
+            if path is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(path, None)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+_STAT = None
+
+def get_asset_stat() -> AssetStat:
+    """Asset existence service shared by every tool."""
+    global _STAT
+    if _STAT is None:
+        _STAT = AssetStat()
+    return _STAT
+
+def shutdown():
+    global _STAT
+    if _STAT is not None:
+        _STAT.shutdown()
+        _STAT = None
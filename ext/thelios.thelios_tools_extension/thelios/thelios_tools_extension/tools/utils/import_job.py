@@ -0,0 +1,124 @@
+"""
+Chunked, cancellable SKU import.
+
+The SKU import authored every hierarchy and reference in one button
+callback, freezing Composer until the last SKU was done. SKUImportJob runs
+the same work as an asyncio task:
+
+    - SKUs are imported IMPORT_CHUNK_SIZE at a time: hierarchy, then the
+      references of the chunk as one CreateReferencesBatch command
+    - between chunks the job yields to the Kit update loop, so the UI
+      redraws and reports progress and throughput
+    - cancel() stops the job at the next chunk boundary: every SKU of the
+      finished chunks has its hierarchy and its reference, no SKU is left
+      half imported
+    - opening another stage while the job runs stops it the same way
+
+With as_payload the SKUs are authored as unloaded payloads
+(CreatePayloadsBatch): the import never opens the SKU files and costs
+almost no memory, SKUs load when viewed or rendered.
+
+Each chunk is one undo entry.
+
+Example:
+    >>> job = SKUImportJob(usd_tools, [(("CD40153U", "32P", "262"), "U:\\01_USD\\...\\CD40153U_32P.usd")],
+    ...                    on_progress=lambda job: print(job.progress_text()))
+    >>> asyncio.ensure_future(job.run())
+    >>> job.cancel()
+
+Author: [Luca Scattolin - Thelios]
+Version: 1.0
+"""
+
+import time
+
+import omni.kit.app
+import omni.usd
+
+from ... import constants
+
+class SKUImportJob:
+    """
+    Import of SKU payload references, one chunk per Kit update.
+
+    Args:
+        usd_tools (USDTools): Authors the hierarchy and the references
+        items (list): (sku_data, payload_file_path) tuples, sku_data is the
+                        (model, sku, release, ...) row of the SKU table
+        chunk_size (int): SKUs authored between two Kit updates
+        on_progress (callable): Called with the job after each chunk
+        as_payload (bool): Author unloaded payloads instead of references
+    """
+
+    def __init__(self, usd_tools, items, chunk_size: int = constants.IMPORT_CHUNK_SIZE, on_progress=None,
+                    as_payload: bool = False):
+        self.usd_tools = usd_tools
+        self.items = list(items)
+        self.as_payload = as_payload
+        self.chunk_size = max(1, chunk_size)
+        self.on_progress = on_progress
+
+        self.done = 0
+        self.created = []
+        self.failed = []
+        self.error = None
+        self.running = False
+        self.cancelled = False
+        self._cancel_requested = False
+        self._start = None
+        self.elapsed = 0.0
+
+    @property
+    def total(self) -> int:
+        return len(self.items)
+
+    @property
+    def rate(self) -> float:
+        """SKUs per second so far."""
+        return self.done / self.elapsed if self.elapsed else 0.0
+
+    def progress_text(self) -> str:
+        return f"Importing SKUs {self.done}/{self.total} ({self.rate:.1f} SKU/s)"
+
+    def cancel(self):
+        """Stop after the chunk being authored (the finished chunks stay imported)."""
+        self._cancel_requested = True
+
+    def _import_chunk(self, chunk: list):
+        sku_paths = self.usd_tools.create_hierarchy_structures([data for data, _ in chunk])
+        references = [(payload_file_path, sku_path.pathString, f"{data[0]}_{data[1]}")
+                        for (data, payload_file_path), sku_path in zip(chunk, sku_paths)]
+        created, failed = self.usd_tools.create_references_under_parents(references, check_exists=False, notify=False,
+                                                                            as_payload=self.as_payload)
+        self.created.extend(created)
+        self.failed.extend(failed)
+
+    async def run(self):
+        """Import every item, yielding to Kit between chunks. Returns (created, failed)."""
+        self.running = True
+        self._start = time.perf_counter()
+        stage = omni.usd.get_context().get_stage()
+        try:
+            for i in range(0, self.total, self.chunk_size):
+                if self._cancel_requested:
+                    self.cancelled = True
+                    break
+                if omni.usd.get_context().get_stage() != stage:
+                    print(f"SKU import stopped at {self.done}/{self.total}: the stage changed")
+                    self.cancelled = True
+                    break
+                chunk = self.items[i:i + self.chunk_size]
+                self._import_chunk(chunk)
+                self.done += len(chunk)
+                self.elapsed = time.perf_counter() - self._start
+                if self.on_progress:
+                    self.on_progress(self)
+                await omni.kit.app.get_app().next_update_async()
+        except Exception as e:
+            # Stop at the failing chunk, the finished ones stay imported
+            print(f"SKU import stopped at {self.done}/{self.total}: {e}")
+            self.error = e
+        finally:
+            self.running = False
+            self.elapsed = time.perf_counter() - self._start
+        return self.created, self.failed
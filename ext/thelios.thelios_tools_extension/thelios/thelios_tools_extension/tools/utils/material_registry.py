@@ -0,0 +1,240 @@
+"""
+Registry of the scene materials under /World/Looks.
+
+get_materials_in_looks_scope walked /World/Looks (with instance proxies) on
+every "Refresh Mat List" click, and the override save searched the prim
+stack of the material for its source .usda each time. The registry keeps,
+for the scene:
+
+    material name -> prim paths -> source .usda file
+
+    - it is built once with the same walk (instance proxies included)
+    - a Usd.Notice.ObjectsChanged listener queues the resynced prims under
+      /World/Looks (new, removed or re-referenced materials); value-only
+      edits (shader parameters) are ignored
+    - queued subtrees are re-walked on the next lookup
+    - source files are resolved on first request and cached per path until
+      the material is resynced
+
+Example:
+    >>> registry = get_material_registry()
+    >>> registry.names()
+    ['Black_Acetate', 'Gold_Metal', ...]
+    >>> registry.path_of("Gold_Metal")
+    Sdf.Path('/World/Looks/Gold_Metal')
+    >>> registry.source_of(registry.path_of("Gold_Metal"))
+    'U:\\03_MAT_LIBRARY\\...\\Gold_Metal.usda'
+
+Author: [Luca Scattolin - Thelios]
+Version: 1.0
+"""
+
+import os
+
+import omni.usd
+from pxr import Sdf, Tf, Usd, UsdShade
+
+from ... import constants
+
+def reference_source_file(prim: Usd.Prim) -> str | None:
+    """Local .usda file the material ``prim`` comes from (layer or reference), None if there is none."""
+    # Scorri la PrimStack per trovare file .usda referenziati
+    for prim_spec in prim.GetPrimStack():
+        layer = prim_spec.layer
+        if layer and layer.identifier.endswith('.usda') and os.path.exists(layer.identifier):
+            return layer.identifier
+
+        # Controlla anche references/payloads nella stack
+        if hasattr(prim_spec, 'referenceList'):
+            for ref in getattr(prim_spec.referenceList, 'prependedItems', []):
+                asset_path = ref.assetPath
+                if asset_path and asset_path.endswith('.usda') and os.path.exists(asset_path):
+                    return asset_path
+
+    # Fallback: subLayers del prim
+    sub_layers = prim.GetAttribute("subLayers")
+    if sub_layers.IsValid():
+        paths = sub_layers.Get()
+        for path in paths or []:
+            if os.path.exists(path) and path.endswith('.usda'):
+                return path
+
+    return None
+
+class MaterialRegistry:
+    """
+    Name -> paths -> source file index of the materials under ``root``.
+
+    Args:
+        stage_fn (callable): Returns the stage to index. Defaults to the
+                                current omni.usd context stage
+        root (str): Scope holding the scene materials
+    """
+
+    def __init__(self, stage_fn=None, root: str = constants.MATERIAL_TARGET):
+        self._stage_fn = stage_fn or (lambda: omni.usd.get_context().get_stage())
+        self.root = Sdf.Path(root)
+
+        self._stage = None
+        self._listener = None
+        self._dirty = True
+        self._pending = set()
+
+        self._by_name = {}
+        self._paths = set()
+        self._sources = {}
+
+        self.rebuilds = 0
+
+    #MARK: STAGE
+    # Stage binding -------------------------------------------------------------------------------
+
+    def attach(self, stage: Usd.Stage):
+        """Index ``stage`` and listen to its changes (replaces the previous stage)."""
+        self.detach()
+        self._stage = stage
+        if stage:
+            self._listener = Tf.Notice.Register(Usd.Notice.ObjectsChanged, self._on_objects_changed, stage)
+
+    def detach(self):
+        if self._listener:
+            self._listener.Revoke()
+        self._listener = None
+        self._stage = None
+        self._dirty = True
+        self._pending = set()
+
+    def invalidate(self):
+        self._dirty = True
+
+    def _current(self):
+        stage = self._stage_fn()
+        if stage != self._stage:
+            self.attach(stage)
+        if self._dirty:
+            self._rebuild()
+        elif self._pending:
+            self._flush()
+
+    #MARK: READ
+    # Read functions ----------------------------------------------------------------------------------
+
+    def __len__(self):
+        self._current()
+        return len(self._paths)
+
+    def __contains__(self, name: str) -> bool:
+        self._current()
+        return name in self._by_name
+
+    def names(self) -> list:
+        """Material names, sorted (a name shared by several materials is listed once)."""
+        self._current()
+        return sorted(self._by_name)
+
+    def paths(self) -> list:
+        """Paths of every material, sorted."""
+        self._current()
+        return sorted(self._paths)
+
+    def paths_of(self, name: str) -> list:
+        self._current()
+        return sorted(self._by_name.get(name, ()))
+
+    def path_of(self, name: str) -> Sdf.Path | None:
+        """Path of the material called ``name`` (the shallowest one if the name repeats)."""
+        paths = self.paths_of(name)
+        if not paths:
+            return None
+        return min(paths, key=lambda p: (p.pathElementCount, p))
+
+    def source_of(self, path) -> str | None:
+        """Source .usda of the material at ``path``, resolved once and cached."""
+        self._current()
+        path = Sdf.Path(str(path))
+        if path in self._sources:
+            return self._sources[path]
+        prim = self._stage.GetPrimAtPath(path) if self._stage else None
+        source = reference_source_file(prim) if prim else None
+        if path in self._paths:
+            self._sources[path] = source
+        return source
+
+    #MARK: BUILD
+    # Build and incremental updates -----------------------------------------------------------------
+
+    def _rebuild(self):
+        self._by_name = {}
+        self._paths = set()
+        self._sources = {}
+        self._pending = set()
+        self._dirty = False
+        self.rebuilds += 1
+
+        if not self._stage:
+            return
+        root_prim = self._stage.GetPrimAtPath(self.root)
+        if root_prim:
+            self._walk(root_prim)
+
+    def _walk(self, prim: Usd.Prim):
+        for child in Usd.PrimRange(prim, Usd.TraverseInstanceProxies()):
+            if child.IsA(UsdShade.Material):
+                path = child.GetPath()
+                self._paths.add(path)
+                self._by_name.setdefault(path.name, set()).add(path)
+
+    def _drop(self, path: Sdf.Path):
+        for material in [p for p in self._paths if p.HasPrefix(path)]:
+            self._paths.discard(material)
+            self._sources.pop(material, None)
+            names = self._by_name.get(material.name)
+            if names:
+                names.discard(material)
+                if not names:
+                    del self._by_name[material.name]
+
+    def _flush(self):
+        if len(self._pending) > constants.MATERIAL_REGISTRY_MAX_PENDING:
+            # Bulk import/removal: one walk of /World/Looks beats many subtree updates
+            self._rebuild()
+            return
+        pending, self._pending = self._pending, set()
+        done = set()
+        for path in sorted(pending, key=lambda p: p.pathElementCount):
+            # A queued ancestor already re-walked this subtree
+            if any(prefix in done for prefix in path.GetPrefixes()[:-1]):
+                continue
+            done.add(path)
+            self._drop(path)
+            prim = self._stage.GetPrimAtPath(path)
+            if prim:
+                self._walk(prim)
+
+    def _on_objects_changed(self, notice, sender):
+        if self._dirty:
+            return
+        for path in notice.GetResyncedPaths():
+            if path.IsPropertyPath():
+                continue
+            if path.HasPrefix(self.root):
+                self._pending.add(path.GetPrimPath())
+            elif self.root.HasPrefix(path):
+                # /World/Looks itself (or an ancestor) was resynced
+                self._dirty = True
+                return
+
+_REGISTRY = None
+
+def get_material_registry() -> MaterialRegistry:
+    """Material registry of the current Kit stage, shared by every panel."""
+    global _REGISTRY
+    if _REGISTRY is None:
+        _REGISTRY = MaterialRegistry()
+    return _REGISTRY
+
+def shutdown():
+    global _REGISTRY
+    if _REGISTRY is not None:
+        _REGISTRY.detach()
+        _REGISTRY = None
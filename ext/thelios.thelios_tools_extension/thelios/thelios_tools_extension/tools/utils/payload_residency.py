@@ -0,0 +1,293 @@
+"""
+Memory budget for browsing SKUs in the View panel.
+
+The View panel isolates a SKU with visibility only, so every imported SKU
+stays loaded in memory and in the renderer while hidden. PayloadResidency
+keeps only a budget of SKUs loaded while browsing:
+
+    - the viewed SKU is loaded right away (Stage.LoadAndUnload)
+    - the SKUs beside it in slider order are prefetched on the next Kit
+      update, so stepping forward or back finds them already loaded
+    - the least recently viewed SKUs are unloaded once the loaded set goes
+      over PAYLOAD_RESIDENCY_MAX_SKUS or PAYLOAD_RESIDENCY_MAX_GB
+    - the viewed SKU and its neighbours are never unloaded
+
+Load and unload of a SKU cover every payload under its scope
+(Usd.LoadWithDescendants); the SKU scopes themselves stay on the stage,
+so the scope index and the slider are unaffected. Memory is the
+stage_stats estimate of each SKU once loaded.
+
+Stage.LoadAndUnload only acts on payload arcs. A SKU imported as a plain
+reference to a file without payloads is always composed and cannot be
+unloaded: visit() detects it (stage_stats counts no payload under the
+scope), reports it once and leaves it out of the budget.
+
+With PAYLOAD_RESIDENCY_ENABLED off, view_only() still loads the viewed SKU
+and unloads the one the previous view loaded, so browsing never piles up
+loaded SKUs.
+
+Example:
+    >>> residency = get_payload_residency()
+    >>> residency.visit("CD40153U_32P")
+    Sdf.Path('/World/Models/glass_Xform/CD40153U_Xform/Release_262/CD40153U_32P')
+    >>> residency.resident()
+    [Sdf.Path('.../CD40153U_31P'), Sdf.Path('.../CD40153U_33P'), Sdf.Path('.../CD40153U_32P')]
+
+Author: [Luca Scattolin - Thelios]
+Version: 1.0
+"""
+
+import asyncio
+from collections import OrderedDict
+
+import omni.kit.app
+import omni.usd
+from pxr import Sdf, Usd
+
+from ... import constants
+from .scope_index import get_scope_index
+from .stage_stats import get_stage_stats
+
+class PayloadResidency:
+    """
+    LRU residency of the SKU payloads of one stage.
+
+    Args:
+        stage_fn (callable): Returns the stage to manage. Defaults to the
+                                current omni.usd context stage
+        scope_index (ScopeIndex): SKU scopes, in slider order
+        stage_stats (StageStats): Memory estimate of the loaded SKUs
+        max_skus (int): SKUs kept loaded
+        max_gb (float): Approximate memory of the loaded SKUs
+        prefetch (int): SKUs prefetched on each side of the viewed one
+    """
+
+    def __init__(self, stage_fn=None, scope_index=None, stage_stats=None,
+                        max_skus: int = constants.PAYLOAD_RESIDENCY_MAX_SKUS,
+                        max_gb: float = constants.PAYLOAD_RESIDENCY_MAX_GB,
+                        prefetch: int = constants.PAYLOAD_RESIDENCY_PREFETCH):
+
+        self._stage_fn = stage_fn or (lambda: omni.usd.get_context().get_stage())
+        self._scope_index = scope_index if scope_index is not None else get_scope_index()
+        self._stage_stats = stage_stats if stage_stats is not None else get_stage_stats()
+        self.max_skus = max_skus
+        self.max_bytes = max_gb * 2**30
+        self.prefetch = prefetch
+
+        self._stage = None
+        # sku path -> approximate bytes, least recently viewed first
+        self._resident = OrderedDict()
+        self._pinned = set()
+        self._unmanaged = set()
+        self._prefetch_task = None
+        # SKU loaded by view_only (residency disabled)
+        self._viewed = None
+
+        self.loads = 0
+        self.unloads = 0
+
+    #MARK: STAGE
+    # Stage binding -------------------------------------------------------------------------------
+
+    def _bind(self, stage: Usd.Stage):
+        if stage == self._stage:
+            return
+        self.reset()
+        self._stage = stage
+        if stage:
+            # SKUs already loaded count against the budget, oldest in stage order. They are
+            # measured only if they survive the first eviction (None = not measured yet)
+            for path in self._loaded_skus(stage):
+                self._resident[path] = None
+
+    def reset(self):
+        """Forget the residency state (nothing is loaded or unloaded)."""
+        if self._prefetch_task is not None:
+            self._prefetch_task.cancel()
+        self._prefetch_task = None
+        self._stage = None
+        self._resident = OrderedDict()
+        self._pinned = set()
+        self._unmanaged = set()
+        self._viewed = None
+
+    def _sku_of(self, path: Sdf.Path) -> Sdf.Path | None:
+        depth = self._scope_index.depth
+        if path.pathElementCount < depth or not path.HasPrefix(self._scope_index.root):
+            return None
+        return path.GetPrefixes()[depth - 1]
+
+    def _loaded_skus(self, stage: Usd.Stage) -> list:
+        loaded = {self._sku_of(path) for path in stage.GetLoadSet()}
+        return [path for path in self._scope_index.paths() if path in loaded]
+
+    def _manageable(self, path: Sdf.Path) -> bool:
+        """True if the SKU has payloads under its scope (loaded or not), so LoadAndUnload can act on it."""
+        if path in self._unmanaged:
+            return False
+        stats = self._stage_stats.of(path)
+        if stats is None or stats.payloads:
+            return True
+        self._unmanaged.add(path)
+        print(f"Payload residency: {path.name} has no payloads (referenced SKU), it stays loaded")
+        return False
+
+    def _measure(self, path: Sdf.Path) -> int:
+        stats = self._stage_stats.of(path)
+        return stats.approx_bytes if stats else 0
+
+    #MARK: BROWSE
+    # Viewed SKU and prefetch ------------------------------------------------------------------------
+
+    def visit(self, name: str) -> Sdf.Path | None:
+        """
+        Load the SKU scope ``name`` and its neighbours, unload the least recently viewed ones.
+
+        Args:
+            name (str): SKU scope name, e.g. "CD40153U_32P"
+
+        Returns:
+            Sdf.Path: Path of the SKU scope, None if there is no such SKU
+        """
+        stage = self._stage_fn()
+        self._bind(stage)
+        if not stage:
+            return None
+        path = self._scope_index.path_of(name)
+        if path is None:
+            return None
+
+        paths = self._scope_index.paths()
+        for gone in set(self._resident) - set(paths):
+            del self._resident[gone]
+        i = paths.index(path)
+        neighbours = paths[max(0, i - self.prefetch):i] + paths[i + 1:i + 1 + self.prefetch]
+        self._pinned = {path, *neighbours}
+
+        if self._manageable(path):
+            self._load_and_evict(stage, [path])
+
+        if self._prefetch_task is not None:
+            self._prefetch_task.cancel()
+        todo = [p for p in neighbours if p not in self._resident and self._manageable(p)]
+        self._prefetch_task = asyncio.ensure_future(self._prefetch(stage, todo, path)) if todo else None
+        return path
+
+    def view_only(self, name: str) -> Sdf.Path | None:
+        """
+        Load the SKU scope ``name`` and unload the SKU the previous view loaded.
+
+        Used when residency is disabled: SKUs imported unloaded still load when
+        viewed, and only the last one loaded by viewing stays loaded. SKUs that
+        were already loaded (e.g. by a model import) are left as they are.
+        """
+        stage = self._stage_fn()
+        self._bind(stage)
+        path = self._scope_index.path_of(name) if stage else None
+        if path is None:
+            return None
+
+        unload = {self._viewed} if self._viewed not in (None, path) else set()
+        loadable = stage.FindLoadable(path)
+        if any(not stage.GetPrimAtPath(p).IsLoaded() for p in loadable):
+            self._viewed = path
+            load = {path}
+        else:
+            self._viewed = path if path == self._viewed else None
+            load = set()
+        if load or unload:
+            stage.LoadAndUnload(load, unload, Usd.LoadWithDescendants)
+        self.loads += len(load)
+        self.unloads += len(unload)
+        return path
+
+    async def _prefetch(self, stage: Usd.Stage, paths: list, viewed: Sdf.Path):
+        # Let Kit draw the viewed SKU first
+        await omni.kit.app.get_app().next_update_async()
+        if stage != self._stage:
+            return
+        self._load_and_evict(stage, paths)
+        # Neighbours are recent, but the viewed SKU stays the most recent
+        if viewed in self._resident:
+            self._resident.move_to_end(viewed)
+        self._prefetch_task = None
+
+    def _load_and_evict(self, stage: Usd.Stage, paths: list):
+        incoming = [path for path in paths if path not in self._resident]
+        known = [size for size in self._resident.values() if size]
+        estimate = sum(known) // len(known) if known else 0
+
+        unload = self._victims(len(incoming), estimate * len(incoming))
+        if incoming or unload:
+            stage.LoadAndUnload(set(incoming), set(unload), Usd.LoadWithDescendants)
+        for path in unload:
+            del self._resident[path]
+        self.unloads += len(unload)
+        self.loads += len(incoming)
+
+        for path in paths:
+            if path in self._resident:
+                self._resident.move_to_end(path)
+            else:
+                self._resident[path] = None
+        for path, size in self._resident.items():
+            if size is None:
+                self._resident[path] = self._measure(path)
+
+        # The estimate was short: drop more until the measured SKUs fit
+        over = self._victims()
+        if over:
+            stage.LoadAndUnload(set(), set(over), Usd.LoadWithDescendants)
+            for path in over:
+                del self._resident[path]
+            self.unloads += len(over)
+
+    def _victims(self, extra_count: int = 0, extra_bytes: int = 0) -> list:
+        """Least recently viewed, unpinned SKUs to unload to fit ``extra_count`` more SKUs in the budget."""
+        count = len(self._resident) + extra_count
+        total = self.resident_bytes() + extra_bytes
+        victims = []
+        for path, size in self._resident.items():
+            if count <= self.max_skus and total <= self.max_bytes:
+                break
+            if path in self._pinned:
+                continue
+            victims.append(path)
+            count -= 1
+            total -= size or 0
+        return victims
+
+    #MARK: READ
+    # Read functions ----------------------------------------------------------------------------------
+
+    def resident(self) -> list:
+        """Loaded SKU paths, least recently viewed first."""
+        return list(self._resident)
+
+    def resident_bytes(self) -> int:
+        return sum(size or 0 for size in self._resident.values())
+
+    def unmanaged(self) -> list:
+        """SKU paths seen without payloads: always loaded, outside the budget."""
+        return sorted(self._unmanaged)
+
+    def report(self):
+        print(f"Payload residency: {len(self._resident)}/{self.max_skus} SKUs loaded, "
+                f"~{self.resident_bytes() / 2**30:.2f}/{self.max_bytes / 2**30:.0f} GB, "
+                f"{self.loads} loads, {self.unloads} unloads, "
+                f"{len(self._unmanaged)} SKUs without payloads (not managed)")
+
+_RESIDENCY = None
+
+def get_payload_residency() -> PayloadResidency:
+    """Payload residency of the current Kit stage, shared by every panel."""
+    global _RESIDENCY
+    if _RESIDENCY is None:
+        _RESIDENCY = PayloadResidency()
+    return _RESIDENCY
+
+def shutdown():
+    global _RESIDENCY
+    if _RESIDENCY is not None:
+        _RESIDENCY.reset()
+        _RESIDENCY = None
@@ -0,0 +1,163 @@
+"""
+Non-blocking PLM queries for the Kit UI.
+
+PLM lookups run on a dedicated thread-pool executor and are exposed as
+awaitables, so the Kit main thread (and the whole Composer UI) never waits
+on the database. Requests are grouped in named channels: submitting a new
+request on a channel cancels the previous one, and a superseded request never
+delivers its result, so stale rows are never repainted.
+
+Large results can be streamed: rows are fetched in PLM_FETCH_BATCH_SIZE
+batches and handed to the UI one batch per Kit update.
+
+Example:
+    >>> plm = AsyncPLM(constants.DB_KEY)
+    >>> plm.submit("brands", plm.get_combo_brands(), on_result=print)
+    >>> plm.submit("custom_model", plm.stream_sku_models_plm(["CD40153U"], on_batch=print), on_result=print)
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+import omni.kit.app
+
+from ... import constants
+from . import queries as qu
+
+class AsyncPLM:
+    """
+    Awaitable wrappers around queries.py plus per-channel cancellation.
+
+    Args:
+        db_key (str): PLM connection string forwarded to queries.py
+        max_workers (int): Size of the dedicated query thread pool
+    """
+
+    def __init__(self, db_key: str = constants.DB_KEY, max_workers: int = constants.PLM_EXECUTOR_WORKERS):
+        self.db_key = db_key
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="plm_query")
+        self._tasks = {}
+
+    async def run(self, fn, *args, **kwargs):
+        """Run a blocking function on the PLM executor and await its result."""
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+
+    #MARK: QUERIES
+    # Awaitable queries ----------------------------------------------------------------------------
+    # ``caller`` names the panel/action in the PLM query metrics (see plm_metrics.py)
+
+    def get_combo_brands(self, caller: str = None):
+        return self.run(qu.pop_combo_brands, self.db_key, caller=caller)
+
+    def get_sku_models_plm_fresh(self, models: list, caller: str = None):
+        return self.run(qu.get_sku_models_plm_fresh, self.db_key, models, caller=caller)
+
+    #MARK: STREAMS
+    # Streaming queries ----------------------------------------------------------------------------
+
+    async def stream(self, batches, on_batch) -> int:
+        """
+        Pull ``batches`` (a blocking generator) on the PLM executor and hand
+        each batch to ``on_batch`` on the Kit main thread, one batch per Kit
+        update, so the UI paints the first rows while the rest is still coming.
+
+        If the stream is cancelled the generator is closed on the executor
+        (after any in-flight fetch, or right away once the executor is shut
+        down), which releases its DB connection.
+
+        Returns:
+            int: Number of rows delivered
+        """
+        app = omni.kit.app.get_app()
+        pending = None
+        count = 0
+        try:
+            while True:
+                pending = self._executor.submit(next, batches, None)
+                batch = await asyncio.wrap_future(pending)
+                pending = None
+                if batch is None:
+                    return count
+                count += len(batch)
+                on_batch(batch)
+                await app.next_update_async()
+        finally:
+            if pending is not None and not pending.done():
+                # A generator can't be closed while it's running: close it once the fetch returns
+                pending.add_done_callback(lambda _: batches.close())
+            else:
+                try:
+                    self._executor.submit(batches.close)
+                except RuntimeError:
+                    # Executor already shut down (extension shutdown): nothing runs the generator any more
+                    batches.close()
+
+    def stream_plm_data_multi(self, season: str, brand: str, category_genders: list, on_batch, caller: str = None):
+        return self.stream(qu.iter_plm_data_multi(self.db_key, season, brand, category_genders, caller=caller), on_batch)
+
+    def stream_sku_models_plm(self, models: list, on_batch, caller: str = None):
+        return self.stream(qu.iter_sku_models_plm(self.db_key, models, caller=caller), on_batch)
+
+    #MARK: CHANNELS
+    # Latest-wins request channels ----------------------------------------------------------------
+
+    def submit(self, channel: str, awaitable, on_result, on_error=None) -> asyncio.Task:
+        """
+        Run ``awaitable`` as the current request of ``channel``.
+
+        Any request still pending on the same channel is cancelled. Callbacks
+        run on the Kit main thread, and only while the request is still the
+        latest one of its channel.
+
+        Args:
+            channel (str): Name of the request group, e.g. "custom_model"
+            awaitable: Coroutine or future producing the result
+            on_result (callable): Called with the result
+            on_error (callable): Called with the exception, if any
+
+        Returns:
+            asyncio.Task: The task running the request
+        """
+        self.cancel(channel)
+        request = asyncio.ensure_future(awaitable)
+
+        async def runner():
+            try:
+                result = await request
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if self._tasks.get(channel) is task:
+                    del self._tasks[channel]
+                    if on_error:
+                        on_error(e)
+                    else:
+                        print(f"PLM query '{channel}' failed: {e}")
+                return
+
+            if self._tasks.get(channel) is task:
+                del self._tasks[channel]
+                on_result(result)
+
+        task = asyncio.ensure_future(runner())
+        # Cancelling the runner before it starts must still cancel the request
+        task.add_done_callback(lambda t: request.cancel() if t.cancelled() else None)
+        self._tasks[channel] = task
+        return task
+
+    def cancel(self, channel: str):
+        """Cancel the pending request of ``channel``; its callbacks will never run."""
+        task = self._tasks.pop(channel, None)
+        if task and not task.done():
+            task.cancel()
+
+    def is_pending(self, channel: str) -> bool:
+        task = self._tasks.get(channel)
+        return bool(task) and not task.done()
+
+    def shutdown(self):
+        for channel in list(self._tasks):
+            self.cancel(channel)
+        self._executor.shutdown(wait=False, cancel_futures=True)
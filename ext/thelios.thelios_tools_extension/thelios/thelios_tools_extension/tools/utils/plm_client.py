@@ -0,0 +1,361 @@
+"""
+PLM client with a pooled, parameterized connection layer.
+
+Every PLM query used to open its own pyodbc connection and build the SQL
+with f-strings. This module keeps a small bounded pool of connections that
+are reused across calls (and threads) and runs only parameterized
+statements, so the server can reuse its cached query plans.
+
+Author: [Luca Scattolin - Thelios]
+Version: 1.0
+"""
+
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+import pyodbc
+
+from ... import constants
+
+
+class PLMConnectionPool:
+    """
+    Bounded, thread-safe pool of DB-API connections.
+
+    At most ``max_size`` connections are checked out at the same time; extra
+    callers wait up to ``timeout`` seconds for a free slot. Idle connections
+    are validated on checkout when they have been idle longer than
+    ``validate_after`` seconds, and broken ones are replaced transparently.
+
+    Args:
+        connect_fn (callable): Zero-argument factory returning a new connection
+        max_size (int): Maximum number of open connections
+        timeout (float): Seconds to wait for a free connection
+        validate_after (float): Idle seconds after which a connection is pinged
+    """
+
+    def __init__(self, connect_fn,
+                        max_size: int = constants.PLM_POOL_SIZE,
+                        timeout: float = constants.PLM_POOL_TIMEOUT,
+                        validate_after: float = constants.PLM_POOL_VALIDATE_IDLE):
+
+        self._connect_fn = connect_fn
+        self._timeout = timeout
+        self._validate_after = validate_after
+
+        self._slots = threading.BoundedSemaphore(max_size)
+        # LIFO keeps the most recently used (warm) connections in rotation
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._closed = False
+
+    @contextmanager
+    def connection(self):
+        """
+        Check out a connection for the duration of a ``with`` block.
+
+        The connection goes back to the pool when the block exits normally.
+        If the block raises, the connection is closed instead, since it may
+        be left in an unknown state.
+
+        Raises:
+            TimeoutError: If no connection becomes free within the pool timeout
+            RuntimeError: If the pool has been closed
+        """
+        if self._closed:
+            raise RuntimeError("PLM connection pool is closed")
+        if not self._slots.acquire(timeout=self._timeout):
+            raise TimeoutError(f"No PLM connection available after {self._timeout}s")
+
+        conn = None
+        try:
+            conn = self._checkout()
+            yield conn
+        except Exception:
+            self._discard(conn)
+            conn = None
+            raise
+        finally:
+            if conn is not None:
+                self._release(conn)
+            self._slots.release()
+
+    def _release(self, conn):
+        # Checked under the lock close() holds: a connection returned after close() is discarded, never requeued
+        with self._lock:
+            if not self._closed:
+                self._idle.put((conn, time.monotonic()))
+                return
+        self._discard(conn)
+
+    def close(self):
+        """
+        Close every idle connection and stop handing out new ones.
+
+        Connections still checked out (e.g. an unfinished streamed query)
+        are closed when they come back.
+        """
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._discard(conn)
+
+    def _checkout(self):
+        if self._closed:
+            raise RuntimeError("PLM connection pool is closed")
+        while True:
+            try:
+                conn, last_used = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect_fn()
+
+            if time.monotonic() - last_used < self._validate_after:
+                return conn
+            if self._is_alive(conn):
+                return conn
+            self._discard(conn)
+
+    def _is_alive(self, conn) -> bool:
+        try:
+            cur = conn.cursor()
+            cur.execute("SELECT 1")
+            cur.fetchone()
+            cur.close()
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, conn):
+        if conn is None:
+            return
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+def group_colorways(batches):
+    """
+    Group batches of (Style, Colorway) rows sorted by style into (Style, "Colorway|...") rows.
+
+    Yields one batch of grouped rows per input batch; a style split across
+    two batches is yielded once, with the later batch.
+    """
+    style, colorways = None, []
+    for batch in batches:
+        grouped = []
+        for row_style, colorway in batch:
+            if row_style != style:
+                if colorways:
+                    grouped.append((style, constants.PLM_COLORWAY_SEPARATOR.join(colorways)))
+                style, colorways = row_style, []
+            if colorway is not None:
+                colorways.append(str(colorway))
+        if grouped:
+            yield grouped
+    if colorways:
+        yield [(style, constants.PLM_COLORWAY_SEPARATOR.join(colorways))]
+
+class PLMClient:
+    """
+    Parameterized queries against the PLM render style view.
+
+    Args:
+        db_key (str): ODBC connection string, used by the default connection factory
+        table (str): Fully qualified name of the render style view
+        connect_fn (callable): Optional connection factory, e.g. a local SQLite
+                                stand-in for benchmarks. Defaults to pyodbc
+        pool_size (int): Maximum number of pooled connections
+
+    Example:
+        >>> client = PLMClient(constants.DB_KEY)
+        >>> client.get_style_skus("CD40153U")
+        [('32P', '262', 'DIORSIGNATURE'), ...]
+    """
+
+    def __init__(self, db_key: str = constants.DB_KEY,
+                        table: str = constants.RENDER_STYLE_TABLE,
+                        connect_fn=None,
+                        pool_size: int = constants.PLM_POOL_SIZE):
+
+        self.table = table
+        # STRING_AGG needs SQL Server 2017+ (compatibility level 140); switched off on the first failure
+        self.server_grouping = True
+
+        if connect_fn is None:
+            # Read-only usage: autocommit avoids holding an open transaction per connection
+            connect_fn = lambda: pyodbc.connect(db_key, autocommit=True)
+
+        self.pool = PLMConnectionPool(connect_fn, max_size=pool_size)
+
+    def fetch_all(self, sql: str, params: tuple = ()) -> list:
+        """Run a parameterized statement and return all rows as tuples."""
+        with self.pool.connection() as conn:
+            cur = conn.cursor()
+            try:
+                cur.execute(sql, params)
+                return [tuple(row) for row in cur.fetchall()]
+            finally:
+                cur.close()
+
+    def iter_rows(self, sql: str, params: tuple = (), batch_size: int = constants.PLM_FETCH_BATCH_SIZE):
+        """
+        Run a parameterized statement and yield its rows in fetchmany batches.
+
+        The first batch is available as soon as the server sends it, and only
+        one batch is held in memory at a time. The pooled connection stays
+        checked out until the generator is exhausted or closed.
+
+        Yields:
+            list: Up to ``batch_size`` row tuples
+        """
+        with self.pool.connection() as conn:
+            cur = conn.cursor()
+            try:
+                cur.execute(sql, params)
+                while True:
+                    rows = cur.fetchmany(batch_size)
+                    if not rows:
+                        return
+                    yield [tuple(row) for row in rows]
+            finally:
+                cur.close()
+
+    def get_brands(self) -> list:
+        sql = f"SELECT DISTINCT [Brand] FROM {self.table} ORDER BY [Brand]"
+        return [row[0] for row in self.fetch_all(sql)]
+
+    def get_styles(self) -> list:
+        """Return every distinct style code (feeds the model field autocomplete)."""
+        sql = f"SELECT DISTINCT [Style] FROM {self.table} ORDER BY [Style]"
+        return [row[0] for row in self.fetch_all(sql)]
+
+    def _styles_grouped_sql(self, season: str, brand: str, category_genders: list) -> tuple:
+        pair_filter = " OR ".join("([Category] = ? AND [Gender] = ?)" for _ in category_genders)
+        sql = f"""SELECT [Style], STRING_AGG([Colorway], '{constants.PLM_COLORWAY_SEPARATOR}') WITHIN GROUP (ORDER BY [Colorway])
+                    FROM (
+                        SELECT DISTINCT [Style], [Colorway]
+                        FROM {self.table}
+                        WHERE [Season] = ?
+                            AND [Brand] = ?
+                            AND [Colorway] IS NOT NULL
+                            AND ({pair_filter})
+                    ) AS style_colorways
+                    GROUP BY [Style]
+                    ORDER BY [Style]
+                """
+        params = (season, brand, *(value for pair in category_genders for value in pair))
+        return sql, params
+
+    def _styles_colorways_sql(self, season: str, brand: str, category_genders: list) -> tuple:
+        pair_filter = " OR ".join("([Category] = ? AND [Gender] = ?)" for _ in category_genders)
+        sql = f"""SELECT DISTINCT [Style], [Colorway]
+                    FROM {self.table}
+                    WHERE [Season] = ?
+                        AND [Brand] = ?
+                        AND ({pair_filter})
+                    ORDER BY [Style], [Colorway]
+                """
+        params = (season, brand, *(value for pair in category_genders for value in pair))
+        return sql, params
+
+    def _disable_server_grouping(self, error: Exception):
+        self.server_grouping = False
+        print(f"PLM: STRING_AGG not supported by the server (SQL Server 2017+ required), "
+                f"colorways are grouped client-side: {error}")
+
+    def get_styles_grouped(self, season: str, brand: str, category_genders: list) -> list:
+        """
+        Return one row per style with its colorways grouped on the server.
+
+        Any number of (Category, Gender) pairs is matched in a single round
+        trip; colorways come back de-duplicated and sorted in one
+        STRING_AGG column. STRING_AGG needs SQL Server 2017+: on older
+        servers the (Style, Colorway) rows are grouped client-side instead,
+        same result.
+
+        Args:
+            season (str): PLM season, e.g. "262"
+            brand (str): Brand name as stored in PLM
+            category_genders (list): (Category, Gender) pairs, e.g. [("Optical", "F"), ("Sun", "F")]
+
+        Returns:
+            list: (Style, "Colorway|Colorway|...") tuples sorted by style
+        """
+        colorways_sql = self._styles_colorways_sql(season, brand, category_genders)
+        if self.server_grouping:
+            try:
+                return self.fetch_all(*self._styles_grouped_sql(season, brand, category_genders))
+            except Exception as e:
+                # An offline server fails the fallback too: only then is the error raised
+                rows = self.fetch_all(*colorways_sql)
+                self._disable_server_grouping(e)
+                return [row for batch in group_colorways([rows]) for row in batch]
+        return [row for batch in group_colorways([self.fetch_all(*colorways_sql)]) for row in batch]
+
+    def iter_styles_grouped(self, season: str, brand: str, category_genders: list,
+                                batch_size: int = constants.PLM_FETCH_BATCH_SIZE):
+        """Streaming get_styles_grouped: yields batches of (Style, "Colorway|...") rows."""
+        colorways_sql = self._styles_colorways_sql(season, brand, category_genders)
+        if self.server_grouping:
+            batches = self.iter_rows(*self._styles_grouped_sql(season, brand, category_genders), batch_size)
+            try:
+                # The statement runs on the first batch: an unsupported STRING_AGG fails before any row
+                first = next(batches)
+            except StopIteration:
+                return
+            except Exception as e:
+                fallback = group_colorways(self.iter_rows(*colorways_sql, batch_size))
+                first = next(fallback, None)
+                self._disable_server_grouping(e)
+                if first is not None:
+                    yield first
+                    yield from fallback
+                return
+            yield first
+            yield from batches
+            return
+        yield from group_colorways(self.iter_rows(*colorways_sql, batch_size))
+
+    def get_style_skus(self, style: str) -> list:
+        """Return (Colorway, Season, Style_Name) rows for a single style."""
+        sql = f"""SELECT [Colorway], [Season], [Style_Name]
+                    FROM {self.table}
+                    WHERE [Style] = ?
+                """
+        return self.fetch_all(sql, (style,))
+
+    def _styles_skus_chunks(self, styles: list):
+        for start in range(0, len(styles), constants.PLM_IN_CHUNK_SIZE):
+            chunk = styles[start:start + constants.PLM_IN_CHUNK_SIZE]
+            placeholders = ", ".join("?" * len(chunk))
+            sql = f"""SELECT [Style], [Colorway], [Season], [Style_Name]
+                        FROM {self.table}
+                        WHERE [Style] IN ({placeholders})
+                    """
+            yield sql, tuple(chunk)
+
+    def get_styles_skus(self, styles: list) -> list:
+        """
+        Return (Style, Colorway, Season, Style_Name) rows for many styles.
+
+        Styles are looked up with batched IN queries of at most
+        PLM_IN_CHUNK_SIZE parameters each (SQL Server accepts 2100).
+        """
+        rows = []
+        for sql, params in self._styles_skus_chunks(styles):
+            rows.extend(self.fetch_all(sql, params))
+        return rows
+
+    def iter_styles_skus(self, styles: list, batch_size: int = constants.PLM_FETCH_BATCH_SIZE):
+        """Streaming get_styles_skus: yields batches of (Style, Colorway, Season, Style_Name) rows."""
+        for sql, params in self._styles_skus_chunks(styles):
+            yield from self.iter_rows(sql, params, batch_size)
+
+    def close(self):
+        self.pool.close()
@@ -0,0 +1,235 @@
+"""
+Timing and volume metrics for PLM queries.
+
+Every query function of queries.py is wrapped with ``instrumented``: each call
+records its duration, row count, approximate bytes fetched, the answering
+source (local mirror or PLM) and the caller (panel/action) in a rolling
+store with p50/p95 per query shape. Calls slower than PLM_SLOW_QUERY_MS are
+appended to the slow-query log (one JSON object per line), so the DBA gets
+hard numbers on vw_render_style_sku.
+
+A query shape is the query function, its source and the size bucket of its
+list argument, e.g. "get_sku_models_plm[plm, n=11-100]".
+
+Example:
+    >>> @instrumented
+    ... def get_brands(db_key, caller=None): ...
+    >>> get_brands(constants.DB_KEY, caller="collection.brands")
+    >>> METRICS.report()
+
+Author: [Luca Scattolin - Thelios]
+Version: 1.0
+"""
+
+import functools
+import inspect
+import json
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+from ... import constants
+
+_local = threading.local()
+
+def set_source(source: str):
+    """Note which source ("mirror" or "plm") answers the query running on this thread."""
+    _local.source = source
+
+def _size_bucket(n: int) -> str:
+    if n <= 1:
+        return str(n)
+    if n <= 10:
+        return "2-10"
+    if n <= 100:
+        return "11-100"
+    return "101+"
+
+def _payload_size(value) -> int:
+    # Approximate bytes fetched: text length for strings, 8 bytes for scalars
+    if value is None:
+        return 0
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(_payload_size(k) + _payload_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(_payload_size(v) for v in value)
+    return 8
+
+def _row_count(value) -> int:
+    if isinstance(value, dict):
+        return sum(len(v) if isinstance(v, (list, tuple)) else 1 for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return len(value)
+    return 0 if value is None else 1
+
+def _percentile(sorted_values: list, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+class QueryMetrics:
+    """
+    Rolling per-shape query statistics plus the slow-query log.
+
+    Args:
+        window (int): Latest samples kept per shape for the percentiles
+        slow_ms (float): Threshold above which a call is written to the slow log
+        slow_log_path (Path): Slow-query log file (JSON lines), None to disable
+    """
+
+    def __init__(self, window: int = constants.PLM_METRICS_WINDOW,
+                        slow_ms: float = constants.PLM_SLOW_QUERY_MS,
+                        slow_log_path: Path = constants.PLM_SLOW_QUERY_LOG):
+
+        self.window = window
+        self.slow_ms = slow_ms
+        self.slow_log_path = Path(slow_log_path) if slow_log_path else None
+
+        self._lock = threading.Lock()
+        self._shapes = {}
+
+    def record(self, shape: str, duration_ms: float, rows: int, nbytes: int,
+                    caller: str = None, source: str = None, error: str = None):
+
+        with self._lock:
+            stats = self._shapes.get(shape)
+            if stats is None:
+                stats = {"samples": deque(maxlen=self.window), "count": 0, "errors": 0,
+                            "rows": 0, "bytes": 0, "callers": {}}
+                self._shapes[shape] = stats
+            stats["samples"].append(duration_ms)
+            stats["count"] += 1
+            stats["rows"] += rows
+            stats["bytes"] += nbytes
+            stats["errors"] += 1 if error else 0
+            caller_key = caller or "unknown"
+            stats["callers"][caller_key] = stats["callers"].get(caller_key, 0) + 1
+
+        if duration_ms >= self.slow_ms:
+            self._log_slow({"time": time.strftime("%Y-%m-%d %H:%M:%S"),
+                            "shape": shape,
+                            "ms": round(duration_ms, 1),
+                            "rows": rows,
+                            "bytes": nbytes,
+                            "caller": caller_key,
+                            "source": source,
+                            "error": error})
+
+    def _log_slow(self, entry: dict):
+        if self.slow_log_path is None:
+            return
+        try:
+            self.slow_log_path.parent.mkdir(parents=True, exist_ok=True)
+            with self._lock, open(self.slow_log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+        except OSError as e:
+            print(f"PLM metrics: cannot write slow-query log: {e}")
+
+    def summary(self) -> dict:
+        """
+        Returns:
+            dict: {shape: {count, errors, p50_ms, p95_ms, max_ms, rows, bytes, callers}}
+        """
+        with self._lock:
+            result = {}
+            for shape, stats in self._shapes.items():
+                samples = sorted(stats["samples"])
+                result[shape] = {"count": stats["count"],
+                                    "errors": stats["errors"],
+                                    "p50_ms": round(_percentile(samples, 50), 1),
+                                    "p95_ms": round(_percentile(samples, 95), 1),
+                                    "max_ms": round(samples[-1], 1) if samples else 0.0,
+                                    "rows": stats["rows"],
+                                    "bytes": stats["bytes"],
+                                    "callers": dict(stats["callers"])}
+            return result
+
+    def report(self):
+        """Print the per-shape summary, slowest p95 first."""
+        summary = self.summary()
+        if not summary:
+            return
+        print("--- PLM query metrics ---")
+        for shape, s in sorted(summary.items(), key=lambda item: item[1]["p95_ms"], reverse=True):
+            print(f"{shape}: {s['count']} calls, p50 {s['p50_ms']} ms, p95 {s['p95_ms']} ms, "
+                    f"max {s['max_ms']} ms, {s['rows']} rows, {s['bytes']} bytes, {s['errors']} errors")
+
+    def reset(self):
+        with self._lock:
+            self._shapes.clear()
+
+METRICS = QueryMetrics()
+
+def _shape(fn, args, source: str = None) -> str:
+    source = source or "?"
+    sizes = [len(a) for a in args if isinstance(a, (list, tuple))]
+    if sizes:
+        return f"{fn.__name__}[{source}, n={_size_bucket(sizes[0])}]"
+    return f"{fn.__name__}[{source}]"
+
+def instrumented(fn):
+    """
+    Record timing, rows, bytes and caller of a query function into METRICS.
+
+    The wrapped function gains a ``caller`` keyword (panel/action name, e.g.
+    "custom_model.sku_lookup"). Generator functions are measured over their
+    whole iteration, counting only the time spent fetching (not the time the
+    consumer keeps the generator suspended).
+    """
+    if inspect.isgeneratorfunction(fn):
+        @functools.wraps(fn)
+        def gen_wrapper(*args, caller=None, **kwargs):
+            _local.source = None
+            source = None
+            elapsed = 0.0
+            rows = 0
+            nbytes = 0
+            error = None
+            iterator = fn(*args, **kwargs)
+            try:
+                while True:
+                    start = time.perf_counter()
+                    try:
+                        batch = next(iterator)
+                    except StopIteration:
+                        return
+                    finally:
+                        elapsed += time.perf_counter() - start
+                        # Batches may be fetched on different executor threads: keep the first source seen
+                        source = source or getattr(_local, "source", None)
+                    rows += _row_count(batch)
+                    nbytes += _payload_size(batch)
+                    yield batch
+            except GeneratorExit:
+                iterator.close()
+                raise
+            except Exception as e:
+                error = str(e)
+                raise
+            finally:
+                METRICS.record(_shape(fn, args, source), elapsed * 1000, rows, nbytes,
+                                caller=caller, source=source, error=error)
+        return gen_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args, caller=None, **kwargs):
+        _local.source = None
+        start = time.perf_counter()
+        result = None
+        error = None
+        try:
+            result = fn(*args, **kwargs)
+            return result
+        except Exception as e:
+            error = str(e)
+            raise
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            source = getattr(_local, "source", None)
+            METRICS.record(_shape(fn, args, source), duration_ms, _row_count(result), _payload_size(result),
+                            caller=caller, source=source, error=error)
+    return wrapper
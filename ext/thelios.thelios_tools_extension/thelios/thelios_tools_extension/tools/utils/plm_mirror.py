@@ -0,0 +1,366 @@
+"""
+Local SQLite mirror of the PLM render style view.
+
+Artists browse seasons and brands all day; answering those lookups from an
+indexed on-disk copy of [ReportDB].[dbo].[vw_render_style_sku] takes a few
+milliseconds instead of a WAN round trip to SQL Server. A background thread
+keeps the mirror current and the last snapshot keeps serving when the PLM
+is unreachable.
+
+Sync strategy:
+    - Incremental: when the view exposes PLM_MIRROR_MODIFIED_COLUMN, only rows
+      changed since the last synced value are fetched and upserted.
+    - Full: the first sync and then every PLM_MIRROR_FULL_SYNC_INTERVAL
+      seconds (to drop rows deleted upstream) replace the whole snapshot in
+      one transaction. Without a change column only full syncs run: the
+      snapshot is kept between them, and queries.py looks up upstream the
+      styles a lookup does not find in it (created in PLM since then).
+    - Per style: refresh_styles() replaces the rows of a few styles on
+      demand, for callers (release sync) that must not act on rows deleted
+      upstream since the last full sync.
+
+A configured change column that the view does not expose is remembered in
+sync_state, so it is not retried (and incremental sync stays off) across
+restarts until the configuration names another column.
+
+Author: [Luca Scattolin - Thelios]
+Version: 1.0
+"""
+
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from ... import constants
+from .plm_client import PLMClient
+
+MIRROR_TABLE = "render_style_sku"
+MIRROR_COLUMNS = ("Style", "Colorway", "Season", "Brand", "Category", "Gender", "Style_Name")
+MIRROR_KEY = MIRROR_COLUMNS[:3]
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS {MIRROR_TABLE} (
+    [Style] TEXT NOT NULL,
+    [Colorway] TEXT NOT NULL,
+    [Season] TEXT NOT NULL,
+    [Brand] TEXT,
+    [Category] TEXT,
+    [Gender] TEXT,
+    [Style_Name] TEXT,
+    PRIMARY KEY ([Style], [Colorway], [Season])
+);
+CREATE INDEX IF NOT EXISTS ix_season_brand ON {MIRROR_TABLE} ([Season], [Brand], [Category], [Gender]);
+CREATE INDEX IF NOT EXISTS ix_brand ON {MIRROR_TABLE} ([Brand]);
+CREATE INDEX IF NOT EXISTS ix_category_gender ON {MIRROR_TABLE} ([Category], [Gender]);
+CREATE TABLE IF NOT EXISTS sync_state (
+    [key] TEXT PRIMARY KEY,
+    [value] TEXT
+);
+"""
+
+class PLMMirror:
+    """
+    On-disk SQLite copy of the PLM render style view.
+
+    Exposes the same read methods as PLMClient (get_brands,
+    get_styles_grouped, get_styles_skus and their streaming iter_* variants)
+    so queries.py can answer from either source.
+
+    Args:
+        client (PLMClient): Client used to fetch rows from the PLM
+        db_path (Path): Location of the SQLite mirror file
+        modified_column (str): Change-tracking column of the PLM view, or None
+                                to always run full syncs
+    """
+
+    def __init__(self, client: PLMClient,
+                        db_path: Path = constants.PLM_MIRROR_PATH,
+                        modified_column: str = constants.PLM_MIRROR_MODIFIED_COLUMN):
+
+        self.client = client
+        self.db_path = Path(db_path)
+        self.modified_column = modified_column
+
+        self._write_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._sync_thread = None
+        self._ready = False
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._transaction() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # One short-lived connection per call: cheap for SQLite and safe across threads.
+        # Streamed reads resume on whichever executor thread is free (never two at once)
+        return sqlite3.connect(self.db_path, timeout=constants.PLM_POOL_TIMEOUT, check_same_thread=False)
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._connect()
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _fetch(self, sql: str, params: tuple = ()) -> list:
+        conn = self._connect()
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    def _iter_rows(self, sql: str, params: tuple = (), batch_size: int = constants.PLM_FETCH_BATCH_SIZE):
+        conn = self._connect()
+        try:
+            cur = conn.execute(sql, params)
+            while True:
+                rows = cur.fetchmany(batch_size)
+                if not rows:
+                    return
+                yield rows
+        finally:
+            conn.close()
+
+    #MARK: STATE
+    # Sync state --------------------------------------------------------------------------------
+
+    def _get_state(self, key: str):
+        rows = self._fetch("SELECT [value] FROM sync_state WHERE [key] = ?", (key,))
+        return rows[0][0] if rows else None
+
+    def is_ready(self) -> bool:
+        """True once at least one full snapshot has been stored."""
+        if not self._ready:
+            self._ready = self._get_state("last_full_sync") is not None
+        return self._ready
+
+    def last_sync(self) -> float | None:
+        value = self._get_state("last_sync")
+        return float(value) if value is not None else None
+
+    #MARK: SYNC
+    # Sync functions ----------------------------------------------------------------------------
+
+    def sync(self) -> int:
+        """
+        Bring the mirror up to date with the PLM.
+
+        Runs a full sync when one is due, an incremental
+        one when the view has a change column, and nothing otherwise.
+        Errors (e.g. PLM offline) are reported and leave the snapshot untouched.
+
+        Returns:
+            int: Number of rows written, -1 if the sync failed
+        """
+        last_full = self._get_state("last_full_sync")
+        watermark = self._get_state("watermark")
+        if self.modified_column and self._get_state("missing_modified_column") == self.modified_column:
+            self.modified_column = None
+
+        full_due = (last_full is None
+                    or time.time() - float(last_full) > constants.PLM_MIRROR_FULL_SYNC_INTERVAL)
+
+        try:
+            if full_due:
+                return self._sync_full()
+            if not self.modified_column or watermark is None:
+                # No change tracking: the snapshot stays until the next full sync
+                return 0
+            return self._sync_incremental(watermark)
+        except Exception as e:
+            print(f"PLM mirror sync failed, serving last snapshot: {e}")
+            return -1
+
+    def _select_columns(self) -> str:
+        columns = ", ".join(f"[{c}]" for c in MIRROR_COLUMNS)
+        if self.modified_column:
+            columns += f", [{self.modified_column}]"
+        return columns
+
+    def _sync_full(self) -> int:
+        sql = f"SELECT {self._select_columns()} FROM {self.client.table}"
+        missing_column = None
+        try:
+            rows = self.client.fetch_all(sql)
+        except Exception:
+            if not self.modified_column:
+                raise
+            # Retry without the change column: if that works the view simply lacks it
+            # (an offline PLM raises again here and keeps incremental sync enabled)
+            columns = ", ".join(f"[{c}]" for c in MIRROR_COLUMNS)
+            rows = self.client.fetch_all(f"SELECT {columns} FROM {self.client.table}")
+            print(f"PLM mirror: column '{self.modified_column}' not available, incremental sync disabled")
+            missing_column = self.modified_column
+            self.modified_column = None
+
+        now = time.time()
+        with self._write_lock, self._transaction() as conn:
+            conn.execute(f"DELETE FROM {MIRROR_TABLE}")
+            self._upsert(conn, rows)
+            state = {"last_full_sync": now, "last_sync": now}
+            watermark = self._max_watermark(rows)
+            if watermark is not None:
+                state["watermark"] = watermark
+            if missing_column:
+                state["missing_modified_column"] = missing_column
+            self._set_state(conn, state)
+
+        print(f"PLM mirror: full sync, {len(rows)} rows")
+        return len(rows)
+
+    def _sync_incremental(self, watermark: str) -> int:
+        sql = f"""SELECT {self._select_columns()}
+                    FROM {self.client.table}
+                    WHERE [{self.modified_column}] > ?
+                """
+        rows = self.client.fetch_all(sql, (watermark,))
+
+        with self._write_lock, self._transaction() as conn:
+            self._upsert(conn, rows)
+            state = {"last_sync": time.time()}
+            new_watermark = self._max_watermark(rows)
+            if new_watermark is not None:
+                state["watermark"] = new_watermark
+            self._set_state(conn, state)
+
+        if rows:
+            print(f"PLM mirror: incremental sync, {len(rows)} changed rows")
+        return len(rows)
+
+    def refresh_styles(self, styles: list) -> list:
+        """
+        Replace the mirror rows of ``styles`` with a fresh answer from the PLM.
+
+        Incremental syncs never see rows deleted upstream; callers that act on
+        a missing SKU (release sync removes it from the scene) refresh its
+        styles first. Raises if the PLM is unreachable: the snapshot is kept.
+
+        Returns:
+            list: (Style, Colorway, Season, Style_Name) rows of the styles
+        """
+        columns = ", ".join(f"[{c}]" for c in MIRROR_COLUMNS)
+        rows = []
+        chunks = []
+        for start in range(0, len(styles), constants.PLM_IN_CHUNK_SIZE):
+            chunk = styles[start:start + constants.PLM_IN_CHUNK_SIZE]
+            placeholders = ", ".join("?" * len(chunk))
+            sql = f"SELECT {columns} FROM {self.client.table} WHERE [Style] IN ({placeholders})"
+            rows.extend(self.client.fetch_all(sql, tuple(chunk)))
+            chunks.append((placeholders, tuple(chunk)))
+
+        with self._write_lock, self._transaction() as conn:
+            for placeholders, params in chunks:
+                conn.execute(f"DELETE FROM {MIRROR_TABLE} WHERE [Style] IN ({placeholders})", params)
+            self._upsert(conn, rows)
+
+        # Same rows as get_styles_skus (the rows stored above)
+        style_name = MIRROR_COLUMNS.index("Style_Name")
+        return [(row[0], row[1], row[2], row[style_name]) for row in rows if None not in row[:len(MIRROR_KEY)]]
+
+    def _upsert(self, conn: sqlite3.Connection, rows: list):
+        width = len(MIRROR_COLUMNS)
+        placeholders = ", ".join("?" * width)
+        # Rows without a Style, Colorway or Season are not SKUs (group_colorways skips them too)
+        # and would abort the whole transaction on the NOT NULL primary key
+        conn.executemany(f"INSERT OR REPLACE INTO {MIRROR_TABLE} VALUES ({placeholders})",
+                            (tuple(str(v) if v is not None else None for v in row[:width])
+                                for row in rows if None not in row[:len(MIRROR_KEY)]))
+
+    def _max_watermark(self, rows: list):
+        if not self.modified_column or not rows:
+            return None
+        values = [row[len(MIRROR_COLUMNS)] for row in rows if row[len(MIRROR_COLUMNS)] is not None]
+        if not values:
+            return None
+        # Stored as ISO text (millisecond precision fits SQL Server datetime) and sent back as a parameter
+        latest = max(values)
+        return latest.isoformat(sep=" ", timespec="milliseconds") if hasattr(latest, "isoformat") else str(latest)
+
+    def _set_state(self, conn: sqlite3.Connection, state: dict):
+        conn.executemany("INSERT OR REPLACE INTO sync_state VALUES (?, ?)",
+                            [(k, str(v)) for k, v in state.items()])
+
+    def start_background_sync(self, interval: float = constants.PLM_MIRROR_SYNC_INTERVAL):
+        """Sync now and then every ``interval`` seconds on a daemon thread."""
+        if self._sync_thread and self._sync_thread.is_alive():
+            return
+
+        def loop():
+            while not self._stop_event.is_set():
+                self.sync()
+                self._stop_event.wait(interval)
+
+        self._stop_event.clear()
+        self._sync_thread = threading.Thread(target=loop, name="plm_mirror_sync", daemon=True)
+        self._sync_thread.start()
+
+    def stop_background_sync(self):
+        self._stop_event.set()
+
+    #MARK: QUERIES
+    # Read functions (same signatures as PLMClient) -----------------------------------------------
+
+    def get_brands(self) -> list:
+        sql = f"SELECT DISTINCT [Brand] FROM {MIRROR_TABLE} ORDER BY [Brand]"
+        return [row[0] for row in self._fetch(sql)]
+
+    def get_styles(self) -> list:
+        sql = f"SELECT DISTINCT [Style] FROM {MIRROR_TABLE} ORDER BY [Style]"
+        return [row[0] for row in self._fetch(sql)]
+
+    def _styles_grouped_sql(self, season: str, brand: str, category_genders: list) -> tuple:
+        pair_filter = " OR ".join("([Category] = ? AND [Gender] = ?)" for _ in category_genders)
+        sql = f"""SELECT [Style], GROUP_CONCAT([Colorway], '{constants.PLM_COLORWAY_SEPARATOR}')
+                    FROM (
+                        SELECT DISTINCT [Style], [Colorway]
+                        FROM {MIRROR_TABLE}
+                        WHERE [Season] = ?
+                            AND [Brand] = ?
+                            AND [Colorway] IS NOT NULL
+                            AND ({pair_filter})
+                        ORDER BY [Style], [Colorway]
+                    )
+                    GROUP BY [Style]
+                    ORDER BY [Style]
+                """
+        params = (str(season), brand, *(value for pair in category_genders for value in pair))
+        return sql, params
+
+    def get_styles_grouped(self, season: str, brand: str, category_genders: list) -> list:
+        return self._fetch(*self._styles_grouped_sql(season, brand, category_genders))
+
+    def iter_styles_grouped(self, season: str, brand: str, category_genders: list,
+                                batch_size: int = constants.PLM_FETCH_BATCH_SIZE):
+        yield from self._iter_rows(*self._styles_grouped_sql(season, brand, category_genders), batch_size)
+
+    def get_style_skus(self, style: str) -> list:
+        sql = f"""SELECT [Colorway], [Season], [Style_Name]
+                    FROM {MIRROR_TABLE}
+                    WHERE [Style] = ?
+                """
+        return self._fetch(sql, (style,))
+
+    def _styles_skus_chunks(self, styles: list):
+        for start in range(0, len(styles), constants.PLM_IN_CHUNK_SIZE):
+            chunk = styles[start:start + constants.PLM_IN_CHUNK_SIZE]
+            placeholders = ", ".join("?" * len(chunk))
+            sql = f"""SELECT [Style], [Colorway], [Season], [Style_Name]
+                        FROM {MIRROR_TABLE}
+                        WHERE [Style] IN ({placeholders})
+                    """
+            yield sql, tuple(chunk)
+
+    def get_styles_skus(self, styles: list) -> list:
+        rows = []
+        for sql, params in self._styles_skus_chunks(styles):
+            rows.extend(self._fetch(sql, params))
+        return rows
+
+    def iter_styles_skus(self, styles: list, batch_size: int = constants.PLM_FETCH_BATCH_SIZE):
+        for sql, params in self._styles_skus_chunks(styles):
+            yield from self._iter_rows(sql, params, batch_size)
@@ -0,0 +1,195 @@
+"""
+Predictive background prefetch of All Collection PLM queries.
+
+Artists usually walk through the brands in combo order and through
+consecutive seasons. After a query for (season, brand, type) the prefetcher
+fetches the likely next keys on a single low-priority background thread:
+
+    - the next brand of the brand combo
+    - the next season (release codes are YY + release of the year: 262 -> 271)
+    - the same category for the other gender
+
+Results fill a bounded LRU cache, so the next click is answered instantly.
+Hit/miss counters show whether prefetching pays off.
+
+Example:
+    >>> prefetch = PLMPrefetcher(lambda key: qu.get_plm_data_multi(db_key, *key))
+    >>> prefetch.get(("262", "Dior Femme", "Optical - Woman"))      # miss -> None
+    >>> prefetch.schedule(neighbour_keys("262", "Dior Femme", "Optical - Woman", brands))
+
+Author: [Luca Scattolin - Thelios]
+Version: 1.0
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from ... import constants
+
+def next_season(season: str) -> str:
+    """Next release code, e.g. "261" -> "262" and "262" -> "271" with 2 releases a year."""
+    season = str(season)
+    year, release = int(season[:-1]), int(season[-1])
+    if release >= constants.PLM_RELEASES_PER_YEAR:
+        return f"{year + 1}1"
+    return f"{year}{release + 1}"
+
+def other_gender(type_value: str) -> str | None:
+    """Same category for the other gender, e.g. "Sun - Woman" -> "Sun - Man"."""
+    if "Woman" in type_value:
+        other = type_value.replace("Woman", "Man")
+    else:
+        other = type_value.replace("Man", "Woman")
+    return other if other in constants.GENRES and other != type_value else None
+
+def neighbour_keys(season: str, brand: str, type_value: str, brands: list) -> list:
+    """
+    Likely next (season, brand, type) keys after a query, most likely first.
+
+    Args:
+        season (str): Queried release code
+        brand (str): Queried brand
+        type_value (str): Queried GENRES type
+        brands (list): Brands in combo order
+    """
+    keys = []
+    if brand in brands:
+        next_brand = brands[(brands.index(brand) + 1) % len(brands)]
+        if next_brand != brand:
+            keys.append((season, next_brand, type_value))
+    try:
+        keys.append((next_season(season), brand, type_value))
+    except ValueError:
+        pass
+    other = other_gender(type_value)
+    if other:
+        keys.append((season, brand, other))
+    return keys
+
+class PLMPrefetcher:
+    """
+    Bounded LRU of query results plus a single low-priority prefetch worker.
+
+    Args:
+        fetch_fn (callable): Blocking fetch, called with a (season, brand, type) key
+        capacity (int): Maximum number of cached keys
+        ttl (float): Seconds a cached result stays valid
+    """
+
+    def __init__(self, fetch_fn,
+                        capacity: int = constants.PLM_PREFETCH_CACHE_SIZE,
+                        ttl: float = constants.PLM_PREFETCH_TTL):
+
+        self._fetch_fn = fetch_fn
+        self.capacity = capacity
+        self.ttl = ttl
+
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._pending = []
+        self._wakeup = threading.Event()
+        self._stopped = False
+        self._worker = None
+
+        self.hits = 0
+        self.misses = 0
+        self.prefetched = 0
+        self.prefetch_hits = 0
+
+    #MARK: CACHE
+    # LRU cache -----------------------------------------------------------------------------------
+
+    def get(self, key: tuple):
+        """Cached rows for ``key`` (counted as hit), or None (counted as miss)."""
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None or time.monotonic() - entry[1] > self.ttl:
+                self._cache.pop(key, None)
+                self.misses += 1
+                return None
+            rows, _, prefetched = entry
+            self._cache.move_to_end(key)
+            self.hits += 1
+            if prefetched:
+                self.prefetch_hits += 1
+                # Count a prefetch only once, on its first use
+                self._cache[key] = (rows, entry[1], False)
+            return rows
+
+    def put(self, key: tuple, rows: list, prefetched: bool = False):
+        with self._lock:
+            self._cache[key] = (rows, time.monotonic(), prefetched)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.capacity:
+                self._cache.popitem(last=False)
+
+    def _is_cached(self, key: tuple) -> bool:
+        with self._lock:
+            entry = self._cache.get(key)
+            return entry is not None and time.monotonic() - entry[1] <= self.ttl
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    #MARK: PREFETCH
+    # Background worker ----------------------------------------------------------------------------
+
+    def schedule(self, keys: list):
+        """
+        Prefetch ``keys`` in the background, replacing any not yet started.
+
+        Already cached keys are skipped. The worker waits PLM_PREFETCH_DELAY
+        seconds before each fetch, so foreground queries go first.
+        """
+        with self._lock:
+            self._pending = [key for key in keys if key not in self._cache]
+        if self._worker is None or not self._worker.is_alive():
+            self._stopped = False
+            self._worker = threading.Thread(target=self._run, name="plm_prefetch", daemon=True)
+            self._worker.start()
+        self._wakeup.set()
+
+    def _run(self):
+        while not self._stopped:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            while not self._stopped:
+                time.sleep(constants.PLM_PREFETCH_DELAY)
+                with self._lock:
+                    if not self._pending:
+                        break
+                    key = self._pending.pop(0)
+                if self._is_cached(key):
+                    continue
+                try:
+                    rows = self._fetch_fn(key)
+                except Exception as e:
+                    print(f"PLM prefetch of {key} failed: {e}")
+                    continue
+                self.put(key, rows, prefetched=True)
+                self.prefetched += 1
+
+    def stop(self):
+        self._stopped = True
+        with self._lock:
+            self._pending = []
+        self._wakeup.set()
+
+    #MARK: STATS
+    # Counters -------------------------------------------------------------------------------------
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {"hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "prefetched": self.prefetched,
+                "prefetch_hits": self.prefetch_hits,
+                "cached": len(self._cache)}
+
+    def report(self):
+        s = self.stats()
+        print(f"PLM prefetch: {s['hits']} hits / {s['misses']} misses ({s['hit_rate']:.0%}), "
+                f"{s['prefetch_hits']} of {s['prefetched']} prefetched results used")
@@ -0,0 +1,196 @@
+"""
+Name -> paths index of the stage prims, kept current from change notices.
+
+find_scope_by_name and _get_or_create_prim used to run stage.Traverse() on
+every call (every mesh of every referenced SKU) and return the first prim
+with a matching name, which is the wrong one as soon as the same SKU is
+imported in two releases. Exact paths are now looked up with GetPrimAtPath,
+and name lookups go through this multimap:
+
+    - it is built once with the same predicate as Traverse() (active,
+      loaded, defined, non-abstract prims)
+    - a Usd.Notice.ObjectsChanged listener queues the resynced prim paths;
+      value-only changes and property resyncs are ignored
+    - queued subtrees are dropped and re-walked on the next lookup, so an
+      import of N SKUs costs one walk of the new SKUs, not N full traversals
+
+Example:
+    >>> index = get_prim_index()
+    >>> index.paths_of("Release_262")
+    [Sdf.Path('/World/Models/glass_Xform/CD40153U_Xform/Release_262'), ...]
+    >>> index.find("Lights", UsdGeom.Scope)
+    Usd.Prim(</World/Lights>)
+
+Author: [Luca Scattolin - Thelios]
+Version: 1.0
+"""
+
+import omni.usd
+from pxr import Sdf, Tf, Usd
+
+class PrimIndex:
+    """
+    Multimap of prim name -> prim paths for one stage.
+
+    Args:
+        stage_fn (callable): Returns the stage to index. Defaults to the
+                                current omni.usd context stage, so the index
+                                follows stage open/close on its own
+    """
+
+    def __init__(self, stage_fn=None):
+        self._stage_fn = stage_fn or (lambda: omni.usd.get_context().get_stage())
+
+        self._stage = None
+        self._listener = None
+        self._dirty = True
+        self._pending = set()
+
+        self._by_name = {}
+        self._children = {}
+
+        self.rebuilds = 0
+
+    #MARK: STAGE
+    # Stage binding -------------------------------------------------------------------------------
+
+    def attach(self, stage: Usd.Stage):
+        """Index ``stage`` and listen to its changes (replaces the previous stage)."""
+        self.detach()
+        self._stage = stage
+        if stage:
+            self._listener = Tf.Notice.Register(Usd.Notice.ObjectsChanged, self._on_objects_changed, stage)
+
+    def detach(self):
+        if self._listener:
+            self._listener.Revoke()
+        self._listener = None
+        self._stage = None
+        self._dirty = True
+        self._pending = set()
+
+    def invalidate(self):
+        self._dirty = True
+
+    def _current(self):
+        stage = self._stage_fn()
+        if stage != self._stage:
+            self.attach(stage)
+        if self._dirty:
+            self._rebuild()
+        elif self._pending:
+            self._flush()
+
+    #MARK: READ
+    # Read functions ----------------------------------------------------------------------------------
+
+    def __len__(self):
+        self._current()
+        return len(self._children) - 1
+
+    def __contains__(self, path) -> bool:
+        self._current()
+        return Sdf.Path(path) in self._children
+
+    def paths_of(self, name: str) -> list:
+        """Paths of every prim called ``name``, shallowest first."""
+        self._current()
+        paths = self._by_name.get(name)
+        if not paths:
+            return []
+        return sorted(paths, key=lambda p: (p.pathElementCount, p))
+
+    def find(self, name: str, schema=None) -> Usd.Prim | None:
+        """
+        Prim called ``name`` (and of type ``schema``, e.g. UsdGeom.Scope), None if there is none.
+
+        When the name repeats, the shallowest path wins (ties broken by path),
+        so the result does not depend on traversal order.
+        """
+        for path in self.paths_of(name):
+            prim = self._stage.GetPrimAtPath(path)
+            if prim and (schema is None or prim.IsA(schema)):
+                return prim
+        return None
+
+    #MARK: BUILD
+    # Build and incremental updates -----------------------------------------------------------------
+
+    def _rebuild(self):
+        self._by_name = {}
+        self._children = {Sdf.Path.absoluteRootPath: set()}
+        self._pending = set()
+        self._dirty = False
+        self.rebuilds += 1
+
+        if not self._stage:
+            return
+        self._walk(self._stage.GetPseudoRoot())
+
+    def _walk(self, root: Usd.Prim):
+        # Default predicate: the prims stage.Traverse() would visit
+        prim_range = iter(Usd.PrimRange(root))
+        if root.IsPseudoRoot():
+            next(prim_range)
+        for prim in prim_range:
+            path = prim.GetPath()
+            self._by_name.setdefault(path.name, set()).add(path)
+            self._children[path] = set()
+            self._children[path.GetParentPath()].add(path)
+
+    def _drop(self, path: Sdf.Path):
+        stack = [path]
+        while stack:
+            current = stack.pop()
+            children = self._children.pop(current, ())
+            stack.extend(children)
+            names = self._by_name.get(current.name)
+            if names:
+                names.discard(current)
+                if not names:
+                    del self._by_name[current.name]
+        parent = self._children.get(path.GetParentPath())
+        if parent:
+            parent.discard(path)
+
+    def _flush(self):
+        pending, self._pending = self._pending, set()
+        done = set()
+        for path in sorted(pending, key=lambda p: p.pathElementCount):
+            # A queued ancestor already re-walked this subtree
+            if any(prefix in done for prefix in path.GetPrefixes()[:-1]):
+                continue
+            done.add(path)
+            self._drop(path)
+            if path.GetParentPath() not in self._children:
+                # Parent not indexed (inactive, unloaded): nothing below it is either
+                continue
+            prim = self._stage.GetPrimAtPath(path)
+            if prim and prim.IsActive() and prim.IsLoaded() and prim.IsDefined() and not prim.IsAbstract():
+                self._walk(prim)
+
+    def _on_objects_changed(self, notice, sender):
+        if self._dirty:
+            return
+        for path in notice.GetResyncedPaths():
+            if path.IsPropertyPath():
+                continue
+            if path == Sdf.Path.absoluteRootPath:
+                self._dirty = True
+                return
+            self._pending.add(path.GetPrimPath())
+
+_INDEX = None
+
+def get_prim_index() -> PrimIndex:
+    """Prim index of the current Kit stage, shared by every tool."""
+    global _INDEX
+    if _INDEX is None:
+        _INDEX = PrimIndex()
+    return _INDEX
+
+def shutdown():
+    global _INDEX
+    if _INDEX is not None:
+        _INDEX.detach()
+        _INDEX = None
@@ -1,83 +1,216 @@
-import pyodbc
+import threading
+
 from ... import constants
+from . import plm_metrics
+from .plm_client import PLMClient
+from .plm_metrics import instrumented
+from .plm_mirror import PLMMirror
+
+#One pooled client (and local mirror) per connection string, shared by every caller
+_clients = {}
+_mirrors = {}
+_clients_lock = threading.Lock()
+
+def get_client(db_key) -> PLMClient:
+
+    with _clients_lock:
+        client = _clients.get(db_key)
+        if client is None:
+            client = PLMClient(db_key)
+            _clients[db_key] = client
+        return client
+
+def get_mirror(db_key) -> PLMMirror | None:
+
+    if not constants.PLM_MIRROR_ENABLED:
+        return None
+
+    client = get_client(db_key)
+    with _clients_lock:
+        mirror = _mirrors.get(db_key)
+        if mirror is None:
+            mirror = PLMMirror(client)
+            mirror.start_background_sync()
+            _mirrors[db_key] = mirror
+        return mirror
+
+def get_source(db_key):
+    """Answer from the local mirror once it holds a snapshot (also when offline), else from the PLM."""
+
+    mirror = get_mirror(db_key)
+    if mirror is not None and mirror.is_ready():
+        plm_metrics.set_source("mirror")
+        return mirror
+    plm_metrics.set_source("plm")
+    return get_client(db_key)
+
+def _refresh_missing(source, styles: list) -> list:
+    """
+    Fetch from the PLM the styles a mirror answer lacks.
+
+    Without a change column the snapshot only moves at full syncs, so a
+    style created in PLM since then is looked up upstream (and stored).
+    An unreachable PLM leaves the snapshot answer as it is.
 
+    Returns:
+        list: (Style, Colorway, Season, Style_Name) rows of the styles found
+    """
+    if not styles or not isinstance(source, PLMMirror):
+        return []
+    try:
+        rows = source.refresh_styles(styles)
+    except Exception as e:
+        print(f"PLM lookup of styles missing from the mirror failed, serving last snapshot: {e}")
+        return []
+    plm_metrics.set_source("plm")
+    return rows
+
+def shutdown():
+    """Stop background syncs and close pooled connections (extension shutdown/reload)."""
+
+    with _clients_lock:
+        for mirror in _mirrors.values():
+            mirror.stop_background_sync()
+        for client in _clients.values():
+            client.close()
+        _mirrors.clear()
+        _clients.clear()
+
+@instrumented
 def pop_combo_brands(db_key):
-    
-    conn = pyodbc.connect(db_key)
-    cur = conn.cursor()
-    
-    query_rel_sku = f"SELECT DISTINCT [Brand] FROM {constants.RENDER_STYLE_TABLE} "
-    cur.execute(query_rel_sku)
-    res = cur.fetchall() 
-    conn.close()
-    
-    res_list = [tup[0] for tup in res]
+
+    res_list = get_source(db_key).get_brands()
     brands = list(set(res_list))
     brands_sorted = sorted(brands)
-    
+
     return brands_sorted
 
-def get_plm_data(db_key, season, brand, category):
-    
-    #Connect to PLM DB
-    conn = pyodbc.connect(db_key)
-    cur = conn.cursor()
-    #Split category field
+@instrumented
+def get_all_styles(db_key):
+
+    #Every distinct style code, from the local mirror when available
+    return get_source(db_key).get_styles()
+
+def split_category(category):
+
+    #Split a GENRES type like "Optical - Woman" into the PLM (Category, Gender) pair
     new_category = category.split( " - ")[0]
     new_genre = category.split( " - ")[1]
-    
+
     #Convert gender to M/F
-    if new_genre == "Man": 
+    if new_genre == "Man":
         new_genre = "M"
     elif new_genre == "Woman":
         new_genre = "F"
-        
-    print(new_category)
-    print(new_genre)
-    print(brand)
-    
-    #Query to get all models, skus for the selected season, brand, category, gender
-    query_rel_sku = f"""SELECT [Style], [Colorway] 
-                        FROM {constants.RENDER_STYLE_TABLE} 
-                        WHERE [Season] = '{season}'
-                            AND [Brand] = '{brand}' 
-                            AND [Category] = '{new_category}' 
-                            AND [Gender] = '{new_genre}'
-                    """
-    cur.execute(query_rel_sku)
-    res = cur.fetchall()
-    conn.close()
-    
-    def transform_list(input_list):
-        #Create a dictionary to store the result
-        result = {}
-        
-        #Iterate over the input list and update the dictionary
-        for key, value in input_list:
-            if key not in result:
-                result[key] = set()
-            result[key].add(value)
-        
-        #Convert the dictionary back to a list of tuples
-        return [(key, *sorted(values)) for key, values in result.items()]
-    
-    #Final tuple list and length of slides to create
-    remove_dup = transform_list(res)
-    
-    return remove_dup
+
+    return new_category, new_genre
+
+@instrumented
+def get_plm_data_multi(db_key, season, brand, category_genders):
+    """
+    Get all models with their colorways for a season, brand and any set of
+    (Category, Gender) pairs in one round trip.
+
+    Colorways are de-duplicated, sorted and grouped per style by the DB.
+
+    Returns:
+        list: (Style, Colorway, Colorway, ...) tuples sorted by style
+    """
+    if not category_genders:
+        return []
+
+    res = get_source(db_key).get_styles_grouped(str(season), brand, list(category_genders))
+
+    # A style whose colorways are all NULL has no SKU (dropped by every backend)
+    return [(style, *colorways.split(constants.PLM_COLORWAY_SEPARATOR))
+                for style, colorways in res if colorways is not None]
+
+@instrumented
+def iter_plm_data_multi(db_key, season, brand, category_genders, batch_size=constants.PLM_FETCH_BATCH_SIZE):
+    """
+    Streaming get_plm_data_multi: yields batches of (Style, Colorway, ...)
+    tuples as the rows arrive, holding one batch in memory at a time.
+    """
+    if not category_genders:
+        return
+
+    source = get_source(db_key)
+    for rows in source.iter_styles_grouped(str(season), brand, list(category_genders), batch_size):
+        yield [(style, *colorways.split(constants.PLM_COLORWAY_SEPARATOR))
+                    for style, colorways in rows if colorways is not None]
+
+def get_plm_data(db_key, season, brand, category, caller=None):
+
+    #Query to get all models, skus for the selected season, brand, category, gender (timed as get_plm_data_multi)
+    return get_plm_data_multi(db_key, season, brand, [split_category(category)], caller=caller)
 
 #print(get_plm_data(db_key, season, brand, category))
 
+@instrumented
 def get_sku_model_plm(db_key, model):
-    #Connect to PLM DB
-    conn = pyodbc.connect(db_key)
-    cur = conn.cursor()
-    
-    query_rel_sku = f"""SELECT [Colorway], [Season], [Style_Name] 
-                        FROM {constants.RENDER_STYLE_TABLE} 
-                        WHERE [Style] = '{model}'
-                    """
-    cur.execute(query_rel_sku)
-    res = cur.fetchall()
-    conn.close()
-    return res
\ No newline at end of file
+
+    source = get_source(db_key)
+    res = source.get_style_skus(model)
+    if not res:
+        res = [(colorway, season, style_name) for _, colorway, season, style_name in _refresh_missing(source, [model])]
+    return res
+
+@instrumented
+def get_sku_models_plm(db_key, models):
+    """
+    Bulk SKU lookup for a list of model codes (e.g. 100-300 pasted styles).
+
+    Runs chunked IN queries instead of one query per model.
+
+    Returns:
+        dict: {style: [(Colorway, Season, Style_Name), ...]} with one key per
+              requested model, in request order (empty list if not in PLM)
+    """
+    styles = list(dict.fromkeys(models))
+    result = {style: [] for style in styles}
+
+    source = get_source(db_key)
+    rows = source.get_styles_skus(styles)
+    found = {row[0] for row in rows}
+    rows.extend(_refresh_missing(source, [style for style in styles if style not in found]))
+
+    for style, colorway, season, style_name in rows:
+        result.setdefault(style, []).append((colorway, season, style_name))
+
+    return result
+
+@instrumented
+def get_sku_models_plm_fresh(db_key, models):
+    """
+    Bulk SKU lookup straight from the PLM, for callers that act on missing SKUs.
+
+    The mirror rows of the requested styles are replaced with the answer, so
+    SKUs deleted upstream are gone from the mirror too. Raises when the PLM
+    is unreachable (a stale snapshot must not drive removals).
+
+    Returns:
+        list: (Style, Colorway, Season, Style_Name) rows
+    """
+    styles = list(dict.fromkeys(models))
+    mirror = get_mirror(db_key)
+    if mirror is not None:
+        plm_metrics.set_source("plm")
+        return mirror.refresh_styles(styles)
+    return get_client(db_key).get_styles_skus(styles)
+
+@instrumented
+def iter_sku_models_plm(db_key, models, batch_size=constants.PLM_FETCH_BATCH_SIZE):
+    """
+    Streaming bulk SKU lookup: yields batches of
+    (Style, Colorway, Season, Style_Name) rows as they arrive.
+    """
+    styles = list(dict.fromkeys(models))
+    source = get_source(db_key)
+    found = set()
+    for rows in source.iter_styles_skus(styles, batch_size):
+        found.update(row[0] for row in rows)
+        yield rows
+
+    missing = _refresh_missing(source, [style for style in styles if style not in found])
+    for start in range(0, len(missing), batch_size):
+        yield missing[start:start + batch_size]
@@ -0,0 +1,160 @@
+"""
+Diff-based sync of imported releases with PLM.
+
+Re-importing a model referenced again every SKU already in the scene, and
+the only way to follow PLM changes (new colorways, dropped ones, moved usd
+files) was deleting the model and importing it again. plan_release_sync
+compares the desired SKUs of some models (from the PLM catalog) with
+
+    /World/Models/glass_Xform/{model}_Xform/Release_{r}/{model}_{sku}/{model}_{sku}
+
+and the asset path its reference points to, and returns only the
+difference:
+
+    - add:      desired SKUs with no scope in the scene
+    - remove:   SKU scopes of the synced models/releases no longer in PLM
+    - retarget: SKUs whose reference points to another usd file
+
+Removals and retargets are applied by the SyncReleaseReferences command
+(one undo entry), additions by the regular chunked import; SKUs that are
+already in line are not touched, so a daily sync of a big release only
+costs the scene walk of the synced models.
+
+Example:
+    >>> plan = plan_release_sync(stage, [(("CD40153U", "32P", "262"), "U:\\01_USD\\...\\CD40153U_32P.usd")],
+    ...                          models=["CD40153U"])
+    >>> plan.summary()
+    '0 to add, 1 to remove, 0 to retarget, 1 unchanged'
+
+Author: [Luca Scattolin - Thelios]
+Version: 1.0
+"""
+
+from dataclasses import dataclass, field
+
+from pxr import Sdf, Usd
+
+from ... import constants
+from .asset_stat import is_url
+
+RELEASE_PREFIX = "Release_"
+
+@dataclass
+class SceneSKU:
+    """A SKU scope found in the scene."""
+    key: tuple              # (model, sku, release)
+    scope_path: Sdf.Path
+    reference_path: Sdf.Path
+    asset_path: str | None  # None when the reference prim or its reference is missing
+
+@dataclass
+class ReleaseSyncPlan:
+    add: list = field(default_factory=list)         # (sku data, asset path)
+    remove: list = field(default_factory=list)      # SceneSKU
+    retarget: list = field(default_factory=list)    # (SceneSKU, new asset path)
+    unchanged: int = 0
+
+    @property
+    def empty(self) -> bool:
+        return not (self.add or self.remove or self.retarget)
+
+    def summary(self) -> str:
+        return (f"{len(self.add)} to add, {len(self.remove)} to remove, "
+                f"{len(self.retarget)} to retarget, {self.unchanged} unchanged")
+
+    def report(self):
+        print(f"Release sync: {self.summary()}")
+        for data, asset_path in self.add:
+            print(f"  ADD      {data[0]}_{data[1]} (Release {data[2]}) <- {asset_path}")
+        for scene_sku in self.remove:
+            print(f"  REMOVE   {scene_sku.scope_path}")
+        for scene_sku, asset_path in self.retarget:
+            print(f"  RETARGET {scene_sku.reference_path}: {scene_sku.asset_path} -> {asset_path}")
+
+def same_asset(a: str, b: str) -> bool:
+    """True if two asset paths name the same file (local paths: any separator and case)."""
+    if a == b:
+        return True
+    if a is None or b is None or is_url(a) or is_url(b):
+        return False
+    return a.replace("\\", "/").lower() == b.replace("\\", "/").lower()
+
+def _reference_asset(prim: Usd.Prim) -> str | None:
+    """Asset path of the strongest reference (or payload, for collection imports) authored on ``prim``."""
+    for prim_spec in prim.GetPrimStack():
+        items = (prim_spec.referenceList.GetAddedOrExplicitItems()
+                    or prim_spec.payloadList.GetAddedOrExplicitItems())
+        if items:
+            return items[0].assetPath
+    return None
+
+def scene_skus(stage: Usd.Stage, models, release_match=None) -> dict:
+    """
+    SKU scopes of ``models`` in the scene.
+
+    Args:
+        stage (Usd.Stage): Stage to read
+        models (list): Model (style) codes
+        release_match (callable): Releases to include, None = every release
+
+    Returns:
+        dict: (model, sku, release) -> SceneSKU
+    """
+    glass_path = Sdf.Path(constants.SKU_ROOT_PATH).AppendChild(constants.SKU_GLASS_XFORM)
+    found = {}
+    for model in dict.fromkeys(models):
+        model_prim = stage.GetPrimAtPath(glass_path.AppendChild(f"{model}_Xform"))
+        if not model_prim:
+            continue
+        for release_prim in model_prim.GetChildren():
+            release_name = release_prim.GetName()
+            if not release_name.startswith(RELEASE_PREFIX):
+                continue
+            release = release_name[len(RELEASE_PREFIX):]
+            if release_match and not release_match(release):
+                continue
+            for sku_prim in release_prim.GetChildren():
+                scope_name = sku_prim.GetName()
+                if not scope_name.startswith(f"{model}_"):
+                    continue
+                reference_prim = sku_prim.GetChild(scope_name)
+                key = (model, scope_name[len(model) + 1:], release)
+                found[key] = SceneSKU(key, sku_prim.GetPath(), sku_prim.GetPath().AppendChild(scope_name),
+                                        _reference_asset(reference_prim) if reference_prim else None)
+    return found
+
+def plan_release_sync(stage: Usd.Stage, desired, models, release_match=None) -> ReleaseSyncPlan:
+    """
+    Difference between the desired SKUs and the scene.
+
+    Only the SKU scopes of ``models`` (and of the releases accepted by
+    ``release_match``) are compared: scopes of other models are never
+    removed.
+
+    Args:
+        stage (Usd.Stage): Stage to compare
+        desired (list): ((model, sku, release, ...), asset path) tuples, from PLM
+        models (list): Models to sync
+        release_match (callable): Releases to sync, None = every release
+
+    Returns:
+        ReleaseSyncPlan
+    """
+    scene = scene_skus(stage, models, release_match)
+    plan = ReleaseSyncPlan()
+    wanted = set()
+    for data, asset_path in desired:
+        key = tuple(data[:3])
+        if key in wanted:
+            continue
+        wanted.add(key)
+        scene_sku = scene.get(key)
+        if scene_sku is None or scene_sku.asset_path is None:
+            plan.add.append((data, asset_path))
+        elif not same_asset(scene_sku.asset_path, asset_path):
+            # Also brings back to the share the SKUs authored with a local mirror path
+            plan.retarget.append((scene_sku, asset_path))
+        else:
+            plan.unchanged += 1
+    plan.remove = [scene_sku for key, scene_sku in scene.items() if key not in wanted]
+    return plan
@@ -0,0 +1,230 @@
+"""
+Persistent index of the loaded SKU scopes under /World/Models.
+
+get_filtered_scopes used to traverse the whole stage (every mesh of every
+referenced SKU) and split path strings on each call, and the view slider,
+forward/back buttons and render list call it several times per click.
+
+The index is built with a pruned traversal that stops at the SKU scope level
+(/World/Models/glass_Xform/{model}_Xform/Release_{r}/{model}_{sku}), so the
+geometry inside the SKUs is never visited. A Usd.Notice.ObjectsChanged
+listener keeps it current:
+
+    - value-only changes (visibility, xforms, materials) are ignored
+    - resyncs inside a SKU (references, payload content) are ignored
+    - a SKU scope that is removed or unloaded is dropped in place
+    - any other structural change under /World/Models marks the index
+      dirty, and it is rebuilt on the next access
+
+Reads are O(1): len(index), index[i] and index.path_of(name).
+
+Example:
+    >>> index = get_scope_index()
+    >>> len(index), index[0]
+    (240, 'CD40153U_32P')
+    >>> index.path_of("CD40153U_32P")
+    Sdf.Path('/World/Models/glass_Xform/CD40153U_Xform/Release_262/CD40153U_32P')
+
+Author: [Luca Scattolin - Thelios]
+Version: 1.0
+"""
+
+import omni.usd
+from pxr import Sdf, Tf, Usd
+
+from ... import constants
+
+class ScopeIndex:
+    """
+    Ordered (stage traversal order) index of the loaded SKU scope names.
+
+    Args:
+        stage_fn (callable): Returns the stage to index. Defaults to the
+                                current omni.usd context stage, so the index
+                                follows stage open/close on its own
+        root (str): Root of the SKU hierarchy
+        depth (int): Path element count of the SKU scopes
+    """
+
+    def __init__(self, stage_fn=None,
+                        root: str = constants.SKU_ROOT_PATH,
+                        depth: int = constants.SKU_SCOPE_DEPTH):
+
+        self._stage_fn = stage_fn or (lambda: omni.usd.get_context().get_stage())
+        self.root = Sdf.Path(root)
+        self.depth = depth
+
+        self._stage = None
+        self._listener = None
+        self._dirty = True
+
+        self._names = []
+        self._paths = []
+        self._path_set = set()
+        self._by_name = {}
+
+        self.rebuilds = 0
+
+    #MARK: STAGE
+    # Stage binding -------------------------------------------------------------------------------
+
+    def attach(self, stage: Usd.Stage):
+        """Index ``stage`` and listen to its changes (replaces the previous stage)."""
+        self.detach()
+        self._stage = stage
+        if stage:
+            self._listener = Tf.Notice.Register(Usd.Notice.ObjectsChanged, self._on_objects_changed, stage)
+
+    def detach(self):
+        if self._listener:
+            self._listener.Revoke()
+        self._listener = None
+        self._stage = None
+        self._dirty = True
+
+    def invalidate(self):
+        self._dirty = True
+
+    def _current(self):
+        stage = self._stage_fn()
+        if stage != self._stage:
+            self.attach(stage)
+        if self._dirty:
+            self._rebuild()
+
+    #MARK: READ
+    # Read functions ----------------------------------------------------------------------------------
+
+    def __len__(self):
+        self._current()
+        return len(self._names)
+
+    def __getitem__(self, i: int) -> str:
+        self._current()
+        return self._names[i]
+
+    def __iter__(self):
+        self._current()
+        return iter(list(self._names))
+
+    def names(self) -> list:
+        """Copy of the SKU scope names, in stage order."""
+        self._current()
+        return list(self._names)
+
+    def paths(self) -> list:
+        """Copy of the SKU scope paths, in stage order."""
+        self._current()
+        return list(self._paths)
+
+    def path_of(self, name: str) -> Sdf.Path | None:
+        """Path of the first SKU scope called ``name``."""
+        self._current()
+        return self._by_name.get(name)
+
+    def index_of(self, name: str) -> int:
+        self._current()
+        try:
+            return self._names.index(name)
+        except ValueError:
+            return -1
+
+    #MARK: BUILD
+    # Build and incremental updates -----------------------------------------------------------------
+
+    def _is_sku_scope(self, prim: Usd.Prim) -> bool:
+        name = prim.GetName()
+        return (prim.GetTypeName() == "Scope"
+                and not name.startswith("Release_")
+                and not name.endswith(("Looks", "mtl")))
+
+    def _rebuild(self):
+        self._names = []
+        self._paths = []
+        self._path_set = set()
+        self._by_name = {}
+        self._dirty = False
+        self.rebuilds += 1
+
+        if not self._stage:
+            return
+        root_prim = self._stage.GetPrimAtPath(self.root)
+        if not root_prim:
+            return
+
+        # Default predicate: active, defined, loaded, non-abstract prims only
+        prim_range = iter(Usd.PrimRange(root_prim))
+        next(prim_range)  # the root itself is not a SKU scope
+        for prim in prim_range:
+            path = prim.GetPath()
+            if path.pathElementCount >= self.depth:
+                prim_range.PruneChildren()
+            if self._is_sku_scope(prim):
+                self._add(prim.GetName(), path)
+
+    def _add(self, name: str, path: Sdf.Path):
+        self._names.append(name)
+        self._paths.append(path)
+        self._path_set.add(path)
+        self._by_name.setdefault(name, path)
+
+    def _remove(self, path: Sdf.Path):
+        i = self._paths.index(path)
+        name = self._names[i]
+        del self._paths[i]
+        del self._names[i]
+        self._path_set.discard(path)
+        if self._by_name.get(name) == path:
+            # Another SKU scope may share the name (same SKU in two releases)
+            del self._by_name[name]
+            for other_name, other_path in zip(self._names, self._paths):
+                if other_name == name:
+                    self._by_name[name] = other_path
+                    break
+
+    def _on_objects_changed(self, notice, sender):
+        if self._dirty:
+            return
+
+        for path in notice.GetResyncedPaths():
+            if path.IsPropertyPath():
+                # New/removed attributes (e.g. a first visibility opinion) never change the scope list
+                continue
+            if not path.HasPrefix(self.root):
+                if self.root.HasPrefix(path):
+                    # An ancestor of /World/Models changed: everything may have moved
+                    self._dirty = True
+                    return
+                continue
+
+            count = path.pathElementCount
+            if count > self.depth:
+                # Inside a SKU (references, payload content): scope list unaffected
+                continue
+            if count == self.depth and path.IsPrimPath():
+                prim = self._stage.GetPrimAtPath(path)
+                member = bool(prim) and prim.IsActive() and prim.IsLoaded() and self._is_sku_scope(prim)
+                indexed = path in self._path_set
+                if member == indexed:
+                    continue
+                if indexed:
+                    self._remove(path)
+                    continue
+            # New SKU scopes must be inserted in stage order: rebuild on next access
+            self._dirty = True
+            return
+
+_INDEX = None
+
+def get_scope_index() -> ScopeIndex:
+    """Scope index of the current Kit stage, shared by every panel."""
+    global _INDEX
+    if _INDEX is None:
+        _INDEX = ScopeIndex()
+    return _INDEX
+
+def shutdown():
+    global _INDEX
+    if _INDEX is not None:
+        _INDEX.detach()
+        _INDEX = None
@@ -0,0 +1,371 @@
+"""
+Change-minimal scope isolation ("show only this SKU").
+
+The previous hide_all_scopes_except ran a full Traverse() per scope name
+lookup, walked the ancestors of every scope and re-authored visibility on
+every child of the kept scopes at each slider step. This engine:
+
+    - resolves the target through the scope index (O(1)) and keeps the
+      "keep" scopes (Models, Setup, Lights, Cameras) in a name -> path cache
+    - computes the desired visibility with one pruned traversal: the
+      subtree under a hidden scope is never visited
+    - writes only the opinions whose value actually changes, all inside a
+      single Sdf.ChangeBlock, so Kit recomposes and redraws once
+    - after the first pass, switching SKU only touches the old and new
+      target chains, the branches the new chain uncovers and the new
+      target subtree, as long as no one else changed the stage structure
+      or visibility in between
+
+The opinions live in a dedicated anonymous sublayer of the session layer,
+never in the root or any other persistent layer: isolating a SKU does not
+dirty the scene, nothing is saved, and clear() drops every override in one
+call. Only opinions that differ from the persistent scene are kept, so the
+layer stays as small as the set of hidden scopes.
+
+The final visibility matches the previous implementation: the target, its
+ancestors and its descendants are visible, the keep scopes and their
+ancestors are visible, and every other scope is hidden.
+
+Example:
+    >>> isolation = get_scope_isolation()
+    >>> isolation.isolate("CD40153U_32P", constants.SCOPES_TO_KEEP)
+    3
+
+Author: [Luca Scattolin - Thelios]
+Version: 1.0
+"""
+
+import omni.usd
+from pxr import Sdf, Tf, Usd, UsdGeom
+
+from ... import constants
+from .prim_index import get_prim_index
+from .scope_index import get_scope_index
+
+INHERITED = UsdGeom.Tokens.inherited
+INVISIBLE = UsdGeom.Tokens.invisible
+
+def _ancestors(path: Sdf.Path) -> list:
+    """Ancestors of ``path`` from the top, ending with ``path`` itself (pseudo-root excluded)."""
+    return list(path.GetPrefixes())
+
+class ScopeIsolation:
+    """
+    Keep one scope (plus the keep scopes) visible and hide every other scope,
+    through visibility overrides in an anonymous session sublayer.
+
+    Args:
+        stage_fn (callable): Returns the stage to edit. Defaults to the Kit
+                                context stage
+        scope_index (ScopeIndex): Index used to resolve SKU scope names
+        prim_index (PrimIndex): Index used to resolve any other scope name
+    """
+
+    def __init__(self, stage_fn=None, scope_index=None, prim_index=None):
+        self._stage_fn = stage_fn or (lambda: omni.usd.get_context().get_stage())
+        self._scope_index = scope_index if scope_index is not None else get_scope_index()
+        self._prim_index = prim_index if prim_index is not None else get_prim_index()
+
+        self._stage = None
+        self._listener = None
+        self._applying = False
+        self._layer = None
+
+        self._keep_cache = {}
+        # Last applied state, valid while nobody else edits structure or visibility
+        self._last_target = None
+        self._last_keep = None
+
+        self.last_writes = 0
+        self.last_visited = 0
+
+    #MARK: STAGE
+    # Stage binding -------------------------------------------------------------------------------
+
+    def _bind(self, stage: Usd.Stage):
+        if stage == self._stage:
+            return
+        if self._listener:
+            self._listener.Revoke()
+        self._listener = None
+        self._remove_layer()
+        self._stage = stage
+        self._keep_cache = {}
+        self.invalidate()
+        if stage:
+            self._listener = Tf.Notice.Register(Usd.Notice.ObjectsChanged, self._on_objects_changed, stage)
+
+    def detach(self):
+        self._bind(None)
+
+    def _ensure_layer(self, stage: Usd.Stage) -> Sdf.Layer:
+        """Isolation sublayer of ``stage``'s session layer, created on first use."""
+        if self._layer is None:
+            self._layer = Sdf.Layer.CreateAnonymous(constants.SCOPE_ISOLATION_LAYER_TAG)
+        session = stage.GetSessionLayer()
+        if self._layer.identifier not in session.subLayerPaths:
+            session.subLayerPaths.insert(0, self._layer.identifier)
+        return self._layer
+
+    def _remove_layer(self):
+        if self._layer is None:
+            return
+        if self._stage:
+            session = self._stage.GetSessionLayer()
+            if self._layer.identifier in session.subLayerPaths:
+                session.subLayerPaths.remove(self._layer.identifier)
+        self._layer = None
+        self.invalidate()
+
+    @property
+    def layer(self) -> Sdf.Layer | None:
+        """The anonymous sublayer holding the overrides, None before the first isolate."""
+        return self._layer
+
+    def clear(self):
+        """Drop every isolation override: the scene shows its persistent visibility again."""
+        if self._layer is not None:
+            self._applying = True
+            try:
+                self._layer.Clear()
+            finally:
+                self._applying = False
+        self.invalidate()
+
+    def invalidate(self):
+        """Forget the last applied state: the next isolate runs a full pass."""
+        self._last_target = None
+        self._last_keep = None
+
+    def _is_sku_reload(self, path: Sdf.Path) -> bool:
+        """True for a resync the last pass already covers: contents of a SKU scope, or a SKU scope we hid or target."""
+        prim_path = path.GetPrimPath()
+        depth = self._scope_index.depth
+        if prim_path.pathElementCount < depth or not prim_path.HasPrefix(self._scope_index.root):
+            return False
+        if prim_path.pathElementCount > depth:
+            return True
+        if path.IsPropertyPath():
+            return False
+        if path == self._last_target:
+            return True
+        # Payload (un)load of a hidden SKU resyncs the SKU scope itself; a new SKU has no override of ours
+        prim_spec = self._layer.GetPrimAtPath(path) if self._layer else None
+        attr_spec = prim_spec.attributes.get(UsdGeom.Tokens.visibility) if prim_spec else None
+        return attr_spec is not None and attr_spec.default == INVISIBLE and bool(self._stage.GetPrimAtPath(path))
+
+    def _on_objects_changed(self, notice, sender):
+        if self._applying or self._last_target is None:
+            return
+        for path in notice.GetResyncedPaths():
+            if path.IsPropertyPath() and path.name != "visibility":
+                continue
+            if self._is_sku_reload(path):
+                # A hidden SKU is never visited, the target subtree is re-walked by every isolate()
+                continue
+            self.invalidate()
+            return
+        for path in notice.GetChangedInfoOnlyPaths():
+            if path.name == "visibility":
+                self.invalidate()
+                return
+
+    #MARK: RESOLVE
+    # Scope lookups -----------------------------------------------------------------------------------
+
+    def _find_scope(self, stage: Usd.Stage, name: str) -> Sdf.Path | None:
+        prim = self._prim_index.find(name, UsdGeom.Scope)
+        return prim.GetPath() if prim else None
+
+    def _is_valid_scope(self, stage: Usd.Stage, path: Sdf.Path, name: str) -> bool:
+        prim = stage.GetPrimAtPath(path)
+        return bool(prim) and prim.IsActive() and prim.GetName() == name and prim.IsA(UsdGeom.Scope)
+
+    def _resolve_target(self, stage: Usd.Stage, name: str) -> Sdf.Path | None:
+        path = self._scope_index.path_of(name)
+        if path is not None and self._is_valid_scope(stage, path, name):
+            return path
+        # Not a SKU scope: fall back to the name index
+        return self._find_scope(stage, name)
+
+    def _resolve_keep(self, stage: Usd.Stage, names) -> tuple:
+        paths = []
+        for name in names:
+            path = self._keep_cache.get(name)
+            if path is None or not self._is_valid_scope(stage, path, name):
+                path = self._find_scope(stage, name)
+                if path is None:
+                    self._keep_cache.pop(name, None)
+                    continue
+                self._keep_cache[name] = path
+            paths.append(path)
+        return tuple(paths)
+
+    #MARK: ISOLATE
+    # Isolation -----------------------------------------------------------------------------------
+
+    def isolate(self, target_name: str, keep_names=()) -> int | None:
+        """
+        Show ``target_name`` (and the keep scopes), hide every other scope.
+
+        Args:
+            target_name (str): Name of the scope to keep visible, e.g. "CD40153U_32P"
+            keep_names (list): Names of other scopes to keep visible
+
+        Returns:
+            int: Number of visibility opinions written, None if the target was not found
+        """
+        stage = self._stage_fn()
+        self._bind(stage)
+        if not stage:
+            return None
+
+        target = self._resolve_target(stage, target_name)
+        if target is None:
+            return None
+        keep = self._resolve_keep(stage, keep_names)
+
+        changes = {}
+        self.last_visited = 0
+        if self._can_switch_incrementally(target, keep):
+            self._diff_switch(stage, target, keep, changes)
+        else:
+            self._diff_full(stage, target, keep, changes)
+
+        self._apply(stage, changes)
+        self._last_target = target
+        self._last_keep = keep
+        self.last_writes = len(changes)
+        return len(changes)
+
+    def _can_switch_incrementally(self, target: Sdf.Path, keep: tuple) -> bool:
+        last = self._last_target
+        if last is None or keep != self._last_keep:
+            return False
+        # Nested targets change which scopes of the old subtree must be hidden
+        return not (target.HasPrefix(last) or last.HasPrefix(target))
+
+    def _want(self, prim: Usd.Prim, visible: bool, changes: dict):
+        self.last_visited += 1
+        attr = prim.GetAttribute("visibility")
+        current = attr.Get() if attr else None
+        if visible:
+            if current == INVISIBLE:
+                changes[prim.GetPath()] = INHERITED
+        elif current != INVISIBLE and prim.IsA(UsdGeom.Imageable):
+            changes[prim.GetPath()] = INVISIBLE
+
+    def _diff_target_subtree(self, stage: Usd.Stage, target: Sdf.Path, changes: dict):
+        # Everything under the target is shown (undo hides authored by older isolations)
+        for prim in Usd.PrimRange(stage.GetPrimAtPath(target)):
+            self._want(prim, True, changes)
+
+    def _required(self, target: Sdf.Path, keep: tuple) -> set:
+        required = set(_ancestors(target))
+        for path in keep:
+            required.update(_ancestors(path))
+        return required
+
+    def _diff_range(self, prim_range, target: Sdf.Path, keep: tuple, required: set, changes: dict):
+        for prim in prim_range:
+            path = prim.GetPath()
+            if path == target:
+                prim_range.PruneChildren()
+                self._diff_target_subtree(prim.GetStage(), target, changes)
+            elif path in required:
+                self._want(prim, True, changes)
+            elif prim.IsA(UsdGeom.Scope):
+                # Hidden scope: nothing below it can show, don't visit it
+                prim_range.PruneChildren()
+                self._want(prim, False, changes)
+            elif any(path.HasPrefix(k) for k in keep):
+                # Non-scope prims inside a keep scope stay visible
+                self._want(prim, True, changes)
+
+    def _diff_full(self, stage: Usd.Stage, target: Sdf.Path, keep: tuple, changes: dict):
+        prim_range = iter(Usd.PrimRange(stage.GetPseudoRoot()))
+        next(prim_range)
+        self._diff_range(prim_range, target, keep, self._required(target, keep), changes)
+
+    def _diff_switch(self, stage: Usd.Stage, target: Sdf.Path, keep: tuple, changes: dict):
+        required = self._required(target, keep)
+        last_required = self._required(self._last_target, keep)
+
+        # Scopes shown only because they were on the previous target chain go back to hidden
+        for path in _ancestors(self._last_target):
+            if path in required:
+                continue
+            prim = stage.GetPrimAtPath(path)
+            if prim and prim.IsA(UsdGeom.Scope):
+                self._want(prim, False, changes)
+
+        for path in _ancestors(target)[:-1]:
+            prim = stage.GetPrimAtPath(path)
+            if not prim:
+                continue
+            self._want(prim, True, changes)
+            if path in last_required:
+                continue
+            # Newly shown branch: its other children were pruned by earlier passes
+            for child in prim.GetChildren():
+                if child.GetPath() not in required:
+                    self._diff_range(iter(Usd.PrimRange(child)), target, keep, required, changes)
+        self._diff_target_subtree(stage, target, changes)
+
+    def _set_override(self, layer: Sdf.Layer, path: Sdf.Path, token: str):
+        prim_spec = Sdf.CreatePrimInLayer(layer, path)
+        attr_spec = prim_spec.attributes.get(UsdGeom.Tokens.visibility)
+        if attr_spec is None:
+            attr_spec = Sdf.AttributeSpec(prim_spec, UsdGeom.Tokens.visibility, Sdf.ValueTypeNames.Token)
+        attr_spec.default = token
+
+    def _remove_override(self, layer: Sdf.Layer, path: Sdf.Path) -> bool:
+        prim_spec = layer.GetPrimAtPath(path)
+        if not prim_spec:
+            return False
+        attr_spec = prim_spec.attributes.get(UsdGeom.Tokens.visibility)
+        if attr_spec is None:
+            return False
+        prim_spec.RemoveProperty(attr_spec)
+        return True
+
+    def _apply(self, stage: Usd.Stage, changes: dict):
+        """Author the visibility changes in the isolation sublayer, one change block per pass."""
+        if not changes:
+            return
+        layer = self._ensure_layer(stage)
+        restored = []
+        self._applying = True
+        try:
+            with Sdf.ChangeBlock():
+                for path, token in changes.items():
+                    # Showing a prim we hid: drop our opinion rather than stacking a second one
+                    if token == INHERITED and self._remove_override(layer, path):
+                        restored.append(path)
+                    else:
+                        self._set_override(layer, path, token)
+
+            # A persistent opinion may still hide a restored prim: override it explicitly
+            hidden = [path for path in restored
+                        if stage.GetPrimAtPath(path).GetAttribute(UsdGeom.Tokens.visibility).Get() == INVISIBLE]
+            if hidden:
+                with Sdf.ChangeBlock():
+                    for path in hidden:
+                        self._set_override(layer, path, INHERITED)
+        finally:
+            self._applying = False
+
+_ISOLATION = None
+
+def get_scope_isolation() -> ScopeIsolation:
+    """Isolation engine of the current Kit stage, shared by every panel."""
+    global _ISOLATION
+    if _ISOLATION is None:
+        _ISOLATION = ScopeIsolation()
+    return _ISOLATION
+
+def shutdown():
+    global _ISOLATION
+    if _ISOLATION is not None:
+        _ISOLATION.detach()
+        _ISOLATION = None
@@ -0,0 +1,258 @@
+"""
+In-memory SKU catalog shared by the import, render and view panels.
+
+PLM answers (bulk model lookups and All Collection queries) are stored once
+as compact slotted records keyed by (style, colorway, release), with
+secondary indexes on release, brand, style and scene scope name. Panels query
+the indexes, so filtering, sorting and selection cost O(result) instead of a
+scan over everything fetched so far.
+
+In the PLM view the Season column is the release code (e.g. "262"), so the
+release index also answers season lookups. The brand is not part of the
+key: the bulk model lookup derives it from the style prefix while the All
+Collection query uses the PLM Brand value, and the same SKU must not be
+stored twice.
+
+The catalog is owned by the UI (Kit main thread) and is not thread-safe:
+fill it from the PLM result callbacks, never from the query executor.
+
+Example:
+    >>> catalog = SKUCatalog()
+    >>> catalog.add("Dior", "CD40153U", "32P", "262", "DIORSIGNATURE")
+    >>> catalog.query(styles=["CD40153U"], release="26")
+    [SKURecord('Dior', 'CD40153U', '32P', '262')]
+    >>> catalog.split_scope("CD40153U_32P")
+    ('CD40153U', '32P')
+
+Author: [Luca Scattolin - Thelios]
+Version: 1.0
+"""
+
+import sys
+
+class SKURecord:
+    """One PLM SKU (a colorway of a style in a release)."""
+
+    __slots__ = ("brand", "style", "colorway", "release", "style_name")
+
+    def __init__(self, brand: str, style: str, colorway: str, release: str, style_name: str = ""):
+        self.brand = brand
+        self.style = style
+        self.colorway = colorway
+        self.release = release
+        self.style_name = style_name
+
+    @property
+    def key(self) -> tuple:
+        return (self.style, self.colorway, self.release)
+
+    @property
+    def scope_name(self) -> str:
+        """Name of the SKU scope in the stage, e.g. "CD40153U_32P"."""
+        return f"{self.style}_{self.colorway}"
+
+    def sort_key(self) -> tuple:
+        return (self.style, self.release, self.colorway)
+
+    def __repr__(self):
+        return f"SKURecord({self.brand!r}, {self.style!r}, {self.colorway!r}, {self.release!r})"
+
+def _intern(value) -> str:
+    # Brands, releases and styles repeat across thousands of rows: keep one copy of each
+    return sys.intern(str(value)) if value is not None else ""
+
+class SKUCatalog:
+    """
+    Indexed store of SKURecord keyed by (style, colorway, release).
+
+    Every index maps a value to an insertion-ordered dict of records, so
+    lookups, de-duplication and removals are O(1) per record.
+    """
+
+    def __init__(self):
+        self._records = {}
+        self._by_release = {}
+        self._by_brand = {}
+        self._by_style = {}
+        self._by_scope = {}
+
+    def __len__(self):
+        return len(self._records)
+
+    def __iter__(self):
+        return iter(self._records.values())
+
+    def __contains__(self, key) -> bool:
+        return key in self._records
+
+    #MARK: WRITE
+    # Write functions ------------------------------------------------------------------------------
+
+    def add(self, brand: str, style: str, colorway: str, release: str, style_name: str = "") -> SKURecord:
+        """
+        Add a SKU, or refresh the style name (and a missing brand) of an existing one.
+
+        Returns:
+            SKURecord: The stored record
+        """
+        key = (_intern(style), _intern(colorway), _intern(release))
+        record = self._records.get(key)
+        if record is not None:
+            if style_name:
+                record.style_name = _intern(style_name)
+            if brand and not record.brand:
+                self._unindex(self._by_brand, record.brand, record)
+                record.brand = _intern(brand)
+                self._index(self._by_brand, record.brand, record)
+            return record
+
+        record = SKURecord(_intern(brand), *key, _intern(style_name))
+        self._records[key] = record
+        self._index(self._by_release, record.release, record)
+        self._index(self._by_brand, record.brand, record)
+        self._index(self._by_style, record.style, record)
+        self._index(self._by_scope, record.scope_name, record)
+        return record
+
+    def add_style_skus(self, brand: str, style: str, rows) -> list:
+        """
+        Add the (Colorway, Season, Style_Name) rows of one style (bulk model lookup).
+
+        Returns:
+            list: The stored records, in row order
+        """
+        return [self.add(brand, style, colorway, season, style_name)
+                for colorway, season, style_name in rows]
+
+    def add_collection(self, brand: str, release: str, rows) -> list:
+        """
+        Add the (Style, Colorway, Colorway, ...) rows of an All Collection query.
+
+        Returns:
+            list: The stored records, in row order
+        """
+        return [self.add(brand, style, colorway, release)
+                for style, *colorways in rows
+                for colorway in colorways]
+
+    def remove(self, key: tuple):
+        record = self._records.pop(key, None)
+        if record is None:
+            return
+        self._unindex(self._by_release, record.release, record)
+        self._unindex(self._by_brand, record.brand, record)
+        self._unindex(self._by_style, record.style, record)
+        self._unindex(self._by_scope, record.scope_name, record)
+
+    def drop_styles(self, styles) -> int:
+        """
+        Remove every record of ``styles`` (before storing a fresh PLM answer for them).
+
+        Returns:
+            int: Number of records removed
+        """
+        keys = [key for style in dict.fromkeys(styles) for key in self._by_style.get(style, {})]
+        for key in keys:
+            self.remove(key)
+        return len(keys)
+
+    def clear(self):
+        for index in (self._records, self._by_release, self._by_brand, self._by_style, self._by_scope):
+            index.clear()
+
+    def _index(self, index: dict, value: str, record: SKURecord):
+        index.setdefault(value, {})[record.key] = record
+
+    def _unindex(self, index: dict, value: str, record: SKURecord):
+        bucket = index.get(value)
+        if bucket is None:
+            return
+        bucket.pop(record.key, None)
+        if not bucket:
+            del index[value]
+
+    #MARK: READ
+    # Read functions ----------------------------------------------------------------------------------
+
+    def get(self, style: str, colorway: str, release: str) -> SKURecord | None:
+        return self._records.get((style, colorway, release))
+
+    def by_release(self, release: str) -> list:
+        return list(self._by_release.get(str(release), {}).values())
+
+    # PLM Season == release code
+    by_season = by_release
+
+    def by_brand(self, brand: str) -> list:
+        return list(self._by_brand.get(brand, {}).values())
+
+    def by_style(self, style: str) -> list:
+        return list(self._by_style.get(style, {}).values())
+
+    def releases(self) -> list:
+        return sorted(self._by_release)
+
+    def brands(self) -> list:
+        return sorted(self._by_brand)
+
+    def query(self, styles=None, release: str = "", brand: str = None, sort: bool = False) -> list:
+        """
+        Return the records matching every given filter.
+
+        Candidates come from the smallest applicable index (styles, then
+        brand, then the releases matching the filter), so the cost follows the
+        size of the result rather than the size of the catalog.
+
+        Args:
+            styles (list): Style codes to include, in display order. None = any
+            release (str): Substring the release must contain, e.g. "26". "" = any
+            brand (str): Exact brand. None = any
+            sort (bool): Sort by (style, release, colorway) instead of index order
+
+        Returns:
+            list: Matching SKURecord
+        """
+        release = str(release or "")
+        # The substring match runs on the distinct release values, not on the records
+        releases = None
+        if release:
+            releases = {r for r in self._by_release if release in r}
+
+        if styles is not None:
+            candidates = (rec for style in dict.fromkeys(styles)
+                            for rec in self._by_style.get(style, {}).values())
+        elif brand is not None:
+            candidates = self._by_brand.get(brand, {}).values()
+        elif releases is not None:
+            candidates = (rec for r in sorted(releases) for rec in self._by_release[r].values())
+        else:
+            candidates = self._records.values()
+
+        result = [rec for rec in candidates
+                    if (releases is None or rec.release in releases)
+                    and (brand is None or rec.brand == brand)]
+
+        if sort:
+            result.sort(key=SKURecord.sort_key)
+        return result
+
+    #MARK: SCOPES
+    # Scene scope names ------------------------------------------------------------------------------
+
+    def by_scope(self, scope_name: str) -> list:
+        return list(self._by_scope.get(scope_name, {}).values())
+
+    def split_scope(self, scope_name: str) -> tuple:
+        """
+        Return (style, colorway) for a SKU scope name such as "CD40153U_32P".
+
+        Known SKUs are answered from the scope index. Scopes imported in an
+        earlier session fall back to splitting the name on its first "_".
+        """
+        bucket = self._by_scope.get(scope_name)
+        if bucket:
+            record = next(iter(bucket.values()))
+            return record.style, record.colorway
+
+        style, _, colorway = scope_name.partition("_")
+        return style, colorway
@@ -0,0 +1,97 @@
+"""
+Batched creation of the SKU hierarchy at the Sdf level.
+
+create_hierarchy_structure used to run once per SKU through the Usd API:
+every call re-got the stage, set the default prim and re-authored the eight
+rotateY time samples of glass_Xform, and every Define sent its own change
+notice. build_sku_hierarchy takes the whole selection at once:
+
+    - the missing prims of every
+      /World/Models/glass_Xform/{model}_Xform/Release_{r}/{model}_{sku}
+      path are collected first (shared ancestors only once)
+    - their specs are authored on the edit target layer with
+      Sdf.CreatePrimInLayer inside a single Sdf.ChangeBlock, so the stage
+      recomposes once for the whole batch
+    - the default prim and the glass_Xform turntable are authored only when
+      missing, once per batch
+
+Example:
+    >>> stage = omni.usd.get_context().get_stage()
+    >>> build_sku_hierarchy(stage, [("CD40153U", "32P", "262"), ("CD40153U", "10A", "262")])
+    [Sdf.Path('/World/Models/glass_Xform/CD40153U_Xform/Release_262/CD40153U_32P'), ...]
+
+Author: [Luca Scattolin - Thelios]
+Version: 1.0
+"""
+
+from pxr import Sdf, Usd, UsdGeom
+
+from ... import constants
+
+XFORM = "Xform"
+SCOPE = "Scope"
+
+def sku_scope_path(model: str, sku: str, release: str) -> Sdf.Path:
+    """Path of the SKU scope, e.g. /World/Models/glass_Xform/CD40153U_Xform/Release_262/CD40153U_32P."""
+    return Sdf.Path(f"{constants.SKU_ROOT_PATH}/{constants.SKU_GLASS_XFORM}"
+                    f"/{model}_Xform/Release_{release}/{model}_{sku}")
+
+def _hierarchy_types(sku_path: Sdf.Path) -> list:
+    """(path, type name) of ``sku_path`` and its ancestors, from /World down."""
+    # /World (Xform), Models (Scope), glass_Xform (Xform), {model}_Xform (Xform), Release_{r} (Scope), SKU (Scope)
+    types = (XFORM, SCOPE, XFORM, XFORM, SCOPE, SCOPE)
+    return list(zip(sku_path.GetPrefixes(), types))
+
+def _author_turntable(stage: Usd.Stage, glass_path: Sdf.Path):
+    """rotateY animation of glass_Xform, skipped when the samples are already there."""
+    xformable = UsdGeom.Xformable(stage.GetPrimAtPath(glass_path))
+    rot_y = xformable.GetRotateYOp()
+    frames = range(1, constants.SKU_TURNTABLE_FRAMES + 1)
+    if rot_y and list(rot_y.GetAttr().GetTimeSamples()) == [float(f) for f in frames]:
+        return
+    if not rot_y:
+        rot_y = xformable.AddRotateYOp(UsdGeom.XformOp.PrecisionFloat)
+    with Sdf.ChangeBlock():
+        for frame in frames:
+            rot_y.Set(constants.SKU_TURNTABLE_STEP * frame, Usd.TimeCode(frame))
+
+def build_sku_hierarchy(stage: Usd.Stage, skus) -> list:
+    """
+    Create the hierarchy of many SKUs in one change block.
+
+    Prims that already exist on the stage (from any layer) are left
+    untouched, as create_hierarchy_structure did.
+
+    Args:
+        stage (Usd.Stage): Stage to author on (current edit target)
+        skus (iterable): (model, sku, release) tuples
+
+    Returns:
+        list: SKU scope paths, in the order of ``skus``
+    """
+    sku_paths = [sku_scope_path(model, sku, release) for model, sku, release in skus]
+
+    # Collect the missing prims first: composition is not updated inside a ChangeBlock
+    missing = {}
+    for sku_path in sku_paths:
+        for path, type_name in _hierarchy_types(sku_path):
+            if path not in missing and not stage.GetPrimAtPath(path):
+                missing[path] = type_name
+
+    edit_target = stage.GetEditTarget()
+    layer = edit_target.GetLayer()
+    with Sdf.ChangeBlock():
+        # Insertion order is parent first, so each spec finds its parent already there
+        for path, type_name in missing.items():
+            prim_spec = Sdf.CreatePrimInLayer(layer, edit_target.MapToSpecPath(path))
+            prim_spec.specifier = Sdf.SpecifierDef
+            prim_spec.typeName = type_name
+
+    if not sku_paths:
+        return sku_paths
+
+    world_path = sku_paths[0].GetPrefixes()[0]
+    if stage.GetDefaultPrim().GetPath() != world_path:
+        stage.SetDefaultPrim(stage.GetPrimAtPath(world_path))
+    _author_turntable(stage, sku_paths[0].GetPrefixes()[2])
+    return sku_paths
@@ -0,0 +1,336 @@
+"""
+Per-SKU statistics and memory profile of the scene.
+
+Answers "why does this 300 SKU scene take minutes to open and 40 GB": for
+every SKU scope of the scope index it reports
+
+    - prim, mesh, point and face counts
+    - the layers composing the SKU and their file sizes on disk
+    - payloads authored in the SKU and how many of them are loaded
+    - an approximate composed memory (mesh arrays + a per-prim overhead)
+
+plus the stage-wide layer count and composition time (measure_composition
+recomposes the root layer on a throwaway stage; the layers already open are
+shared, so it measures composition rather than file transfer).
+
+Statistics are cached per SKU. A Usd.Notice.ObjectsChanged listener marks a
+SKU stale when its subtree is resynced (references, payload load/unload,
+new prims) or its mesh arrays change, and collect() recomputes only the
+stale and new SKUs. export_json() writes the last results, so they can be
+trended across releases.
+
+Example:
+    >>> stats = get_stage_stats()
+    >>> rows = stats.collect()
+    >>> rows[0].name, rows[0].meshes, rows[0].approx_mb
+    ('CD40153U_32P', 48, 12.7)
+    >>> stats.export_json()
+    'C:\\Users\\me\\.thelios\\stage_stats\\stage_stats_20260101_120000.json'
+
+Author: [Luca Scattolin - Thelios]
+Version: 1.0
+"""
+
+import json
+import os
+import time
+from dataclasses import asdict, dataclass, field
+
+import omni.kit.app
+import omni.usd
+from pxr import Sdf, Tf, Usd, UsdGeom
+
+from ... import constants
+from .scope_index import get_scope_index
+
+# Bytes per element of the mesh arrays that dominate the composed memory
+MESH_ARRAY_BYTES = {"points": 12,
+                    "normals": 12,
+                    "faceVertexIndices": 4,
+                    "faceVertexCounts": 4,
+                    "primvars:st": 8,
+                    "primvars:st:indices": 4}
+
+@dataclass
+class SKUStats:
+    """Statistics of one SKU scope."""
+    name: str
+    path: str
+    prims: int = 0
+    meshes: int = 0
+    points: int = 0
+    faces: int = 0
+    payloads: int = 0
+    payloads_loaded: int = 0
+    layers: list = field(default_factory=list)
+    layer_bytes: int = 0
+    approx_bytes: int = 0
+    compute_ms: float = 0.0
+
+    @property
+    def approx_mb(self) -> float:
+        return round(self.approx_bytes / 2**20, 1)
+
+    @property
+    def loaded(self) -> bool:
+        """True when every payload of the SKU is loaded (or it has none)."""
+        return self.payloads_loaded == self.payloads
+
+def layer_file_size(layer: Sdf.Layer) -> int | None:
+    """Size on disk of ``layer``, None for anonymous or remote layers."""
+    path = layer.realPath
+    if not path or layer.anonymous:
+        return None
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return None
+
+class StageStats:
+    """
+    Incremental per-SKU statistics of one stage.
+
+    Args:
+        stage_fn (callable): Returns the stage to profile. Defaults to the
+                                current omni.usd context stage
+        scope_index (ScopeIndex): Source of the SKU scopes
+    """
+
+    def __init__(self, stage_fn=None, scope_index=None):
+        self._stage_fn = stage_fn or (lambda: omni.usd.get_context().get_stage())
+        self._scope_index = scope_index if scope_index is not None else get_scope_index()
+        self.depth = self._scope_index.depth
+
+        self._stage = None
+        self._listener = None
+        self._cache = {}
+        self._stale = set()
+
+        self.composition = {}
+        self.last = []
+
+    #MARK: STAGE
+    # Stage binding -------------------------------------------------------------------------------
+
+    def _bind(self, stage: Usd.Stage):
+        if stage == self._stage:
+            return
+        self.detach()
+        self._stage = stage
+        if stage:
+            self._listener = Tf.Notice.Register(Usd.Notice.ObjectsChanged, self._on_objects_changed, stage)
+
+    def detach(self):
+        if self._listener:
+            self._listener.Revoke()
+        self._listener = None
+        self._stage = None
+        self._cache = {}
+        self._stale = set()
+        self.composition = {}
+
+    def _sku_of(self, path: Sdf.Path) -> Sdf.Path | None:
+        if path.pathElementCount < self.depth or not path.HasPrefix(self._scope_index.root):
+            return None
+        return path.GetPrefixes()[self.depth - 1]
+
+    def _on_objects_changed(self, notice, sender):
+        if not self._cache:
+            return
+        for path in notice.GetResyncedPaths():
+            sku = self._sku_of(path.GetPrimPath())
+            if sku is None:
+                if self._scope_index.root.HasPrefix(path) or path.HasPrefix(self._scope_index.root):
+                    # Above the SKU level: every SKU may have changed
+                    self._stale.update(self._cache)
+                continue
+            self._stale.add(sku)
+        for path in notice.GetChangedInfoOnlyPaths():
+            if path.IsPropertyPath() and path.name in MESH_ARRAY_BYTES:
+                sku = self._sku_of(path)
+                if sku is not None:
+                    self._stale.add(sku)
+
+    #MARK: COMPUTE
+    # Per-SKU statistics ----------------------------------------------------------------------------
+
+    def _compute(self, stage: Usd.Stage, path: Sdf.Path) -> SKUStats:
+        start = time.perf_counter()
+        stats = SKUStats(name=path.name, path=path.pathString)
+        layers = {}
+
+        prim = stage.GetPrimAtPath(path)
+        predicate = Usd.TraverseInstanceProxies(Usd.PrimAllPrimsPredicate)
+        for child in Usd.PrimRange(prim, predicate):
+            stats.prims += 1
+            stats.approx_bytes += constants.STAGE_STATS_PRIM_OVERHEAD_BYTES
+
+            if child.HasAuthoredPayloads():
+                stats.payloads += 1
+                if child.IsLoaded():
+                    stats.payloads_loaded += 1
+
+            if not child.IsInstanceProxy():
+                for spec in child.GetPrimStack():
+                    layers.setdefault(spec.layer.identifier, spec.layer)
+
+            if child.IsA(UsdGeom.Mesh):
+                stats.meshes += 1
+                for name, size in MESH_ARRAY_BYTES.items():
+                    attr = child.GetAttribute(name)
+                    value = attr.Get() if attr and attr.HasValue() else None
+                    if value is None:
+                        continue
+                    stats.approx_bytes += len(value) * size
+                    if name == "points":
+                        stats.points += len(value)
+                    elif name == "faceVertexCounts":
+                        stats.faces += len(value)
+
+        stats.layers = sorted(layers)
+        stats.layer_bytes = sum(layer_file_size(layer) or 0 for layer in layers.values())
+        stats.compute_ms = round((time.perf_counter() - start) * 1000, 2)
+        return stats
+
+    def _plan(self) -> list:
+        """SKU paths of the scene, dropping the cache entries of removed SKUs."""
+        stage = self._stage_fn()
+        self._bind(stage)
+        if not stage:
+            return []
+        paths = self._scope_index.paths()
+        for gone in set(self._cache) - set(paths):
+            del self._cache[gone]
+        return paths
+
+    def collect(self) -> list:
+        """Statistics of every SKU, in stage order (only stale and new SKUs are recomputed)."""
+        paths = self._plan()
+        for path in paths:
+            if path in self._stale or path not in self._cache:
+                self._cache[path] = self._compute(self._stage, path)
+                self._stale.discard(path)
+        self.last = [self._cache[path] for path in paths]
+        return self.last
+
+    def of(self, path) -> SKUStats | None:
+        """Statistics of the SKU scope at ``path``, recomputed only if it changed."""
+        stage = self._stage_fn()
+        self._bind(stage)
+        path = Sdf.Path(str(path))
+        if not stage or not stage.GetPrimAtPath(path):
+            return None
+        if path in self._stale or path not in self._cache:
+            self._cache[path] = self._compute(stage, path)
+            self._stale.discard(path)
+        return self._cache[path]
+
+    async def collect_async(self, on_progress=None) -> list:
+        """
+        collect() that yields to Kit between SKUs, so the UI stays responsive.
+
+        Args:
+            on_progress (callable): Called with (done, total) after each recomputed SKU
+        """
+        paths = self._plan()
+        todo = [path for path in paths if path in self._stale or path not in self._cache]
+        for i, path in enumerate(todo):
+            if not self._stage or not self._stage.GetPrimAtPath(path):
+                continue
+            self._cache[path] = self._compute(self._stage, path)
+            self._stale.discard(path)
+            if on_progress:
+                on_progress(i + 1, len(todo))
+            await omni.kit.app.get_app().next_update_async()
+        self.last = [self._cache[path] for path in paths if path in self._cache]
+        return self.last
+
+    #MARK: STAGE-WIDE
+    # Composition and totals ------------------------------------------------------------------------
+
+    def measure_composition(self, load_all: bool = False) -> dict:
+        """
+        Recompose the root layer on a throwaway stage and time it.
+
+        Runs on the main thread and holds a second composed copy of the scene
+        until it returns: referenced SKUs compose even with LoadNone, so on a
+        heavy scene this about doubles the stage memory for the duration.
+        The Diagnostics panel asks for confirmation first.
+
+        Args:
+            load_all (bool): Load the payloads too (slower, closer to a full open)
+        """
+        stage = self._stage_fn()
+        if not stage:
+            return {}
+        load = Usd.Stage.LoadAll if load_all else Usd.Stage.LoadNone
+        start = time.perf_counter()
+        probe = Usd.Stage.Open(stage.GetRootLayer(), load)
+        composed = time.perf_counter()
+        prims = sum(1 for _ in probe.Traverse())
+        end = time.perf_counter()
+
+        self.composition = {"load": "all" if load_all else "none",
+                            "composition_ms": round((composed - start) * 1000, 1),
+                            "traverse_ms": round((end - composed) * 1000, 1),
+                            "prims": prims,
+                            "layers": len(probe.GetUsedLayers())}
+        return self.composition
+
+    def totals(self, rows: list = None) -> dict:
+        rows = self.last if rows is None else rows
+        stage = self._stage_fn()
+        return {"skus": len(rows),
+                "prims": sum(r.prims for r in rows),
+                "meshes": sum(r.meshes for r in rows),
+                "points": sum(r.points for r in rows),
+                "payloads": sum(r.payloads for r in rows),
+                "payloads_loaded": sum(r.payloads_loaded for r in rows),
+                "approx_mb": round(sum(r.approx_bytes for r in rows) / 2**20, 1),
+                "stage_layers": len(stage.GetUsedLayers()) if stage else 0}
+
+    #MARK: EXPORT
+    # JSON export -------------------------------------------------------------------------------------
+
+    def export_json(self, path=None) -> str:
+        """
+        Write the last statistics to a JSON file and return its path.
+
+        Args:
+            path (str): Output file, defaults to a timestamped file in STAGE_STATS_EXPORT_DIR
+        """
+        if path is None:
+            constants.STAGE_STATS_EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+            path = constants.STAGE_STATS_EXPORT_DIR.joinpath(f"stage_stats_{time.strftime('%Y%m%d_%H%M%S')}.json")
+        stage = self._stage_fn()
+        data = {"stage": stage.GetRootLayer().identifier if stage else None,
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "composition": self.composition,
+                "totals": self.totals(),
+                "skus": [dict(asdict(r), approx_mb=r.approx_mb, loaded=r.loaded) for r in self.last]}
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        return str(path)
+
+    def report(self, top: int = 10):
+        t = self.totals()
+        print(f"Stage stats: {t['skus']} SKUs, {t['prims']} prims, {t['meshes']} meshes, "
+                f"{t['points']} points, ~{t['approx_mb']} MB, {t['stage_layers']} layers")
+        for r in sorted(self.last, key=lambda r: r.approx_bytes, reverse=True)[:top]:
+            print(f"  {r.name:<24} {r.prims:7d} prims {r.meshes:5d} meshes {r.points:9d} points "
+                    f"{len(r.layers):3d} layers ~{r.approx_mb:7.1f} MB {'loaded' if r.loaded else 'UNLOADED'}")
+
+_STATS = None
+
+def get_stage_stats() -> StageStats:
+    """Stage statistics of the current Kit stage, shared by every panel."""
+    global _STATS
+    if _STATS is None:
+        _STATS = StageStats()
+    return _STATS
+
+def shutdown():
+    global _STATS
+    if _STATS is not None:
+        _STATS.detach()
+        _STATS = None
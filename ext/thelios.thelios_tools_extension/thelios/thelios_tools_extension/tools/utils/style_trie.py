@@ -0,0 +1,110 @@
+"""
+Prefix trie over PLM style codes for the model field autocomplete.
+
+Style codes start with the two-letter brand prefix of BRANDS_DICT ("CD",
+"FE", ...). The trie is partitioned on that prefix, so a lookup jumps straight
+to the brand's sub-trie and walks only the remaining characters. Each node
+keeps its children sorted, and suggestions are collected depth-first until the
+limit is reached, so a lookup costs O(len(prefix) + limit), not O(styles).
+
+Example:
+    >>> trie = StyleTrie(["CD40153U", "CD40154U", "FE40012I"])
+    >>> trie.suggest("CD401", limit=5)
+    ['CD40153U', 'CD40154U']
+
+Author: [Luca Scattolin - Thelios]
+Version: 1.0
+"""
+
+PARTITION_LENGTH = 2
+
+class _Node:
+    __slots__ = ("children", "terminal", "_keys")
+
+    def __init__(self):
+        self.children = {}
+        self.terminal = False
+        self._keys = None
+
+    def sorted_keys(self) -> list:
+        # Sorted lazily once and reset by inserts
+        if self._keys is None:
+            self._keys = sorted(self.children)
+        return self._keys
+
+class StyleTrie:
+    """
+    Style-code trie partitioned by the two-letter brand prefix.
+
+    Args:
+        styles (iterable): Initial style codes
+    """
+
+    def __init__(self, styles=()):
+        self._partitions = {}
+        self._count = 0
+        for style in styles:
+            self.insert(style)
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, style: str) -> bool:
+        node = self._find(str(style).strip().upper())
+        return node is not None and node.terminal
+
+    def insert(self, style: str):
+        style = str(style).strip().upper()
+        if len(style) < PARTITION_LENGTH:
+            return
+
+        node = self._partitions.get(style[:PARTITION_LENGTH])
+        if node is None:
+            node = self._partitions[style[:PARTITION_LENGTH]] = _Node()
+        for char in style[PARTITION_LENGTH:]:
+            child = node.children.get(char)
+            if child is None:
+                child = node.children[char] = _Node()
+                node._keys = None
+            node = child
+        if not node.terminal:
+            node.terminal = True
+            self._count += 1
+
+    def partitions(self) -> list:
+        """Two-letter prefixes present in the trie."""
+        return sorted(self._partitions)
+
+    def _find(self, prefix: str):
+        node = self._partitions.get(prefix[:PARTITION_LENGTH])
+        if node is None:
+            return None
+        for char in prefix[PARTITION_LENGTH:]:
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node
+
+    def suggest(self, prefix: str, limit: int = 10) -> list:
+        """
+        Return up to ``limit`` style codes starting with ``prefix``, sorted.
+
+        Prefixes shorter than the brand partition return no suggestions.
+        """
+        prefix = str(prefix).strip().upper()
+        if len(prefix) < PARTITION_LENGTH:
+            return []
+        node = self._find(prefix)
+        if node is None:
+            return []
+
+        result = []
+        # Depth-first in character order yields the codes already sorted
+        stack = [(node, prefix)]
+        while stack and len(result) < limit:
+            node, code = stack.pop()
+            if node.terminal:
+                result.append(code)
+            for char in reversed(node.sorted_keys()):
+                stack.append((node.children[char], code + char))
+        return result
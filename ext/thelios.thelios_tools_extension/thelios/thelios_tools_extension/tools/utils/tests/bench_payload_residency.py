@@ -0,0 +1,132 @@
+"""
+Benchmark: memory of browsing SKUs with everything loaded vs PayloadResidency.
+
+Writes SKU_COUNT SKU files (one mesh of POINTS_PER_SKU points each) to a
+temp folder and builds a stage with the extension hierarchy, every SKU
+authored as a payload (as the collection import does) plus one SKU authored
+as a plain reference (as the model import does). Then:
+
+    - opens everything loaded (the View panel before residency) and
+      records the composed memory
+    - browses STEPS SKUs through PayloadResidency with a MAX_SKUS budget
+      and records the memory after each step
+    - checks that the referenced SKU is reported as not manageable
+
+Memory is the stage_stats estimate of the loaded SKUs and, when psutil is
+available, the process RSS (the allocator may keep part of the freed
+memory, so RSS drops less than the estimate).
+
+Run from the Kit Script Editor (the residency prefetch needs the Kit loop).
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+
+import omni.kit.app
+from pxr import Gf, Usd, UsdGeom, Vt
+
+from thelios.thelios_tools_extension.tools.utils.scope_index import ScopeIndex
+from thelios.thelios_tools_extension.tools.utils.stage_stats import StageStats
+from thelios.thelios_tools_extension.tools.utils.payload_residency import PayloadResidency
+
+SKU_COUNT = 60
+SKUS_PER_MODEL = 10
+POINTS_PER_SKU = 200000
+STEPS = 20
+MAX_SKUS = 6
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+def rss_mb() -> float | None:
+    return psutil.Process().memory_info().rss / 2**20 if psutil else None
+
+def write_sku_files(folder: str, count: int) -> list:
+    points = Vt.Vec3fArray([Gf.Vec3f(i, 0, 0) for i in range(POINTS_PER_SKU)])
+    paths = []
+    for i in range(count):
+        path = os.path.join(folder, f"sku_{i:03d}.usdc")
+        layer_stage = Usd.Stage.CreateNew(path)
+        root = UsdGeom.Xform.Define(layer_stage, "/Root")
+        layer_stage.SetDefaultPrim(root.GetPrim())
+        UsdGeom.Mesh.Define(layer_stage, "/Root/Mesh").GetPointsAttr().Set(points)
+        layer_stage.Save()
+        paths.append(path)
+    return paths
+
+def build_stage(files: list, load) -> Usd.Stage:
+    stage = Usd.Stage.CreateInMemory(load=load)
+    UsdGeom.Xform.Define(stage, "/World")
+    UsdGeom.Scope.Define(stage, "/World/Models")
+    UsdGeom.Xform.Define(stage, "/World/Models/glass_Xform")
+    for i, file_path in enumerate(files):
+        model = f"CD{40000 + i // SKUS_PER_MODEL}U"
+        name = f"{model}_{i % SKUS_PER_MODEL:03d}"
+        UsdGeom.Xform.Define(stage, f"/World/Models/glass_Xform/{model}_Xform")
+        UsdGeom.Scope.Define(stage, f"/World/Models/glass_Xform/{model}_Xform/Release_262")
+        sku_path = f"/World/Models/glass_Xform/{model}_Xform/Release_262/{name}"
+        UsdGeom.Scope.Define(stage, sku_path)
+        prim = stage.DefinePrim(f"{sku_path}/{name}")
+        if i == len(files) - 1:
+            # The model import authors references: nothing to unload
+            prim.GetReferences().AddReference(file_path)
+        else:
+            prim.GetPayloads().AddPayload(file_path)
+    return stage
+
+def loaded_mb(stats: StageStats) -> float:
+    return sum(row.approx_mb for row in stats.collect() if row.loaded)
+
+async def run():
+    folder = tempfile.mkdtemp(prefix="bench_residency_")
+    start = time.perf_counter()
+    files = write_sku_files(folder, SKU_COUNT)
+    print(f"{SKU_COUNT} SKU files of {POINTS_PER_SKU} points written in {time.perf_counter() - start:.1f}s")
+
+    base_rss = rss_mb()
+    stage = build_stage(files, Usd.Stage.LoadAll)
+    index = ScopeIndex(stage_fn=lambda: stage)
+    stats = StageStats(stage_fn=lambda: stage, scope_index=index)
+    all_loaded_mb = loaded_mb(stats)
+    all_loaded_rss = rss_mb()
+    print(f"everything loaded:    ~{all_loaded_mb:8.1f} MB estimated"
+            f"{f', RSS +{all_loaded_rss - base_rss:.0f} MB' if psutil else ''}")
+    stats.detach()
+    index.detach()
+    del stage, stats, index
+
+    base_rss = rss_mb()
+    stage = build_stage(files, Usd.Stage.LoadNone)
+    index = ScopeIndex(stage_fn=lambda: stage)
+    stats = StageStats(stage_fn=lambda: stage, scope_index=index)
+    residency = PayloadResidency(stage_fn=lambda: stage, scope_index=index, stage_stats=stats,
+                                    max_skus=MAX_SKUS, max_gb=1024)
+    names = index.names()
+    step_ms = []
+    for i in range(STEPS):
+        start = time.perf_counter()
+        residency.visit(names[i])
+        step_ms.append((time.perf_counter() - start) * 1000)
+        # Let the prefetch of the neighbours run
+        await omni.kit.app.get_app().next_update_async()
+        await omni.kit.app.get_app().next_update_async()
+    residency.visit(names[-1])
+
+    browsed_mb = loaded_mb(stats)
+    browsed_rss = rss_mb()
+    print(f"browsing {STEPS} SKUs:     ~{browsed_mb:8.1f} MB estimated"
+            f"{f', RSS +{browsed_rss - base_rss:.0f} MB' if psutil else ''}"
+            f" ({len(residency.resident())} SKUs resident, budget {MAX_SKUS})")
+    print(f"visit (median):        {sorted(step_ms)[len(step_ms) // 2]:8.2f} ms")
+    residency.report()
+
+    assert len(residency.resident()) <= MAX_SKUS, "residency went over its SKU budget"
+    assert [path.name for path in residency.unmanaged()] == [names[-1]], "referenced SKU not reported"
+    assert browsed_mb < all_loaded_mb, "browsing did not use less memory than loading everything"
+    print("memory follows the browsed SKUs, referenced SKU reported as not manageable")
+
+asyncio.ensure_future(run())
@@ -0,0 +1,108 @@
+"""
+Benchmark: fresh connection per query vs pooled PLMClient.
+
+Runs against a local SQLite stand-in of [ReportDB].[dbo].[vw_render_style_sku]
+with the same columns. SQLite connects in microseconds, so HANDSHAKE_LATENCY
+adds a sleep to every new connection to model the TCP + auth round trips of
+the real SQL Server.
+
+Run from the Kit Script Editor (or any python with the extension on sys.path).
+"""
+
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from thelios.thelios_tools_extension.tools.utils.plm_client import PLMClient
+
+HANDSHAKE_LATENCY = 0.03    #seconds per new connection
+CALLS = 200
+CONCURRENT_CALLERS = 8
+CALLS_PER_CALLER = 50
+
+TABLE = "vw_render_style_sku"
+BRANDS = ["Dior", "Fendi", "Celine", "Givenchy", "Loewe", "Kenzo"]
+SEASONS = ["251", "252", "261", "262"]
+
+def build_standin_db(path, styles=2000, colorways=6):
+    conn = sqlite3.connect(path)
+    conn.execute(f"""CREATE TABLE {TABLE} (
+                        [Style] TEXT, [Colorway] TEXT, [Season] TEXT, [Brand] TEXT,
+                        [Category] TEXT, [Gender] TEXT, [Style_Name] TEXT)""")
+    rows = []
+    for i in range(styles):
+        style = f"CD4{i:04d}U"
+        brand = random.choice(BRANDS)
+        season = random.choice(SEASONS)
+        category = random.choice(["Optical", "Sun"])
+        gender = random.choice(["M", "F"])
+        for c in range(colorways):
+            rows.append((style, f"{c:02d}A", season, brand, category, gender, f"NAME{i}"))
+    conn.executemany(f"INSERT INTO {TABLE} VALUES (?,?,?,?,?,?,?)", rows)
+    conn.commit()
+    conn.close()
+
+def make_connect_fn(path):
+    def connect():
+        time.sleep(HANDSHAKE_LATENCY)
+        return sqlite3.connect(path, check_same_thread=False)
+    return connect
+
+def random_style():
+    return f"CD4{random.randrange(2000):04d}U"
+
+def query_fresh(connect_fn, style):
+    conn = connect_fn()
+    cur = conn.cursor()
+    cur.execute(f"SELECT [Colorway], [Season], [Style_Name] FROM {TABLE} WHERE [Style] = '{style}'")
+    res = cur.fetchall()
+    conn.close()
+    return res
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+def report(label, samples, wall=None):
+    samples = sorted(samples)
+    p50 = samples[len(samples) // 2] * 1000
+    p95 = samples[int(len(samples) * 0.95)] * 1000
+    line = f"{label:<28} mean {statistics.mean(samples) * 1000:7.2f} ms   p50 {p50:7.2f} ms   p95 {p95:7.2f} ms"
+    if wall is not None:
+        line += f"   {len(samples) / wall:8.1f} q/s"
+    print(line)
+
+def run():
+    db_path = os.path.join(tempfile.mkdtemp(), "plm_standin.db")
+    build_standin_db(db_path)
+    connect_fn = make_connect_fn(db_path)
+    client = PLMClient(table=TABLE, connect_fn=connect_fn, pool_size=CONCURRENT_CALLERS)
+
+    print(f"Stand-in DB: {db_path}  (handshake {HANDSHAKE_LATENCY * 1000:.0f} ms)")
+
+    # Sequential latency per call
+    fresh = [timed(query_fresh, connect_fn, random_style()) for _ in range(CALLS)]
+    pooled = [timed(client.get_style_skus, random_style()) for _ in range(CALLS)]
+    report("sequential / fresh conn", fresh)
+    report("sequential / pooled", pooled)
+
+    # Concurrent callers
+    def caller(fn):
+        return [timed(fn, random_style()) for _ in range(CALLS_PER_CALLER)]
+
+    for label, fn in (("concurrent / fresh conn", lambda s: query_fresh(connect_fn, s)),
+                        ("concurrent / pooled", client.get_style_skus)):
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=CONCURRENT_CALLERS) as pool:
+            results = list(pool.map(lambda _: caller(fn), range(CONCURRENT_CALLERS)))
+        wall = time.perf_counter() - start
+        report(label, [s for r in results for s in r], wall)
+
+    client.close()
+
+run()
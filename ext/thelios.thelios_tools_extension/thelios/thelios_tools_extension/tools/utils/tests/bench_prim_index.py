@@ -0,0 +1,113 @@
+"""
+Benchmark: stage-wide name scans (old find_scope_by_name) vs PrimIndex.
+
+Builds an in-memory stage with the extension hierarchy, every SKU imported
+in two releases (so SKU names repeat), then times:
+
+    - the old Traverse() name scan and the first index build
+    - cached name lookups (of the last SKU, the old scan's worst case)
+    - a lookup right after importing new SKUs (incremental re-walk of the
+      new subtrees only)
+    - a lookup after deactivating a SKU
+
+After every edit the index is checked against a fresh Traverse().
+
+Run from the Kit Script Editor (or any python with the extension on sys.path).
+"""
+
+import statistics
+import time
+
+from pxr import Usd, UsdGeom
+
+from thelios.thelios_tools_extension.tools.utils.prim_index import PrimIndex
+
+SKU_COUNT = 2000
+SKUS_PER_MODEL = 10
+PRIMS_PER_SKU = 20
+RELEASES = ["261", "262"]
+REPEAT = 20
+
+def define_sku(stage: Usd.Stage, i: int, release: str):
+    model = f"CD{40000 + i // SKUS_PER_MODEL}U"
+    sku_path = f"/World/Models/glass_Xform/{model}_Xform/Release_{release}/{model}_{i % SKUS_PER_MODEL:03d}"
+    UsdGeom.Scope.Define(stage, sku_path)
+    for j in range(PRIMS_PER_SKU):
+        UsdGeom.Mesh.Define(stage, f"{sku_path}/{model}/mesh_{j}")
+    return sku_path
+
+def build_stage(sku_count: int) -> Usd.Stage:
+    stage = Usd.Stage.CreateInMemory()
+    for name in ("Setup", "Lights", "Cameras"):
+        UsdGeom.Scope.Define(stage, f"/World/{name}")
+    for i in range(sku_count):
+        for release in RELEASES:
+            define_sku(stage, i, release)
+    return stage
+
+def old_find(stage: Usd.Stage, name: str):
+    for prim in stage.Traverse():
+        if prim.IsA(UsdGeom.Scope) and prim.GetName() == name:
+            return prim
+    return None
+
+def traverse_map(stage: Usd.Stage) -> dict:
+    names = {}
+    for prim in stage.Traverse():
+        names.setdefault(prim.GetName(), set()).add(prim.GetPath())
+    return names
+
+def check(index: PrimIndex, stage: Usd.Stage):
+    expected = traverse_map(stage)
+    actual = {name: set(index.paths_of(name)) for name in expected}
+    assert actual == expected and len(index) == sum(len(p) for p in expected.values()), "index out of date"
+
+def timed(fn, repeat: int = REPEAT) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+def run():
+    start = time.perf_counter()
+    stage = build_stage(SKU_COUNT)
+    print(f"Stage with {SKU_COUNT} SKUs x {len(RELEASES)} releases built in {time.perf_counter() - start:.1f}s")
+
+    # Last SKU of the stage: the old scan walks (almost) everything to find it
+    name = f"CD{40000 + (SKU_COUNT - 1) // SKUS_PER_MODEL}U_{(SKU_COUNT - 1) % SKUS_PER_MODEL:03d}"
+
+    index = PrimIndex(stage_fn=lambda: stage)
+    start = time.perf_counter()
+    index.find(name, UsdGeom.Scope)
+    first_build = (time.perf_counter() - start) * 1000
+    check(index, stage)
+
+    old_lookup = timed(lambda: old_find(stage, name), repeat=5)
+    new_lookup = timed(lambda: index.find(name, UsdGeom.Scope), repeat=REPEAT * 100)
+
+    counter = [SKU_COUNT]
+    def after_import():
+        for _ in range(10):
+            define_sku(stage, counter[0], RELEASES[-1])
+            counter[0] += 1
+        return index.find(name, UsdGeom.Scope)
+    import_10 = timed(after_import, repeat=5)
+    check(index, stage)
+
+    sku_path = index.paths_of("CD40000U_000")[0]
+    stage.GetPrimAtPath(sku_path).SetActive(False)
+    start = time.perf_counter()
+    index.find(name, UsdGeom.Scope)
+    deactivate = (time.perf_counter() - start) * 1000
+    check(index, stage)
+
+    print(f"old Traverse() name scan:          {old_lookup:9.3f} ms")
+    print(f"index first build:                 {first_build:9.3f} ms")
+    print(f"index lookup (cached):             {new_lookup:9.5f} ms")
+    print(f"index lookup after 10 new SKUs:    {import_10:9.3f} ms")
+    print(f"index lookup after deactivation:   {deactivate:9.3f} ms")
+    print(f"rebuilds: {index.rebuilds}, index matches Traverse() after every edit")
+
+run()
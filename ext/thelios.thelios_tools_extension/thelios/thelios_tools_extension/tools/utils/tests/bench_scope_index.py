@@ -0,0 +1,108 @@
+"""
+Benchmark: full-stage Traverse() (old get_filtered_scopes) vs ScopeIndex.
+
+Builds an in-memory stage with the extension hierarchy
+/World/Models/glass_Xform/{model}_Xform/Release_{r}/{model}_{sku} for
+SKU_COUNT SKUs, each holding PRIMS_PER_SKU geometry prims (standing in for
+the referenced SKU content), then times:
+
+    - the old Traverse() based scope list
+    - the first (pruned) index build
+    - cached reads: len(index) and index[i], as the view slider does
+    - reads after a visibility edit (value change, no rebuild)
+    - reads after adding one SKU (structural change, one rebuild)
+
+Run from the Kit Script Editor (or any python with the extension on sys.path).
+"""
+
+import statistics
+import time
+
+from pxr import Usd, UsdGeom
+
+from thelios.thelios_tools_extension.tools.utils.scope_index import ScopeIndex
+
+SKU_COUNT = 5000
+SKUS_PER_MODEL = 10
+PRIMS_PER_SKU = 40
+REPEAT = 20
+
+def build_stage(sku_count: int) -> Usd.Stage:
+    stage = Usd.Stage.CreateInMemory()
+    UsdGeom.Xform.Define(stage, "/World")
+    UsdGeom.Scope.Define(stage, "/World/Models")
+    UsdGeom.Xform.Define(stage, "/World/Models/glass_Xform")
+    for i in range(sku_count):
+        model = f"CD{40000 + i // SKUS_PER_MODEL}U"
+        sku_path = f"/World/Models/glass_Xform/{model}_Xform/Release_262/{model}_{i % SKUS_PER_MODEL:03d}"
+        UsdGeom.Xform.Define(stage, f"/World/Models/glass_Xform/{model}_Xform")
+        UsdGeom.Scope.Define(stage, f"/World/Models/glass_Xform/{model}_Xform/Release_262")
+        UsdGeom.Scope.Define(stage, sku_path)
+        UsdGeom.Xform.Define(stage, f"{sku_path}/{model}")
+        UsdGeom.Scope.Define(stage, f"{sku_path}/{model}/Looks")
+        for j in range(PRIMS_PER_SKU):
+            UsdGeom.Mesh.Define(stage, f"{sku_path}/{model}/mesh_{j}")
+    return stage
+
+def old_filtered_scopes(stage: Usd.Stage) -> list:
+    scopes = [
+        prim.GetPath().pathString
+        for prim in stage.Traverse()
+        if prim.GetTypeName() == "Scope"
+        and prim.GetPath().pathString.startswith("/World/Models")
+        and not prim.GetName().endswith(("Looks", "mtl"))
+        and prim.IsLoaded()
+    ]
+    filtered = [
+        s for s in scopes
+        if not s.split("/")[-1].startswith("Release_")
+        and len(s.split("/")) <= 7
+    ]
+    return [s.split("/")[-1] for s in filtered][1:]
+
+def timed(fn, repeat: int = REPEAT) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+def run():
+    start = time.perf_counter()
+    stage = build_stage(SKU_COUNT)
+    print(f"Stage with {SKU_COUNT} SKUs built in {time.perf_counter() - start:.1f}s")
+
+    index = ScopeIndex(stage_fn=lambda: stage)
+
+    old = old_filtered_scopes(stage)
+    start = time.perf_counter()
+    new = index.names()
+    first_build = (time.perf_counter() - start) * 1000
+    assert old == new, "index differs from the Traverse() result"
+
+    # One slider step: the old code called get_filtered_scopes for len() and for the item
+    old_step = timed(lambda: (len(old_filtered_scopes(stage)), old_filtered_scopes(stage)[SKU_COUNT // 2]))
+    new_step = timed(lambda: (len(index), index[SKU_COUNT // 2]), repeat=REPEAT * 100)
+
+    sku_path = index.path_of(index[0])
+    def after_visibility_edit():
+        UsdGeom.Imageable(stage.GetPrimAtPath(sku_path)).MakeInvisible()
+        return len(index), index[0]
+    visibility = timed(after_visibility_edit)
+
+    counter = [0]
+    def after_new_sku():
+        counter[0] += 1
+        UsdGeom.Scope.Define(stage, f"/World/Models/glass_Xform/NEW_Xform/Release_262/NEW_{counter[0]:03d}")
+        return len(index), index[-1]
+    structural = timed(after_new_sku, repeat=5)
+
+    print(f"old Traverse() slider step:       {old_step:9.3f} ms")
+    print(f"index first build (pruned):       {first_build:9.3f} ms")
+    print(f"index slider step (cached):       {new_step:9.5f} ms")
+    print(f"index after visibility edit:      {visibility:9.5f} ms")
+    print(f"index after new SKU (rebuild):    {structural:9.3f} ms")
+    print(f"rebuilds: {index.rebuilds}")
+
+run()
@@ -0,0 +1,163 @@
+"""
+Benchmark: old hide_all_scopes_except vs ScopeIsolation.
+
+Builds an in-memory stage with the extension hierarchy (same layout as
+bench_scope_index) plus the Setup/Lights/Cameras scopes, then steps through
+the SKUs as the view slider does and compares, per step:
+
+    - wall time
+    - visibility opinions written (every write is a change notice for Kit)
+
+At the end the computed visibility of every prim is checked against the old
+algorithm's result on a copy of the stage, and the root layer of the new
+stage is checked to be untouched (overrides live in the session sublayer).
+
+Run from the Kit Script Editor (or any python with the extension on sys.path).
+"""
+
+import statistics
+import time
+
+from pxr import Usd, UsdGeom
+
+from thelios.thelios_tools_extension.tools.utils.prim_index import PrimIndex
+from thelios.thelios_tools_extension.tools.utils.scope_index import ScopeIndex
+from thelios.thelios_tools_extension.tools.utils.scope_isolation import ScopeIsolation
+
+SKU_COUNT = 1000
+SKUS_PER_MODEL = 10
+PRIMS_PER_SKU = 20
+STEPS = 10
+KEEP_SCOPES = ["Models", "Setup", "Lights", "Cameras"]
+
+def build_stage(sku_count: int) -> Usd.Stage:
+    stage = Usd.Stage.CreateInMemory()
+    UsdGeom.Xform.Define(stage, "/World")
+    for name in ("Setup", "Lights", "Cameras"):
+        UsdGeom.Scope.Define(stage, f"/World/{name}")
+        UsdGeom.Xform.Define(stage, f"/World/{name}/item")
+    UsdGeom.Scope.Define(stage, "/World/Models")
+    UsdGeom.Xform.Define(stage, "/World/Models/glass_Xform")
+    for i in range(sku_count):
+        model = f"CD{40000 + i // SKUS_PER_MODEL}U"
+        sku_path = f"/World/Models/glass_Xform/{model}_Xform/Release_262/{model}_{i % SKUS_PER_MODEL:03d}"
+        UsdGeom.Xform.Define(stage, f"/World/Models/glass_Xform/{model}_Xform")
+        UsdGeom.Scope.Define(stage, f"/World/Models/glass_Xform/{model}_Xform/Release_262")
+        UsdGeom.Scope.Define(stage, sku_path)
+        UsdGeom.Xform.Define(stage, f"{sku_path}/{model}")
+        UsdGeom.Scope.Define(stage, f"{sku_path}/{model}/Looks")
+        for j in range(PRIMS_PER_SKU):
+            UsdGeom.Mesh.Define(stage, f"{sku_path}/{model}/mesh_{j}")
+    return stage
+
+# Old algorithm (USDTools.hide_all_scopes_except before the isolation engine) --------------------
+
+class OldIsolation:
+
+    def __init__(self, stage):
+        self.stage = stage
+        self.writes = 0
+
+    def find_scope_by_name(self, name):
+        for prim in self.stage.Traverse():
+            if prim.IsA(UsdGeom.Scope) and prim.GetName() == name:
+                return prim
+        return None
+
+    def set_visibility(self, prim, visible):
+        imageable = UsdGeom.Imageable(prim)
+        if imageable:
+            self.writes += 1
+            if visible:
+                imageable.MakeVisible()
+            else:
+                imageable.MakeInvisible()
+
+    def make_parents_visible(self, prim):
+        parent = prim.GetParent()
+        while parent and parent.GetPath() != "/":
+            if UsdGeom.Imageable(parent):
+                self.set_visibility(parent, True)
+            parent = parent.GetParent()
+
+    def make_children_visible(self, prim):
+        for child in prim.GetAllChildren():
+            if UsdGeom.Imageable(child):
+                self.set_visibility(child, True)
+                self.make_children_visible(child)
+
+    def isolate(self, target_name, keep_names):
+        target = self.find_scope_by_name(target_name)
+        keep = {}
+        for name in keep_names:
+            prim = self.find_scope_by_name(name)
+            if prim:
+                keep[name] = prim
+        for prim in self.stage.Traverse():
+            if not prim.IsA(UsdGeom.Scope):
+                continue
+            path = prim.GetPath()
+            if path == target.GetPath() or path.HasPrefix(target.GetPath()):
+                self.set_visibility(prim, True)
+                self.make_children_visible(prim)
+            elif prim.GetName() in keep and path == keep[prim.GetName()].GetPath():
+                self.set_visibility(prim, True)
+                self.make_children_visible(prim)
+            else:
+                self.set_visibility(prim, False)
+        self.make_parents_visible(target)
+        for prim in keep.values():
+            self.make_parents_visible(prim)
+
+# Benchmark ----------------------------------------------------------------------------------------
+
+def visibility_map(stage: Usd.Stage) -> dict:
+    return {prim.GetPath(): UsdGeom.Imageable(prim).ComputeVisibility()
+            for prim in stage.Traverse() if prim.IsA(UsdGeom.Imageable)}
+
+def run():
+    start = time.perf_counter()
+    old_stage = build_stage(SKU_COUNT)
+    new_stage = build_stage(SKU_COUNT)
+    print(f"Two stages with {SKU_COUNT} SKUs built in {time.perf_counter() - start:.1f}s")
+
+    index = ScopeIndex(stage_fn=lambda: new_stage)
+    names = index.names()
+    targets = [names[(i * 37) % len(names)] for i in range(STEPS)]
+
+    root_before = new_stage.GetRootLayer().ExportToString()
+    old = OldIsolation(old_stage)
+    isolation = ScopeIsolation(stage_fn=lambda: new_stage, scope_index=index,
+                                prim_index=PrimIndex(stage_fn=lambda: new_stage))
+
+    old_ms, old_writes, new_ms, new_writes, new_visited = [], [], [], [], []
+    for target in targets:
+        old.writes = 0
+        start = time.perf_counter()
+        old.isolate(target, KEEP_SCOPES)
+        old_ms.append((time.perf_counter() - start) * 1000)
+        old_writes.append(old.writes)
+
+        start = time.perf_counter()
+        isolation.isolate(target, KEEP_SCOPES)
+        new_ms.append((time.perf_counter() - start) * 1000)
+        new_writes.append(isolation.last_writes)
+        new_visited.append(isolation.last_visited)
+
+    assert visibility_map(old_stage) == visibility_map(new_stage), "visibility differs from the old algorithm"
+    assert new_stage.GetRootLayer().ExportToString() == root_before, "isolation edited the root layer"
+
+    print(f"old first step:        {old_ms[0]:9.2f} ms, {old_writes[0]:6d} writes")
+    print(f"new first step (full): {new_ms[0]:9.2f} ms, {new_writes[0]:6d} writes, {new_visited[0]:6d} prims visited")
+    print(f"old switch (median):   {statistics.median(old_ms[1:]):9.2f} ms, "
+            f"{statistics.median(old_writes[1:]):6.0f} writes")
+    print(f"new switch (median):   {statistics.median(new_ms[1:]):9.2f} ms, "
+            f"{statistics.median(new_writes[1:]):6.0f} writes, {statistics.median(new_visited[1:]):6.0f} prims visited")
+    print("final visibility matches the old algorithm, root layer untouched")
+    print(f"isolation layer: {len(isolation.layer.ExportToString().splitlines())} lines")
+
+    start = time.perf_counter()
+    isolation.clear()
+    print(f"show all (layer clear):  {(time.perf_counter() - start) * 1000:9.2f} ms")
+
+run()
@@ -0,0 +1,97 @@
+"""
+Benchmark: per-SKU Usd API hierarchy creation vs batched build_sku_hierarchy.
+
+Creates the /World/Models/glass_Xform/{model}_Xform/Release_{r}/{model}_{sku}
+hierarchy for SKU_COUNTS synthetic SKUs on fresh in-memory stages, with the
+old create_hierarchy_structure body (Define per prim, SetDefaultPrim and the
+eight rotateY samples on every call) and with one build_sku_hierarchy call,
+and prints SKUs per second for both.
+
+A ObjectsChanged listener counts the change notices each approach sends (Kit
+refreshes the stage window and the viewport on every one of them). The
+resulting prims, types, default prim and turntable samples are checked to
+be identical.
+
+Run from the Kit Script Editor (or any python with the extension on sys.path).
+"""
+
+import time
+
+from pxr import Tf, Usd, UsdGeom
+
+from thelios.thelios_tools_extension.tools.utils.sku_hierarchy import build_sku_hierarchy
+
+SKU_COUNTS = [100, 1000, 5000]
+SKUS_PER_MODEL = 10
+RELEASES = ["261", "262"]
+
+def synthetic_skus(count: int) -> list:
+    return [(f"CD{40000 + i // SKUS_PER_MODEL}U", f"{i % SKUS_PER_MODEL:02d}A", RELEASES[i % len(RELEASES)])
+            for i in range(count)]
+
+# Old per-SKU function (USDTools.create_hierarchy_structure before the batch builder) ------------
+
+def old_create_hierarchy(stage, model_name, sku_name, release):
+
+    def get_or_create(path, schema):
+        prim = stage.GetPrimAtPath(path)
+        if prim.IsValid():
+            return schema(prim)
+        return schema.Define(stage, path)
+
+    world = get_or_create("/World", UsdGeom.Xform)
+    stage.SetDefaultPrim(world.GetPrim())
+    get_or_create("/World/Models", UsdGeom.Scope)
+    glass_path = "/World/Models/glass_Xform"
+    get_or_create(glass_path, UsdGeom.Xform)
+
+    xformable = UsdGeom.Xformable(stage.GetPrimAtPath(glass_path))
+    rot_y = xformable.GetRotateYOp()
+    if not rot_y:
+        rot_y = xformable.AddRotateYOp(UsdGeom.XformOp.PrecisionFloat)
+    for i in range(1, 9):
+        rot_y.Set(-45.0 * i, Usd.TimeCode(i))
+
+    model_path = f"{glass_path}/{model_name}_Xform"
+    get_or_create(model_path, UsdGeom.Xform)
+    release_path = f"{model_path}/Release_{release}"
+    get_or_create(release_path, UsdGeom.Scope)
+    get_or_create(f"{release_path}/{model_name}_{sku_name}", UsdGeom.Scope)
+
+# Benchmark ----------------------------------------------------------------------------------------
+
+def snapshot(stage: Usd.Stage) -> tuple:
+    prims = [(str(prim.GetPath()), prim.GetTypeName()) for prim in stage.Traverse()]
+    rot_y = UsdGeom.Xformable(stage.GetPrimAtPath("/World/Models/glass_Xform")).GetRotateYOp()
+    samples = [(t, rot_y.Get(t)) for t in rot_y.GetAttr().GetTimeSamples()]
+    return prims, str(stage.GetDefaultPrim().GetPath()), samples
+
+def timed_build(build) -> tuple:
+    stage = Usd.Stage.CreateInMemory()
+    notices = [0]
+    def on_changed(notice, sender):
+        notices[0] += 1
+    listener = Tf.Notice.Register(Usd.Notice.ObjectsChanged, on_changed, stage)
+    start = time.perf_counter()
+    build(stage)
+    elapsed = time.perf_counter() - start
+    listener.Revoke()
+    return stage, elapsed, notices[0]
+
+def run():
+    for count in SKU_COUNTS:
+        skus = synthetic_skus(count)
+
+        def old_build(stage):
+            for model, sku, release in skus:
+                old_create_hierarchy(stage, model, sku, release)
+
+        old_stage, old_s, old_notices = timed_build(old_build)
+        new_stage, new_s, new_notices = timed_build(lambda stage: build_sku_hierarchy(stage, skus))
+        assert snapshot(old_stage) == snapshot(new_stage), "batched hierarchy differs from the per-SKU one"
+
+        print(f"{count:6d} SKUs | per-SKU: {count / old_s:9.0f} SKU/s, {old_notices:6d} notices"
+                f" | batched: {count / new_s:9.0f} SKU/s, {new_notices:3d} notices"
+                f" | x{old_s / new_s:.1f}")
+
+run()
@@ -0,0 +1,234 @@
+"""
+Kit commands of the extension.
+
+CreateReferencesBatchCommand authors many references in one
+Sdf.ChangeBlock as a single undoable command. Running the stock
+"CreateReference" command once per SKU put one entry per SKU on the undo
+stack and recomposed the stage once per SKU; an import of 200 SKUs is now
+one entry and one recomposition, and one Ctrl+Z removes the whole import.
+A reference that is already authored is not added again, so re-importing
+a SKU is a no-op. CreatePayloadsBatchCommand does the same with payloads,
+left unloaded by default: a load rule is set on each new prim before its
+payload is authored, so the asset is never opened until the prim is
+loaded.
+
+SyncReleaseReferencesCommand applies the removals and retargets of a
+release sync (see release_sync) in one change block; removed SKU scopes
+are kept in an anonymous layer so undo restores them exactly.
+
+Example:
+    >>> omni.kit.commands.execute("CreateReferencesBatch",
+    ...     references=[("/World/Lights/Light_Setup", "U:/02_TOOLS/01_Template/lights.usd", "")])
+
+Author: [Luca Scattolin - Thelios]
+Version: 1.0
+"""
+
+import sys
+
+import omni.kit.commands
+import omni.usd
+from pxr import Sdf, Usd
+
+class CreateReferencesBatchCommand(omni.kit.commands.Command):
+    """
+    Create prims referencing external assets, all in one change block.
+
+    Args:
+        references (list): (path_to, asset_path, prim_path) tuples. ``path_to``
+                            is the prim to create (its parent must exist),
+                            ``prim_path`` the prim inside the asset (empty
+                            Sdf.Path or "" for the defaultPrim)
+        usd_context (omni.usd.UsdContext): Context of the stage to edit,
+                            defaults to the main context
+    """
+
+    def __init__(self, references: list, usd_context=None):
+        self._references = [(Sdf.Path(str(path_to)), asset_path, Sdf.Path(str(prim_path)) if prim_path else Sdf.Path.emptyPath)
+                            for path_to, asset_path, prim_path in references]
+        self._usd_context = usd_context or omni.usd.get_context()
+        self._layer = None
+        self._applied = []
+
+    def _make_arc(self, asset_path: str, prim_path: Sdf.Path) -> Sdf.Reference:
+        return Sdf.Reference(asset_path, prim_path)
+
+    def _arc_list(self, prim_spec: Sdf.PrimSpec):
+        return prim_spec.referenceList
+
+    def do(self) -> list:
+        stage = self._usd_context.get_stage()
+        edit_target = stage.GetEditTarget()
+        self._layer = edit_target.GetLayer()
+        self._applied = []
+
+        created = []
+        with Sdf.ChangeBlock():
+            for path_to, asset_path, prim_path in self._references:
+                spec_path = edit_target.MapToSpecPath(path_to)
+                reference = self._make_arc(asset_path, prim_path)
+                existing_spec = self._layer.GetPrimAtPath(spec_path)
+                existed = bool(existing_spec)
+                if existed and reference in self._arc_list(existing_spec).GetAddedOrExplicitItems():
+                    continue
+                prim_spec = Sdf.CreatePrimInLayer(self._layer, spec_path)
+                if not existed:
+                    prim_spec.specifier = Sdf.SpecifierDef
+                self._arc_list(prim_spec).Prepend(reference)
+                self._applied.append((spec_path, reference, existed))
+                created.append(path_to)
+        return created
+
+    def undo(self):
+        if self._layer is None:
+            return
+        with Sdf.ChangeBlock():
+            for spec_path, reference, existed in reversed(self._applied):
+                prim_spec = self._layer.GetPrimAtPath(spec_path)
+                if not prim_spec:
+                    continue
+                if existed:
+                    if reference in self._arc_list(prim_spec).prependedItems:
+                        self._arc_list(prim_spec).prependedItems.remove(reference)
+                    continue
+                parent_spec = self._layer.GetPrimAtPath(spec_path.GetParentPath()) or self._layer.pseudoRoot
+                del parent_spec.nameChildren[spec_path.name]
+        self._applied = []
+
+class CreatePayloadsBatchCommand(CreateReferencesBatchCommand):
+    """
+    Create prims with payloads to external assets, all in one change block.
+
+    Args:
+        payloads (list): (path_to, asset_path, prim_path) tuples, as the
+                            references of CreateReferencesBatchCommand
+        load (bool): Load the new payloads. False leaves them unloaded
+                            until the prims are loaded (Stage.Load/LoadAndUnload)
+        usd_context (omni.usd.UsdContext): Context of the stage to edit,
+                            defaults to the main context
+    """
+
+    def __init__(self, payloads: list, load: bool = False, usd_context=None):
+        super().__init__(payloads, usd_context)
+        self._load = load
+        self._load_rules = None
+
+    def _make_arc(self, asset_path: str, prim_path: Sdf.Path) -> Sdf.Payload:
+        return Sdf.Payload(asset_path, prim_path)
+
+    def _arc_list(self, prim_spec: Sdf.PrimSpec):
+        return prim_spec.payloadList
+
+    def do(self) -> list:
+        stage = self._usd_context.get_stage()
+        self._load_rules = None
+        if not self._load:
+            # Rule first: the payloads compose unloaded, their assets are not even opened
+            self._load_rules = stage.GetLoadRules()
+            rules = stage.GetLoadRules()
+            for path_to, _, _ in self._references:
+                # Prims already on the stage keep their load state
+                if not stage.GetPrimAtPath(path_to):
+                    rules.AddRule(path_to, Usd.StageLoadRules.NoneRule)
+            rules.Minimize()
+            stage.SetLoadRules(rules)
+        return super().do()
+
+    def undo(self):
+        super().undo()
+        if self._load_rules is not None:
+            self._usd_context.get_stage().SetLoadRules(self._load_rules)
+            self._load_rules = None
+
+def _arc_list(prim_spec: Sdf.PrimSpec, arc):
+    return prim_spec.payloadList if isinstance(arc, Sdf.Payload) else prim_spec.referenceList
+
+class SyncReleaseReferencesCommand(omni.kit.commands.Command):
+    """
+    Remove SKU scopes and retarget SKU references, all in one change block.
+
+    Only specs of the edit target layer are edited; SKUs authored in other
+    layers are reported and skipped.
+
+    Args:
+        remove (list): SKU scope paths to delete
+        retarget (list): (reference prim path, old asset path, new asset path) tuples,
+                            the reference or payload to the old asset is retargeted
+        usd_context (omni.usd.UsdContext): Context of the stage to edit,
+                            defaults to the main context
+    """
+
+    def __init__(self, remove=(), retarget=(), usd_context=None):
+        self._remove = [Sdf.Path(str(path)) for path in remove]
+        self._retarget = [(Sdf.Path(str(path)), old_asset, new_asset) for path, old_asset, new_asset in retarget]
+        self._usd_context = usd_context or omni.usd.get_context()
+        self._layer = None
+        self._backup = None
+        self._removed = []
+        self._retargeted = []
+
+    def do(self) -> tuple:
+        stage = self._usd_context.get_stage()
+        edit_target = stage.GetEditTarget()
+        self._layer = edit_target.GetLayer()
+        self._backup = Sdf.Layer.CreateAnonymous("sync_release_undo")
+        self._removed = []
+        self._retargeted = []
+
+        with Sdf.ChangeBlock():
+            for path in self._remove:
+                spec_path = edit_target.MapToSpecPath(path)
+                prim_spec = self._layer.GetPrimAtPath(spec_path)
+                if not prim_spec:
+                    print(f"SKU NOT removed: {path} (not authored in {self._layer.identifier})")
+                    continue
+                Sdf.CreatePrimInLayer(self._backup, spec_path.GetParentPath())
+                Sdf.CopySpec(self._layer, spec_path, self._backup, spec_path)
+                parent_spec = self._layer.GetPrimAtPath(spec_path.GetParentPath()) or self._layer.pseudoRoot
+                del parent_spec.nameChildren[spec_path.name]
+                self._removed.append(spec_path)
+
+            for path, old_asset, new_asset in self._retarget:
+                spec_path = edit_target.MapToSpecPath(path)
+                prim_spec = self._layer.GetPrimAtPath(spec_path)
+                old_reference, new_reference = self._retarget_arcs(prim_spec, old_asset, new_asset)
+                if old_reference is None:
+                    print(f"Reference NOT retargeted: {path} (no reference to {old_asset} in {self._layer.identifier})")
+                    continue
+                _arc_list(prim_spec, old_reference).ReplaceItemEdits(old_reference, new_reference)
+                self._retargeted.append((spec_path, old_reference, new_reference))
+
+        return list(self._removed), [path for path, _, _ in self._retargeted]
+
+    def _retarget_arcs(self, prim_spec: Sdf.PrimSpec, old_asset: str, new_asset: str) -> tuple:
+        """(old arc, new arc) of the reference or payload to ``old_asset``, (None, None) if there is none."""
+        if not prim_spec:
+            return None, None
+        for item in prim_spec.referenceList.GetAddedOrExplicitItems():
+            if item.assetPath == old_asset:
+                return item, Sdf.Reference(new_asset, item.primPath, item.layerOffset, item.customData)
+        # SKUs of a collection import are payloads
+        for item in prim_spec.payloadList.GetAddedOrExplicitItems():
+            if item.assetPath == old_asset:
+                return item, Sdf.Payload(new_asset, item.primPath, item.layerOffset)
+        return None, None
+
+    def undo(self):
+        if self._layer is None:
+            return
+        with Sdf.ChangeBlock():
+            for spec_path, old_reference, new_reference in reversed(self._retargeted):
+                prim_spec = self._layer.GetPrimAtPath(spec_path)
+                if prim_spec:
+                    _arc_list(prim_spec, new_reference).ReplaceItemEdits(new_reference, old_reference)
+            for spec_path in reversed(self._removed):
+                Sdf.CreatePrimInLayer(self._layer, spec_path.GetParentPath())
+                Sdf.CopySpec(self._backup, spec_path, self._layer, spec_path)
+        self._removed = []
+        self._retargeted = []
+
+def register():
+    omni.kit.commands.register_all_commands_in_module(sys.modules[__name__])
+
+def unregister():
+    omni.kit.commands.unregister_module_commands(sys.modules[__name__])
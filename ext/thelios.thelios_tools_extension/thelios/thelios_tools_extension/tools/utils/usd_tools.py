@@ -25,14 +25,31 @@ import omni.usd
 import omni.kit.commands
 import omni.kit.app
 from pxr import Usd, UsdGeom, Sdf, UsdShade
-import os
 from ... import constants
 from .alerts import AlertWindow
+from .scope_index import get_scope_index
+from .scope_isolation import get_scope_isolation
+from .sku_hierarchy import build_sku_hierarchy
+from .prim_index import get_prim_index
+from .asset_stat import get_asset_stat
+from .asset_cache import get_asset_cache
+from .material_registry import get_material_registry, reference_source_file
 
 class USDTools():
     
     def __init__(self):
         self.alert_instance = AlertWindow()
+        # Loaded SKU scopes of the current stage, shared by every panel
+        self.scope_index = get_scope_index()
+        self.scope_isolation = get_scope_isolation()
+        # Name -> paths of every prim, replaces stage-wide name scans
+        self.prim_index = get_prim_index()
+        # TTL-cached existence checks of usd files and URLs
+        self.asset_stat = get_asset_stat()
+        # Local mirror of the share: assets are authored with their share path, read from the mirror
+        self.asset_cache = get_asset_cache()
+        # Materials of /World/Looks: name -> paths -> source file
+        self.material_registry = get_material_registry()
     
     def create_hierarchy_structure(self, stage: Usd.Stage, model_name: str, sku_name: str, release: str) -> None:
         """
@@ -55,81 +72,27 @@ class USDTools():
             >>> create_hierarchy_structure(stage, "Chair", "001", "v1.0")
             # Creates: /World/Models/glass_Xform/Chair_Xform/Release_v1.0/Chair_001
         """
-        _stage = omni.usd.get_context().get_stage()
-        
-        def get_or_create_scope(stage: Usd.Stage, path: str) -> UsdGeom.Scope:
-            """
-            Check if a Scope exists, otherwise create it.
-            
-            Args:
-                stage (Usd.Stage): The USD stage
-                path (str): Path where the Scope should exist or be created
-                
-            Returns:
-                UsdGeom.Scope: The existing or newly created Scope
-            """
-            prim = _stage.GetPrimAtPath(path)
-            if prim.IsValid():
-                return UsdGeom.Scope(prim)
-            else:
-                return UsdGeom.Scope.Define(_stage, path)
-        
-        def get_or_create_xform(stage: Usd.Stage, path: str) -> UsdGeom.Xform:
-            """
-            Check if an Xform exists, otherwise create it.
-            
-            Args:
-                stage (Usd.Stage): The USD stage
-                path (str): Path where the Xform should exist or be created
-                
-            Returns:
-                UsdGeom.Xform: The existing or newly created Xform
-            """
-            prim = _stage.GetPrimAtPath(path)
-            if prim.IsValid():
-                return UsdGeom.Xform(prim)
-            else:
-                return UsdGeom.Xform.Define(_stage, path)
-        
-        # 0. Create/get World as root and defaultPrim
-        world_path = "/World"
-        world_xform = get_or_create_xform(_stage, world_path)
-        
-        # Set World as the stage's defaultPrim
-        _stage.SetDefaultPrim(world_xform.GetPrim())
-        
-        # 1. Create Models (Scope) under World
-        models_path = f"{world_path}/Models"
-        models_scope = get_or_create_scope(_stage, models_path)
-        
-        # 2. Create glass_Xform (Xform) under Models
-        glass_xform_path = f"{models_path}/glass_Xform"
-        glass_xform = get_or_create_xform(_stage, glass_xform_path)
+        # Always the current context stage: callers may hold a stage that was closed since
+        self.create_hierarchy_structures([(model_name, sku_name, release)])
+
+    def create_hierarchy_structures(self, skus, stage: Usd.Stage = None) -> list:
+        """
+        Create the standardized hierarchy of many SKUs in one batch.
         
-        # Apply 45° rotation animation on Y axis to glass_Xform ---------
+        All missing prims are authored at the Sdf level in a single change
+        block; the default prim and the glass_Xform turntable animation are
+        authored once for the whole batch (see sku_hierarchy).
         
-        prim = _stage.GetPrimAtPath(glass_xform_path)
-        xformable = UsdGeom.Xformable(prim)
-        rotY = xformable.GetRotateYOp()
-        if not rotY:
-            rotY = xformable.AddRotateYOp(UsdGeom.XformOp.PrecisionFloat)
+        Args:
+            skus (list): (model_name, sku_name, release) tuples
+            stage (Usd.Stage): The USD stage where the hierarchy will be created.
+                                Defaults to the current context stage
             
-        for i in range(1, 9):  # 8 frame
-            angle = -45.0 * i
-            rotY.Set(angle, Usd.TimeCode(i))    
-        # ---------------------------------------------------------------        
-        
-        # 3. Create model_name_Xform (Xform) under glass_Xform
-        model_xform_path = f"{glass_xform_path}/{model_name}_Xform"
-        model_xform = get_or_create_xform(_stage, model_xform_path)
-        
-        # 4. Create Release (Scope) under model_name_Xform
-        release_scope_path = f"{model_xform_path}/Release_{release}"
-        release_scope = get_or_create_scope(_stage, release_scope_path)
-        
-        # 5. Create SKU scope with underscore to avoid path errors
-        sku_scope_path = f"{release_scope_path}/{model_name}_{str(sku_name)}"
-        sku_scope = get_or_create_scope(_stage, sku_scope_path)
+        Returns:
+            list: SKU scope paths (Sdf.Path), in the order of ``skus``
+        """
+        stage = stage or omni.usd.get_context().get_stage()
+        return build_sku_hierarchy(stage, skus)
 
     def check_usd_file_exists(self, file_path: str) -> bool:
         """
@@ -138,7 +101,11 @@ class USDTools():
         
         This function can validate USD files in two contexts:
         - Local filesystem paths: Uses standard os.path operations
-        - Omniverse URLs (omniverse://): Attempts to open the USD stage
+        - Omniverse URLs (omniverse://): Resolves the URL with the Ar resolver
+          (a single stat, the asset is not opened)
+        
+        Results are cached (see asset_stat), use check_usd_files_exist to
+        check many files at once.
         
         Args:
             file_path (str): Path to the USD file to check. Can be a local path
@@ -153,19 +120,19 @@ class USDTools():
             >>> check_usd_file_exists("omniverse://server/path/model.usd")
             False
         """
-        if file_path.startswith("omniverse://"):
-            # For Omniverse paths, use Usd.Stage.Open to verify existence
-            try:
-                temp_stage = Usd.Stage.Open(file_path)
-                if temp_stage:
-                    return True
-                else:
-                    return False
-            except Exception:
-                return False
-        else:
-            # For local paths, use os.path.exists
-            return os.path.exists(file_path) and os.path.isfile(file_path)
+        return self.asset_stat.exists(file_path)
+
+    def check_usd_files_exist(self, file_paths) -> dict:
+        """
+        Check many USD files at once, probing the uncached ones concurrently.
+        
+        Args:
+            file_paths (list): Local paths and/or Omniverse URLs
+            
+        Returns:
+            dict: file path -> bool
+        """
+        return self.asset_stat.exists_many(file_paths)
 
     def assign_payload(self, target_path: str, payload_asset_path: str) -> Usd.Prim:
         """
@@ -220,10 +187,11 @@ class USDTools():
         """
         Find an existing prim or create the hierarchy if necessary.
         
-        This is a helper function that first searches for a prim by name
-        throughout the stage. If not found, it creates the complete path
-        hierarchy using appropriate prim types (Xform for transforms, 
-        Scope for organization).
+        This is a helper function that first looks the exact path up on the
+        stage (a prim with the same name elsewhere, e.g. the same SKU in
+        another release, is not a match). If not found, it creates the
+        complete path hierarchy using appropriate prim types (Xform for
+        transforms, Scope for organization).
         
         Args:
             stage (Usd.Stage): The USD stage to search in
@@ -238,11 +206,10 @@ class USDTools():
             - All other prims become UsdGeom.Scope
         """
         _stage = omni.usd.get_context().get_stage()
-        # First search by name
-        prim_name = path.split("/")[-1]
-        for prim in _stage.Traverse():
-            if prim.GetName() == prim_name:
-                return prim
+        # First look up the exact path
+        prim = _stage.GetPrimAtPath(Sdf.Path(path))
+        if prim.IsValid():
+            return prim
         
         # If not found, create the hierarchy
         path_parts = path.strip("/").split("/")
@@ -305,6 +272,7 @@ class USDTools():
                 target_path=target_path,
                 payload_asset_path=payload_usd_path
             )
+            self.asset_cache.prefetch([payload_usd_path])
             
             print("Payload import completed successfully.")
             
@@ -314,48 +282,28 @@ class USDTools():
             print(f"Error: {e}")
         
     def get_filtered_scopes(self) -> list[str]:
+        """
+        Names of the loaded SKU scopes under /World/Models, in stage order.
         
-        _stage = omni.usd.get_context().get_stage()
-        
-        scopes = [
-            prim.GetPath().pathString
-            for prim in _stage.Traverse()
-            if prim.GetTypeName() == "Scope"
-            and prim.GetPath().pathString.startswith("/World/Models")
-            and not prim.GetName().endswith(("Looks", "mtl"))
-            and prim.IsLoaded()
-        ]
-        
-        filtered = [
-            s for s in scopes
-            if not s.split("/")[-1].startswith("Release_") 
-            and len(s.split("/")) <= 7
-        ]
-        
-        final_list = [s.split("/")[-1] for s in filtered][1:] 
-        
-        return final_list
+        Served by the notice-maintained scope index (no stage traversal).
+        For counts and single items use self.scope_index directly:
+        len(self.scope_index), self.scope_index[i].
+        """
+        return self.scope_index.names()
 
     # -------------------------------------------------------------------------
 
     def find_scope_by_name(self, stage, scope_name):
         
-        #Find a scope by name in the entire stage hierarchy.
+        #Find a scope by name in the entire stage hierarchy (prim index, no traversal).
+        #With repeated names the shallowest scope wins.
         
-        for prim in stage.Traverse():
-            if prim.IsA(UsdGeom.Scope) and prim.GetName() == scope_name:
-                return prim
-        return None
+        return self.prim_index.find(scope_name, UsdGeom.Scope)
 
     def is_descendant_of(self, prim, ancestor):
         #Check if a prim is a descendant (child, grandchild, etc.) of another prim.
         
-        current = prim.GetParent()
-        while current and current.GetPath() != "/":
-            if current.GetPath() == ancestor.GetPath():
-                return True
-            current = current.GetParent()
-        return False
+        return prim.GetPath() != ancestor.GetPath() and prim.GetPath().HasPrefix(ancestor.GetPath())
 
     def set_visibility(self, prim, visible):
         
@@ -417,99 +365,21 @@ class USDTools():
             print("Error: No active stage")
             return
         
-        # Find the target scope
-        target_scope_prim = self.find_scope_by_name(stage, target_scope_name)
+        # One pruned pass, only changed opinions are written (see scope_isolation)
+        written = self.scope_isolation.isolate(target_scope_name, keep_scopes)
         
-        if not target_scope_prim:
+        if written is None:
             print(f"⚠ ERROR: Scope '{target_scope_name}' not found!")
             return
         
-        #print(f"\n✓ Found target scope: '{target_scope_name}'")
-        #print(f"  Path: {target_scope_prim.GetPath()}")
-        
-        # Find all scopes to keep visible
-        keep_scope_prims = {}
-        for scope_name in keep_scopes:
-            scope_prim = self.find_scope_by_name(stage, scope_name)
-            if scope_prim:
-                keep_scope_prims[scope_name] = scope_prim
-                #print(f"✓ Scope to keep: '{scope_name}' - {scope_prim.GetPath()}")
-            #else:
-                #print(f"⚠ Scope '{scope_name}' not found (will be ignored)")
-        """
-        print("\n" + "="*60)
-        print("VISIBILITY MODIFICATION:")
-        print("="*60)
+    def show_all_scopes(self):
         """
+        Drop the isolation overrides of hide_all_scopes_except in one call.
         
-        hidden_count = 0
-        visible_count = 0
-        hidden_scopes = []
-        visible_scopes = []
-        
-        # Process all scopes
-        for prim in stage.Traverse():
-            if prim.IsA(UsdGeom.Scope):
-                prim_name = prim.GetName()
-                prim_path = prim.GetPath()
-                
-                # Target scope: visible
-                if prim_path == target_scope_prim.GetPath():
-                    #print(f"\n✓ TARGET: '{prim_name}' → VISIBLE")
-                    self.set_visibility(prim, True)
-                    self.make_children_visible(prim)
-                    visible_count += 1
-                    visible_scopes.append(prim_name)
-                    
-                # Child/descendant of target scope: visible
-                elif self.is_descendant_of(prim, target_scope_prim):
-                    #print(f"✓ CHILD OF TARGET: '{prim_name}' → VISIBLE")
-                    self.set_visibility(prim, True)
-                    self.make_children_visible(prim)
-                    visible_count += 1
-                    visible_scopes.append(prim_name)
-                    
-                # Scopes in the exceptions list: visible (but NOT their children)
-                elif prim_name in keep_scope_prims and prim_path == keep_scope_prims[prim_name].GetPath():
-                    #print(f"✓ EXCEPTION: '{prim_name}' → VISIBLE")
-                    self.set_visibility(prim, True)
-                    # NOTE: We make children visible here too, but they will be handled individually
-                    self.make_children_visible(prim)
-                    visible_count += 1
-                    visible_scopes.append(prim_name)
-                    
-                # Other scopes: hide
-                else:
-                    #print(f"○ '{prim_name}' → HIDDEN")
-                    self.set_visibility(prim, False)
-                    hidden_count += 1
-                    hidden_scopes.append(prim_name)
-        """
-        # Make all parents of target scope visible
-        print("\n" + "="*60)
-        #print("MAKING PARENT CHAIN VISIBLE:")
-        print("="*60)
-        """
-        
-        self.make_parents_visible(target_scope_prim)
-        
-        # Also make parents of exception scopes visible
-        for scope_name, scope_prim in keep_scope_prims.items():
-            #print(f"\nMaking parent chain visible for '{scope_name}':")
-            self.make_parents_visible(scope_prim)
-        
-        """
-        # Summary
-        print("\n" + "="*60)
-        print(f"✓ OPERATION COMPLETED")
-        print(f"\n  VISIBLE ({visible_count}):")
-        for name in visible_scopes:
-            print(f"    • {name}")
-        print(f"\n  HIDDEN ({hidden_count}):")
-        for name in hidden_scopes:
-            print(f"    • {name}")
-        print("="*60)
+        The persistent layers are never edited by the isolation, so the scene
+        goes back to the visibility it was saved with.
         """
+        self.scope_isolation.clear()
         
     def get_create_looks(self):
         stage = omni.usd.get_context().get_stage()
@@ -525,6 +395,10 @@ class USDTools():
             looks_prim = stage.DefinePrim(constants.MATERIAL_TARGET, "Scope")
         
     def get_materials_in_looks_scope(self, stage: Usd.Stage, looks_path=constants.MATERIAL_TARGET):
+        if looks_path == constants.MATERIAL_TARGET and stage == omni.usd.get_context().get_stage():
+            # Served by the material registry, no traversal
+            return [stage.GetPrimAtPath(path) for path in self.material_registry.paths()]
+        
         looks_prim = stage.GetPrimAtPath(looks_path)
         if not looks_prim or not looks_prim.IsValid():
             print(f"Scope Looks non trovato a {looks_path}")
@@ -579,10 +453,73 @@ class USDTools():
             asset_path=asset_usd_path,
             prim_path=Sdf.Path(prim_in_file) if prim_in_file else Sdf.Path.emptyPath
         )
+        self.asset_cache.prefetch([asset_usd_path])
 
         print(f"Reference created under {parent_path}: {target_prim_path} -> {asset_usd_path}")
         self.alert_instance.post_notification_info(f"INFO: reference imported: {local_name}")
 
+    def create_references_under_parents(self, references, check_exists: bool = True, notify: bool = True,
+                                            as_payload: bool = False) -> tuple:
+        """
+        Create many references as one undoable command, with one summary notification.
+        
+        All references are authored in a single change block by the
+        CreateReferencesBatch command (see usd_commands), so the whole batch
+        is one undo entry. Items whose asset is missing (checked concurrently,
+        see asset_stat) or whose parent prim does not exist are skipped and
+        counted as failures.
+        
+        Args:
+            references (list): (asset_usd_path, parent_path, local_name) tuples
+            check_exists (bool): Check the asset files before referencing them
+            notify (bool): Post the summary notification (a chunked import posts its own)
+            as_payload (bool): Author unloaded payloads instead of references
+                            (CreatePayloadsBatch), loaded on demand when viewed
+            
+        Returns:
+            tuple: (created prim paths, [(prim path, reason), ...] failures)
+        """
+        ctx = omni.usd.get_context()
+        stage = ctx.get_stage()
+        
+        exists = self.asset_stat.exists_many([r[0] for r in references]) if check_exists else {}
+        
+        batch = []
+        failed = []
+        for asset_usd_path, parent_path, local_name in references:
+            target_prim_path = f"{parent_path}/{local_name}"
+            if check_exists and not exists[asset_usd_path]:
+                failed.append((target_prim_path, f"asset not found: {asset_usd_path}"))
+            elif not stage.GetPrimAtPath(parent_path):
+                failed.append((target_prim_path, f"parent not found: {parent_path}"))
+            else:
+                batch.append((target_prim_path, asset_usd_path, ""))
+        
+        created = []
+        if batch:
+            if as_payload:
+                _, created = omni.kit.commands.execute("CreatePayloadsBatch", usd_context=ctx, payloads=batch, load=False)
+            else:
+                _, created = omni.kit.commands.execute("CreateReferencesBatch", usd_context=ctx, references=batch)
+            created = created or []
+            # Mirrored in the background; an unloaded payload import only revalidates the files already mirrored
+            self.asset_cache.prefetch([asset_path for _, asset_path, _ in batch], fetch=not as_payload)
+        
+        for path, reason in failed:
+            print(f"Reference NOT created: {path} ({reason})")
+        
+        if notify:
+            self.notify_references_summary(len(created), len(failed))
+        
+        return created, failed
+    
+    def notify_references_summary(self, created: int, failed: int):
+        if failed:
+            self.alert_instance.post_notification_warning(
+                f"WARNING: {created} references imported, {failed} failed (see console)")
+        else:
+            self.alert_instance.post_notification_info(f"INFO: {created} references imported")
+
     def save_material_overrides_to_source(self, material_path: str):
 
         stage = omni.usd.get_context().get_stage()
@@ -592,16 +529,20 @@ class USDTools():
             print(f"Materiale non trovato: {material_path}")
             return
         
-        source_file_path = self.get_reference_source_file(mtl_prim)
+        source_file_path = self.material_registry.source_of(mtl_prim.GetPath())
         if not source_file_path:
             self.alert_instance.post_notification_warning(f"ERROR: no referenced .usda file found")
             print("no referenced .usda file found")
             return
         
+        # Overrides go to the share file, never to its local mirror: drop the redirect first
+        source_file_path = self.asset_cache.share_path(source_file_path)
+        self.asset_cache.invalidate(source_file_path)
         print(f"File sorgente AUTO-RILEVATO: {source_file_path}")
         
-        # 1. Apri il file originale
-        source_stage = Usd.Stage.Open(source_file_path)
+        # 1. Apri il file originale (the layer the scene has loaded, so it stays in sync with the file)
+        source_layer = Sdf.Layer.FindOrOpen(source_file_path)
+        source_stage = Usd.Stage.Open(source_layer) if source_layer else None
         if not source_stage:
             self.alert_instance.post_notification_warning(f"ERROR: source file not found")
             print(f"ERROR: source file not found")
@@ -626,31 +567,17 @@ class USDTools():
                     modified_count += 1
         
         # 4. Salva
-        source_stage.GetRootLayer().Save()
+        if self.asset_cache.share_path(source_layer.realPath) != source_layer.realPath:
+            # Read through the mirror: write the share file, then re-read the layer from it
+            source_layer.Export(source_file_path)
+            source_layer.UpdateAssetInfo()
+            source_layer.Reload(force=True)
+        else:
+            source_layer.Save()
         self.alert_instance.post_notification_info(f"INFO: material updated: {source_file_path}")
         print(f"Saved! {modified_count} params updated → {source_file_path}")
         
     def get_reference_source_file(self, prim):
         
-        # Scorri la PrimStack per trovare file .usda referenziati
-        for prim_spec in prim.GetPrimStack():
-            layer = prim_spec.layer
-            if layer and layer.identifier.endswith('.usda') and os.path.exists(layer.identifier):
-                return layer.identifier
-            
-            # Controlla anche references/payloads nella stack
-            if hasattr(prim_spec, 'referenceList'):
-                for ref in getattr(prim_spec.referenceList, 'prependedItems', []):
-                    asset_path = ref.assetPath
-                    if asset_path and asset_path.endswith('.usda') and os.path.exists(asset_path):
-                        return asset_path
-        
-        # Fallback: subLayers del prim
-        sub_layers = prim.GetAttribute("subLayers")
-        if sub_layers.IsValid():
-            paths = sub_layers.Get()
-            for path in paths or []:
-                if os.path.exists(path) and path.endswith('.usda'):
-                    return path
-        
-        return None    
\ No newline at end of file
+        # Source .usda of the prim (layer, reference or subLayers), see material_registry
+        return reference_source_file(prim)    
\ No newline at end of file
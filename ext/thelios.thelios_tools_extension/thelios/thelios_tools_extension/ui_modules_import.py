@@ -111,8 +111,6 @@ class CustomTemplateImportPanel:
         self._stage = omni.usd.get_context().get_stage()
         self._template_tools = template_tools
         
-        self.combo_elements = self.logic.get_combo_elements()
-        
     def build(self, style):
         with ui.CollapsableFrame(title="Custom Import Template Scene ", style=style, collapsed=constants.CUSTOM_IMPORT_TEMPLATE_UI_VISIBILITY):
             with ui.VStack(height=0, spacing=10, name="frame_v_stack"):
@@ -120,7 +118,7 @@ class CustomTemplateImportPanel:
                 """
                 with ui.HStack(spacing=10):
                     ui.Label("Camera Selection", name="label", width=constants.LABEL_PADDING)
-                    self.brand_camera_combo = ui.ComboBox(1, *self.combo_elements, height=10, name="camera_brand").model
+                    self.brand_camera_combo = ui.ComboBox(1, *self.logic.combo_elements, height=10, name="camera_brand").model
                     #self._create_control_state()
                 """
                     
@@ -192,8 +190,13 @@ class CustomModelImportPanel:
                 with ui.HStack(spacing=10, alignment=ui.Alignment.V_CENTER):
                     ui.Label("Model", name="label", width=constants.LABEL_PADDING)
                     self.model_field = ui.StringField(self.model.model_model, name="model", height=10, style={"margin":3})
+                    self.model.model_model.add_value_changed_fn(self.logic._on_model_code_changed)
                     self.import_custom_button = ui.Button("Select Model", clicked_fn=self.logic._import_sel_skus_custom_model, name="select_model")
                     
+                # Style code suggestions for the code being typed
+                self.model_suggestions_frame = ui.Frame(height=0, build_fn=self.logic._build_model_suggestions)
+                self.logic.model_suggestions_frame = self.model_suggestions_frame
+                    
                 with ui.ZStack():
                     ui.Rectangle(style={"background_color": cl(0.25), 
                                         "padding": 8, 
@@ -234,10 +237,25 @@ class CustomModelImportPanel:
                                                                 clicked_fn=self.logic._create_hierarchy_and_import_payload,
                                                                 name="import_selected")
                         
+                        # Add / remove / retarget only what differs from PLM
+                        self.sync_release_button = ui.Button("Sync Release", 
+                                                                height=10, 
+                                                                clicked_fn=self.logic._sync_release,
+                                                                name = "sync_release")
+                        
                         self.clear_button = ui.Button("Clear", 
                                                                 height=10, 
                                                                 clicked_fn=self.logic._clear_all,
                                                                 name = "clear_scrolling")
+                        
+                        self.cancel_import_button = ui.Button("Cancel", 
+                                                                height=10, 
+                                                                clicked_fn=self.logic._cancel_import,
+                                                                name = "cancel_import")
+                    
+                    # Progress of the running import
+                    self.import_status_label = ui.Label("", name="label", alignment=ui.Alignment.CENTER)
+                    self.logic.import_status_label = self.import_status_label
                     
                     ui.Spacer(height=8)
             
@@ -245,7 +263,6 @@ class ImportAllCollectionPanel:
     def __init__(self, model: TheliosWindowModel, logic: TheliosLogic):
         self.model = model
         self.logic = logic
-        self.combo_elements = self.logic.get_combo_elements()
         
     def build(self, style):
         with ui.CollapsableFrame(title="All Collection Import ", style=style, collapsed=constants.IMPORT_ALL_COLLECTION_UI_VISIBILITY):
@@ -260,7 +277,8 @@ class ImportAllCollectionPanel:
                 # Brand selection dropdown
                 with ui.HStack(spacing=10):
                     ui.Label("Brand", name="label", width=constants.LABEL_PADDING)
-                    self.brand_combo = ui.ComboBox(1, *self.combo_elements, height=10, name="brand_choices").model
+                    # Filled when the PLM answers (no PLM round trip while the panel is built)
+                    self.brand_combo_frame = ui.Frame(height=0, build_fn=self.logic._build_brand_combo)
                     #self._create_control_state()
                     
                 # Type/Genre selection dropdown
@@ -270,9 +288,16 @@ class ImportAllCollectionPanel:
                     #self._create_control_state()
                     
                 # Import button
-                self.import_btn = ui.Button("Import", clicked_fn=self.logic._get_plm_data, name="import_collection")
+                self.import_btn = ui.Button("Import", clicked_fn=self.logic._import_collection, name="import_collection")
+                self.status_label = ui.Label("", name="label", alignment=ui.Alignment.CENTER)
                 ui.Spacer(height=0)
                 
+        # Logic reads the selections and reports loading state through these widgets
+        self.logic.brand_combo_frame = self.brand_combo_frame
+        self.logic.type_combo = self.type_combo
+        self.logic.collection_status_label = self.status_label
+        self.logic._load_brands()
+                
 class RenderSettingsPanel:
     def __init__(self, model: TheliosWindowModel, logic: TheliosLogic):
         self.model = model
@@ -403,6 +428,7 @@ class ViewPanel:
         self.payloads_combo = None
         self.refresh_btn = None
         self.select_btn = None
+        self.show_all_btn = None
         
         self.slider_container = None  # contenitore dinamico per slider, bottoni e stringfield
         self.current_slider_value = 1
@@ -416,6 +442,7 @@ class ViewPanel:
                     self.payloads_combo = ui.ComboBox(0, "", height=10, name="combo_payloads", style={"margin":3}).model
                     self.refresh_btn = ui.Button("Refresh", clicked_fn=self._refresh_ui, name="refresh_button")
                     self.select_btn = ui.Button("Select", clicked_fn=lambda combobox=self.payloads_combo: self.logic._get_selected_scope(combobox), name="select_button")
+                    self.show_all_btn = ui.Button("Show All", clicked_fn=self.logic._show_all_scopes, name="show_all_button")
                 
                 #searchable_combo_box = self.create_searchable_combo_box()
                 
@@ -457,10 +484,9 @@ class ViewPanel:
             )
     
     def _forward_frame(self):
-        payload_list = self.usd_tools.get_filtered_scopes()
         current_value = self.start_slider.get_value_as_int()
         new_value = current_value + 1
-        max_val = len(payload_list)
+        max_val = len(self.usd_tools.scope_index)
         
         if new_value > max_val:
             new_value = max_val
@@ -487,8 +513,7 @@ class ViewPanel:
         if v < 1:
             print(f"Warning: slider value < 1: {v}, clamping to 1")
             v = 1
-        payload_list = self.usd_tools.get_filtered_scopes()
-        current_model_selected = payload_list[v - 1]
+        current_model_selected = self.usd_tools.scope_index[v - 1]
         # Qui chiami la funzione dentro logic, non dentro ViewPanel
         self.logic._get_selected_scope_string(current_model_selected)
         self.model.slider_view_model.set_value(str(current_model_selected))
@@ -501,10 +526,7 @@ class ViewPanel:
             
         # Define the list of items for the combo box
         
-        if self.usd_tools.get_filtered_scopes() is None:
-            item_list = ["-"]
-        else:
-            item_list = self.usd_tools.get_filtered_scopes()
+        item_list = self.usd_tools.get_filtered_scopes()
             
         # Create the searchable combo box with the specified items and callback
         searchable_combo_widget = build_searchable_combo_widget(
@@ -697,5 +719,39 @@ class MaterialsPanel:
         if 0 <= index_sel_mat < len(children_sel_mat):
             selected_mat = self.mat_list_combo.get_item_value_model(children_sel_mat[index_sel_mat]).as_string
         
-        mat_to_update =f"/World/Looks/{selected_mat}"
-        self.usd_tools.save_material_overrides_to_source(mat_to_update)
\ No newline at end of file
+        # Registry path: materials may sit deeper than /World/Looks/{name}
+        mat_to_update = self.usd_tools.material_registry.path_of(selected_mat) or f"/World/Looks/{selected_mat}"
+        self.usd_tools.save_material_overrides_to_source(mat_to_update)
+        
+class DiagnosticsPanel:
+    def __init__(self, model: TheliosWindowModel, logic: TheliosLogic):
+        self.model = model
+        self.logic = logic
+        
+        self.collect_btn = None
+        self.composition_btn = None
+        self.export_btn = None
+        self.cache_btn = None
+        
+    def build(self, style):
+        with ui.CollapsableFrame(title="Diagnostics", style=style, collapsed=constants.DIAGNOSTICS_UI_VISIBILITY):
+            with ui.VStack(height=0, spacing=10, name="frame_v_stack"):
+                with ui.HStack(spacing=5):
+                    self.collect_btn = ui.Button("Profile SKUs", clicked_fn=self.logic._collect_stage_stats, name="collect_stats_button")
+                    self.composition_btn = ui.Button("Composition", clicked_fn=self.logic._measure_composition, name="composition_button")
+                    self.export_btn = ui.Button("Export JSON", clicked_fn=self.logic._export_stage_stats, name="export_stats_button")
+                    self.cache_btn = ui.Button("Asset Cache", clicked_fn=self.logic._report_asset_cache, name="asset_cache_button")
+                    
+                self.status_label = ui.Label("", name="label", alignment=ui.Alignment.CENTER)
+                
+                # Heaviest SKUs first
+                self.scroll_frame_diagnostics = ui.ScrollingFrame(
+                                height=200,
+                                horizontal_scrollbar_policy=ui.ScrollBarPolicy.SCROLLBAR_ALWAYS_OFF,
+                                vertical_scrollbar_policy=ui.ScrollBarPolicy.SCROLLBAR_ALWAYS_ON,
+                            )
+                self.scroll_frame_diagnostics.set_build_fn(self.logic._build_scrolling_content_diagnostics)
+                ui.Spacer(height=0)
+                
+        self.logic.diagnostics_status_label = self.status_label
+        self.logic.scroll_frame_diagnostics = self.scroll_frame_diagnostics
@@ -5,7 +5,7 @@ import carb
 
 #from .utils import load_config
 from .tools.style import style_widgets
-from .ui_modules_import import ImportTemplatePanel, CustomModelImportPanel, CustomTemplateImportPanel, ImportAllCollectionPanel, RenderSettingsPanel, ViewPanel, MaterialsPanel
+from .ui_modules_import import ImportTemplatePanel, CustomModelImportPanel, CustomTemplateImportPanel, ImportAllCollectionPanel, RenderSettingsPanel, ViewPanel, MaterialsPanel, DiagnosticsPanel
 from .models import TheliosWindowModel
 from .logic import TheliosLogic
 
@@ -76,4 +76,8 @@ class TheliosToolsWindow:
                         self.view_panel = ViewPanel(self.model, self.logic)
                         self.view_panel.build(CollapsableFrame_style)
                         
+                        #Import diagnostics panel class
+                        self.diagnostics_panel = DiagnosticsPanel(self.model, self.logic)
+                        self.diagnostics_panel.build(CollapsableFrame_style)
+                        
         return self._editor_window
\ No newline at end of file